@@ -0,0 +1,519 @@
+/*
+ * Optional compiled search kernel: BFS, Dijkstra and A* over the flat grid
+ * buffers, used through kernel.py. Build with:  python build_kernel.py
+ *
+ * Each function mirrors its engine.py counterpart step for step: the same
+ * neighbour order, the same (key, node id) open-list order and the same
+ * floating point expressions, so paths, traces and statistics come out
+ * identical. Bookkeeping goes into the grid's SearchSpace arrays (stamped
+ * opened/closed, parent, dist), which the caller passes in. The GIL is
+ * released while searching.
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <math.h>
+#include <stdint.h>
+#include <stdlib.h>
+
+typedef struct {
+    const uint8_t *cells;
+    const uint8_t *costs; /* NULL when every cell costs 1 */
+    Py_ssize_t size;
+    Py_ssize_t cols;
+    int diagonal;
+} GridView;
+
+typedef struct {
+    int32_t *data;
+    Py_ssize_t len, cap;
+} IntVec;
+
+typedef struct {
+    double key;
+    int32_t node;
+} Entry;
+
+typedef struct {
+    Entry *data;
+    Py_ssize_t len, cap;
+} Heap;
+
+static double SQRT2;
+
+static int
+vec_push(IntVec *v, int32_t x)
+{
+    if (v->len == v->cap) {
+        Py_ssize_t cap = v->cap ? v->cap * 2 : 1024;
+        int32_t *data = realloc(v->data, cap * sizeof(int32_t));
+        if (data == NULL)
+            return -1;
+        v->data = data;
+        v->cap = cap;
+    }
+    v->data[v->len++] = x;
+    return 0;
+}
+
+/* heapq orders (key, node) tuples; so does this heap */
+static int
+entry_less(const Entry *a, const Entry *b)
+{
+    return a->key < b->key || (a->key == b->key && a->node < b->node);
+}
+
+static int
+heap_push(Heap *h, double key, int32_t node)
+{
+    Py_ssize_t i;
+    Entry e = {key, node};
+    if (h->len == h->cap) {
+        Py_ssize_t cap = h->cap ? h->cap * 2 : 1024;
+        Entry *data = realloc(h->data, cap * sizeof(Entry));
+        if (data == NULL)
+            return -1;
+        h->data = data;
+        h->cap = cap;
+    }
+    i = h->len++;
+    while (i > 0) {
+        Py_ssize_t parent = (i - 1) >> 1;
+        if (!entry_less(&e, &h->data[parent]))
+            break;
+        h->data[i] = h->data[parent];
+        i = parent;
+    }
+    h->data[i] = e;
+    return 0;
+}
+
+static Entry
+heap_pop(Heap *h)
+{
+    Entry top = h->data[0];
+    Entry last = h->data[--h->len];
+    Py_ssize_t i = 0, n = h->len;
+    while (1) {
+        Py_ssize_t child = 2 * i + 1;
+        if (child >= n)
+            break;
+        if (child + 1 < n && entry_less(&h->data[child + 1], &h->data[child]))
+            child++;
+        if (!entry_less(&h->data[child], &last))
+            break;
+        h->data[i] = h->data[child];
+        i = child;
+    }
+    if (n)
+        h->data[i] = last;
+    return top;
+}
+
+/* Grid.neighbors() / Grid.edges(): right, down, left, up, then the
+   diagonals that do not cut a wall corner. Returns the neighbour count. */
+static int
+edges(const GridView *g, Py_ssize_t node, int32_t *nbs, double *steps)
+{
+    const uint8_t *cells = g->cells;
+    Py_ssize_t cols = g->cols, col = node % cols;
+    int n = 0, straight, i;
+    int right = col + 1 < cols && !cells[node + 1];
+    int down = node + cols < g->size && !cells[node + cols];
+    int left = col > 0 && !cells[node - 1];
+    int up = node >= cols && !cells[node - cols];
+    if (right)
+        nbs[n++] = (int32_t)(node + 1);
+    if (down)
+        nbs[n++] = (int32_t)(node + cols);
+    if (left)
+        nbs[n++] = (int32_t)(node - 1);
+    if (up)
+        nbs[n++] = (int32_t)(node - cols);
+    straight = n;
+    if (g->diagonal) {
+        if (down && right && !cells[node + cols + 1])
+            nbs[n++] = (int32_t)(node + cols + 1);
+        if (down && left && !cells[node + cols - 1])
+            nbs[n++] = (int32_t)(node + cols - 1);
+        if (up && left && !cells[node - cols - 1])
+            nbs[n++] = (int32_t)(node - cols - 1);
+        if (up && right && !cells[node - cols + 1])
+            nbs[n++] = (int32_t)(node - cols + 1);
+    }
+    if (steps != NULL) {
+        for (i = 0; i < n; i++) {
+            double step = g->costs ? (double)g->costs[nbs[i]] : 1.0;
+            steps[i] = i < straight ? step : step * SQRT2;
+        }
+    }
+    return n;
+}
+
+/* Grid.base_heuristic(): Manhattan or octile distance times the cheapest cost */
+typedef struct {
+    int enabled;
+    Py_ssize_t tr, tc, cols;
+    long scale;
+    double diagonal_extra;
+    int diagonal;
+} Heuristic;
+
+static double
+heuristic(const Heuristic *h, Py_ssize_t node)
+{
+    Py_ssize_t dr, dc, t;
+    if (!h->enabled)
+        return 0.0;
+    dr = node / h->cols - h->tr;
+    dc = node % h->cols - h->tc;
+    if (dr < 0)
+        dr = -dr;
+    if (dc < 0)
+        dc = -dc;
+    if (!h->diagonal)
+        return (double)(h->scale * (dr + dc));
+    if (dr < dc) {
+        t = dr;
+        dr = dc;
+        dc = t;
+    }
+    return (double)(h->scale * dr) + h->diagonal_extra * (double)dc;
+}
+
+static int
+get_buffers(PyObject *cells_obj, PyObject *costs_obj, Py_buffer *cells, Py_buffer *costs,
+            Py_ssize_t size)
+{
+    if (PyObject_GetBuffer(cells_obj, cells, PyBUF_SIMPLE) < 0)
+        return -1;
+    costs->obj = NULL;
+    if (costs_obj != Py_None && PyObject_GetBuffer(costs_obj, costs, PyBUF_SIMPLE) < 0) {
+        PyBuffer_Release(cells);
+        return -1;
+    }
+    if (cells->len < size || (costs->obj != NULL && costs->len < size)) {
+        PyErr_SetString(PyExc_ValueError, "grid buffers are smaller than rows * cols");
+        PyBuffer_Release(cells);
+        if (costs->obj != NULL)
+            PyBuffer_Release(costs);
+        return -1;
+    }
+    return 0;
+}
+
+static int
+get_array(PyObject *obj, Py_buffer *view, Py_ssize_t size, Py_ssize_t itemsize)
+{
+    if (PyObject_GetBuffer(obj, view, PyBUF_WRITABLE) < 0)
+        return -1;
+    if (view->len < size * itemsize) {
+        PyErr_SetString(PyExc_ValueError, "search arrays are smaller than the grid");
+        PyBuffer_Release(view);
+        return -1;
+    }
+    return 0;
+}
+
+static PyObject *
+make_result(int found, IntVec *trace, Py_ssize_t expanded, Py_ssize_t stale, Py_ssize_t max_open)
+{
+    PyObject *bytes = PyBytes_FromStringAndSize((const char *)trace->data,
+                                                trace->len * (Py_ssize_t)sizeof(int32_t));
+    if (bytes == NULL)
+        return NULL;
+    return Py_BuildValue("(NNnnn)", PyBool_FromLong(found), bytes, expanded, stale, max_open);
+}
+
+PyDoc_STRVAR(bfs_doc,
+"bfs(cells, rows, cols, diagonal, source, target, opened, parent, stamp)\n"
+"-> (found, trace bytes, expanded, stale_pops, max_open)");
+
+static PyObject *
+k_bfs(PyObject *self, PyObject *args)
+{
+    PyObject *cells_obj, *opened_obj, *parent_obj, *result = NULL;
+    Py_ssize_t rows, cols, source, target, expanded = 0, max_open = 0, head = 0;
+    int diagonal, found = 0, failed = 0;
+    unsigned long stamp;
+    Py_buffer cells, costs, opened_view, parent_view;
+    IntVec queue = {0}, trace = {0};
+    GridView g;
+
+    if (!PyArg_ParseTuple(args, "OnnpnnOOk", &cells_obj, &rows, &cols, &diagonal, &source, &target,
+                          &opened_obj, &parent_obj, &stamp))
+        return NULL;
+    if (get_buffers(cells_obj, Py_None, &cells, &costs, rows * cols) < 0)
+        return NULL;
+    if (get_array(opened_obj, &opened_view, rows * cols, 4) < 0)
+        goto release_cells;
+    if (get_array(parent_obj, &parent_view, rows * cols, 4) < 0)
+        goto release_opened;
+
+    g.cells = cells.buf;
+    g.costs = NULL;
+    g.size = rows * cols;
+    g.cols = cols;
+    g.diagonal = diagonal;
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        uint32_t *opened = opened_view.buf;
+        int32_t *parent = parent_view.buf;
+        int32_t nbs[8];
+        int n, i;
+        opened[source] = (uint32_t)stamp;
+        if (vec_push(&queue, (int32_t)source) < 0)
+            failed = 1;
+        while (!failed && head < queue.len) {
+            Py_ssize_t current = queue.data[head++];
+            if (current == target) {
+                /* Everything pushed and no longer waiting was expanded, start included */
+                expanded = trace.len + 1 - (queue.len - head);
+                found = 1;
+                break;
+            }
+            n = edges(&g, current, nbs, NULL);
+            for (i = 0; i < n; i++) {
+                int32_t nb = nbs[i];
+                if (opened[nb] != stamp) {
+                    if (vec_push(&queue, nb) < 0 || vec_push(&trace, nb) < 0) {
+                        failed = 1;
+                        break;
+                    }
+                    opened[nb] = (uint32_t)stamp;
+                    parent[nb] = (int32_t)current;
+                }
+            }
+            if (queue.len - head > max_open)
+                max_open = queue.len - head;
+        }
+        if (!found)
+            expanded = trace.len + 1;
+    }
+    Py_END_ALLOW_THREADS
+
+    if (failed)
+        PyErr_NoMemory();
+    else
+        result = make_result(found, &trace, expanded, 0, max_open);
+    free(queue.data);
+    free(trace.data);
+    PyBuffer_Release(&parent_view);
+release_opened:
+    PyBuffer_Release(&opened_view);
+release_cells:
+    PyBuffer_Release(&cells);
+    return result;
+}
+
+PyDoc_STRVAR(best_first_doc,
+"best_first(cells, costs, rows, cols, diagonal, source, target, opened, closed, parent, dist,\n"
+"           stamp, heuristic, scale, diagonal_extra)\n"
+"-> (found, trace bytes, expanded, stale_pops, max_open)\n\n"
+"Dijkstra when heuristic is false, A* with Grid.base_heuristic() otherwise.");
+
+static PyObject *
+k_best_first(PyObject *self, PyObject *args)
+{
+    PyObject *cells_obj, *costs_obj, *opened_obj, *closed_obj, *parent_obj, *dist_obj, *result = NULL;
+    Py_ssize_t rows, cols, source, target, expanded = 0, max_open = 0, stale = 0;
+    int diagonal, use_heuristic, found = 0, failed = 0;
+    unsigned long stamp;
+    long scale;
+    double diagonal_extra;
+    Py_buffer cells, costs, opened_view, closed_view, parent_view, dist_view;
+    IntVec trace = {0};
+    Heap heap = {0};
+    GridView g;
+    Heuristic h;
+
+    if (!PyArg_ParseTuple(args, "OOnnpnnOOOOkpld", &cells_obj, &costs_obj, &rows, &cols, &diagonal,
+                          &source, &target, &opened_obj, &closed_obj, &parent_obj, &dist_obj, &stamp,
+                          &use_heuristic, &scale, &diagonal_extra))
+        return NULL;
+    if (get_buffers(cells_obj, costs_obj, &cells, &costs, rows * cols) < 0)
+        return NULL;
+    if (get_array(opened_obj, &opened_view, rows * cols, 4) < 0)
+        goto release_cells;
+    if (get_array(closed_obj, &closed_view, rows * cols, 4) < 0)
+        goto release_opened;
+    if (get_array(parent_obj, &parent_view, rows * cols, 4) < 0)
+        goto release_closed;
+    if (get_array(dist_obj, &dist_view, rows * cols, 8) < 0)
+        goto release_parent;
+
+    g.cells = cells.buf;
+    g.costs = costs.obj != NULL ? costs.buf : NULL;
+    g.size = rows * cols;
+    g.cols = cols;
+    g.diagonal = diagonal;
+    h.enabled = use_heuristic;
+    h.tr = target / cols;
+    h.tc = target % cols;
+    h.cols = cols;
+    h.scale = scale;
+    h.diagonal_extra = diagonal_extra;
+    h.diagonal = diagonal;
+
+    Py_BEGIN_ALLOW_THREADS
+    {
+        uint32_t *opened = opened_view.buf, *closed = closed_view.buf;
+        int32_t *parent = parent_view.buf;
+        double *dist = dist_view.buf;
+        int32_t nbs[8];
+        double steps[8];
+        int n, i;
+        if (heap_push(&heap, heuristic(&h, source), (int32_t)source) < 0)
+            failed = 1;
+        opened[source] = (uint32_t)stamp;
+        dist[source] = 0.0;
+        while (!failed && heap.len) {
+            Entry top = heap_pop(&heap);
+            Py_ssize_t current = top.node;
+            double d;
+            if (closed[current] == stamp)
+                continue;
+            closed[current] = (uint32_t)stamp;
+            expanded++;
+            if (current == target) {
+                found = 1;
+                break;
+            }
+            d = dist[current];
+            n = edges(&g, current, nbs, steps);
+            for (i = 0; i < n; i++) {
+                int32_t nb = nbs[i];
+                double new_dist = d + steps[i];
+                if (closed[nb] != stamp && (opened[nb] != stamp || new_dist < dist[nb])) {
+                    opened[nb] = (uint32_t)stamp;
+                    parent[nb] = (int32_t)current;
+                    dist[nb] = new_dist;
+                    if (heap_push(&heap, new_dist + heuristic(&h, nb), nb) < 0 || vec_push(&trace, nb) < 0) {
+                        failed = 1;
+                        break;
+                    }
+                }
+            }
+            if (heap.len > max_open)
+                max_open = heap.len;
+        }
+        /* Every push but the ones still queued was popped; pops beyond the expansions were stale */
+        stale = trace.len + 1 - heap.len - expanded;
+    }
+    Py_END_ALLOW_THREADS
+
+    if (failed)
+        PyErr_NoMemory();
+    else
+        result = make_result(found, &trace, expanded, stale, max_open);
+    free(heap.data);
+    free(trace.data);
+    PyBuffer_Release(&dist_view);
+release_parent:
+    PyBuffer_Release(&parent_view);
+release_closed:
+    PyBuffer_Release(&closed_view);
+release_opened:
+    PyBuffer_Release(&opened_view);
+release_cells:
+    PyBuffer_Release(&cells);
+    if (costs.obj != NULL)
+        PyBuffer_Release(&costs);
+    return result;
+}
+
+PyDoc_STRVAR(path_doc,
+"path(parent, costs, rows, cols, source, target) -> (cells, cost)\n\n"
+"engine.build_path() and Grid.path_cost() together: the (row, col) cells\n"
+"from source to target following parent, and their cost.");
+
+static PyObject *
+k_path(PyObject *self, PyObject *args)
+{
+    PyObject *parent_obj, *costs_obj, *cells = NULL;
+    Py_ssize_t rows, cols, source, target, length = 0, i, node;
+    Py_buffer parent_view, costs;
+    const int32_t *parent;
+    IntVec nodes = {0};
+    double total = 0.0;
+    int diagonal_step = 0;
+
+    if (!PyArg_ParseTuple(args, "OOnnnn", &parent_obj, &costs_obj, &rows, &cols, &source, &target))
+        return NULL;
+    if (PyObject_GetBuffer(parent_obj, &parent_view, PyBUF_SIMPLE) < 0)
+        return NULL;
+    costs.obj = NULL;
+    if (costs_obj != Py_None && PyObject_GetBuffer(costs_obj, &costs, PyBUF_SIMPLE) < 0)
+        goto done;
+    if (parent_view.len < rows * cols * 4 || (costs.obj != NULL && costs.len < rows * cols)) {
+        PyErr_SetString(PyExc_ValueError, "buffers are smaller than the grid");
+        goto done;
+    }
+    parent = parent_view.buf;
+    for (node = target;; node = parent[node]) {
+        if (node < 0 || node >= rows * cols || nodes.len >= rows * cols) {
+            PyErr_SetString(PyExc_ValueError, "parent links do not lead back to the source");
+            goto done;
+        }
+        if (vec_push(&nodes, (int32_t)node) < 0) {
+            PyErr_NoMemory();
+            goto done;
+        }
+        if (node == source)
+            break;
+    }
+    length = nodes.len;
+    cells = PyList_New(length);
+    if (cells == NULL)
+        goto done;
+    /* nodes runs target to source; sum front to back like Grid.path_cost() */
+    for (i = 0; i < length; i++) {
+        Py_ssize_t current = nodes.data[length - 1 - i];
+        PyObject *cell = Py_BuildValue("(nn)", current / cols, current % cols);
+        if (cell == NULL) {
+            Py_CLEAR(cells);
+            goto done;
+        }
+        PyList_SET_ITEM(cells, i, cell);
+        if (i > 0) {
+            Py_ssize_t prev = nodes.data[length - i];
+            double step = costs.obj != NULL ? (double)((const uint8_t *)costs.buf)[current] : 1.0;
+            if (prev / cols == current / cols || prev % cols == current % cols) {
+                total += step;
+            } else {
+                total += step * SQRT2;
+                diagonal_step = 1;
+            }
+        }
+    }
+done:
+    free(nodes.data);
+    PyBuffer_Release(&parent_view);
+    if (costs.obj != NULL)
+        PyBuffer_Release(&costs);
+    if (cells == NULL)
+        return NULL;
+    /* Without diagonal steps Grid.path_cost() adds up ints */
+    if (diagonal_step)
+        return Py_BuildValue("(Nd)", cells, total);
+    return Py_BuildValue("(NL)", cells, (long long)total);
+}
+
+static PyMethodDef kernel_methods[] = {
+    {"bfs", k_bfs, METH_VARARGS, bfs_doc},
+    {"best_first", k_best_first, METH_VARARGS, best_first_doc},
+    {"path", k_path, METH_VARARGS, path_doc},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef kernel_module = {
+    PyModuleDef_HEAD_INIT, "_kernel", "Compiled BFS, Dijkstra and A* for the flat grid (see kernel.py).",
+    -1, kernel_methods
+};
+
+PyMODINIT_FUNC
+PyInit__kernel(void)
+{
+    SQRT2 = sqrt(2.0);
+    return PyModule_Create(&kernel_module);
+}
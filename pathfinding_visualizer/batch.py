@@ -0,0 +1,77 @@
+"""Solve many start/end queries on one wall layout with a process pool.
+
+The grid cells (and terrain costs) are copied once into a shared memory block; every worker
+attaches to it read-only at start-up instead of receiving its own pickled
+copy. Queries are sent out in chunks and results are yielded as soon as
+each chunk finishes, so they arrive in completion order, not query order.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+from components import components_for
+from engine import ALGORITHMS, solve
+from grid import Grid
+
+# Per-process state set up by _init_worker
+_worker_grid = None
+_worker_shm = None
+
+
+def _init_worker(shm_name, rows, cols, weighted, diagonal):
+    global _worker_grid, _worker_shm
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    size = rows * cols
+    buf = _worker_shm.buf.toreadonly()
+    costs = buf[size:2 * size] if weighted else None
+    _worker_grid = Grid(rows, cols, buf[:size], costs, diagonal)
+    components_for(_worker_grid).build()  # at start-up, not in the first query
+
+
+def _solve_chunk(chunk, algorithm, keep_trace, compiled=False):
+    results = []
+    if algorithm == "wavefront":
+        from wavefront import solve_many
+        solved = solve_many(_worker_grid, [query for _, query in chunk])
+    else:
+        solved = [solve(_worker_grid, start, end, algorithm, compiled=compiled) for _, (start, end) in chunk]
+    for (index, _), result in zip(chunk, solved):
+        if not keep_trace:
+            result.trace = array("i")
+        results.append((index, result))
+    return results
+
+
+def solve_batch(grid, queries, algorithm="astar", workers=None, chunksize=64, keep_trace=False,
+                compiled=False):
+    """Yield (query index, SearchResult) pairs as workers finish them.
+
+    `queries` is a list of ((start_row, start_col), (end_row, end_col)).
+    Traces are dropped before results are sent back unless keep_trace is set.
+    compiled is passed on to engine.solve().
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+    workers = workers or os.cpu_count() or 1
+    indexed = list(enumerate(queries))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+    if not chunks:
+        return
+
+    # Layout: wall cells, then the terrain costs if the grid has any
+    layers = 2 if grid.weighted else 1
+    shm = shared_memory.SharedMemory(create=True, size=max(grid.size * layers, 1))
+    try:
+        shm.buf[:grid.size] = grid.cells
+        if grid.weighted:
+            shm.buf[grid.size:2 * grid.size] = grid.costs
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, grid.rows, grid.cols,
+                                           grid.weighted, grid.diagonal)) as pool:
+            futures = [pool.submit(_solve_chunk, chunk, algorithm, keep_trace, compiled) for chunk in chunks]
+            for future in as_completed(futures):
+                yield from future.result()
+    finally:
+        shm.close()
+        shm.unlink()
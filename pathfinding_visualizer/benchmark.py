@@ -0,0 +1,464 @@
+"""Compare the flat-array engine against the original dict-based searches.
+
+Usage:
+    python benchmark.py [--rows 300] [--cols 600] [--density 0.25] [--queries 5] [--seed 1]
+                        [--terrain 0.3] [--diagonal] [--replan 200]
+                        [--batch-workers 1,2,4,8] [--batch-queries 2000] [--accelerated]
+                        [--landmarks 8] [--hpa 16] [--compiled] [--agents 500]
+                        [--parallel 2,4,8,16 [--parallel-size 4096]] [--prune]
+
+For every algorithm this prints the time per discovered node and the peak
+memory allocated during the searches (measured with tracemalloc), for both
+legacy.py and engine.py on the same random map and queries. With
+--batch-workers it also reports batch.py throughput per process count, and
+with --accelerated it compares the grid-specific searches (JPS,
+bidirectional BFS/A*, fringe search) against astar on open and maze maps.
+--replan N times D* Lite repairs against fresh astar runs over N random
+batches of wall toggles. --landmarks K builds a K-landmark ALT index for
+the random map and a maze and compares the A* variants with and without it.
+--hpa SIZE builds an HPA* hierarchy with SIZE x SIZE clusters on the random
+map, a maze and a rooms map and compares query latency, peak memory and
+path cost against flat astar. --compiled compares the C kernel (kernel.py)
+with the Python engine on the random map and a maze: expansions per second
+and whether paths, traces and stats are identical. --agents N routes N
+agents to one goal with one astar search each and with a shared flow field.
+--parallel W1,W2,... times one corner-to-corner query on a SIZE x SIZE
+random map (and a copy with terrain costs) with the sequential bfs and
+dijkstra and with parallel.py split over each worker count, checking that
+the path costs agree. --prune builds the dead-end and swamp pruning
+(pruning.py) on a maze, a braided maze, a rooms map and the random map and
+compares expanded nodes and query time with and without it.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+import engine
+import legacy
+import wavefront
+from grid import Grid
+
+
+def random_grid(rows, cols, density, rng):
+    grid = Grid(rows, cols)
+    for i in range(grid.size):
+        if rng.random() < density:
+            grid.cells[i] = 1
+    return grid
+
+
+def maze_grid(rows, cols, rng):
+    """Perfect maze carved by a randomized depth-first backtracker on odd cells."""
+    grid = Grid(rows, cols)
+    grid.cells[:] = bytes([1]) * grid.size
+    start = (1 % rows, 1 % cols)
+    grid.set_wall(*start, False)
+    stack = [start]
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc, r + dr // 2, c + dc // 2)
+                   for dr, dc in ((0, 2), (2, 0), (0, -2), (-2, 0))
+                   if 0 < r + dr < rows - 1 and 0 < c + dc < cols - 1 and grid.is_wall(r + dr, c + dc)]
+        if not options:
+            stack.pop()
+            continue
+        nr, nc, wr, wc = rng.choice(options)
+        grid.set_wall(wr, wc, False)
+        grid.set_wall(nr, nc, False)
+        stack.append((nr, nc))
+    return grid
+
+
+def braided_maze_grid(rows, cols, rng, loops=0.1):
+    """maze_grid with a fraction loops of the walls between two corridors knocked out."""
+    grid = maze_grid(rows, cols, rng)
+    for r in range(1, rows - 1):
+        for c in range(1, cols - 1):
+            if (r + c) % 2 and grid.is_wall(r, c) and rng.random() < loops:
+                if (not grid.is_wall(r - 1, c) and not grid.is_wall(r + 1, c)
+                        or not grid.is_wall(r, c - 1) and not grid.is_wall(r, c + 1)):
+                    grid.set_wall(r, c, False)
+    return grid
+
+
+def rooms_grid(rows, cols, rng, room=12):
+    """Rooms of about room x room cells separated by walls, one or two doors per wall."""
+    grid = Grid(rows, cols)
+    for r in range(room, rows, room + 1):
+        grid.cells[r * cols:(r + 1) * cols] = bytes([1]) * cols
+    for c in range(room, cols, room + 1):
+        for r in range(rows):
+            grid.cells[r * cols + c] = 1
+    # Open doors in every wall segment between two neighbouring rooms
+    for top in range(0, rows, room + 1):
+        bottom = min(top + room, rows)
+        for c in range(room, cols, room + 1):
+            for _ in range(rng.randint(1, 2)):
+                grid.cells[rng.randrange(top, bottom) * cols + c] = 0
+    for left in range(0, cols, room + 1):
+        right = min(left + room, cols)
+        for r in range(room, rows, room + 1):
+            for _ in range(rng.randint(1, 2)):
+                grid.cells[r * cols + rng.randrange(left, right)] = 0
+    return grid
+
+
+def random_queries(grid, count, rng):
+    open_cells = [i for i in range(grid.size) if not grid.cells[i]]
+    return [(grid.coords(rng.choice(open_cells)), grid.coords(rng.choice(open_cells)))
+            for _ in range(count)]
+
+
+def measure(func, grid, queries, flat):
+    """Run every query once, return (seconds, discovered nodes, peak bytes)."""
+    if flat:
+        grid.workspace()  # allocated once per grid, reported separately
+    nodes = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for start, end in queries:
+        if flat:
+            result = func(grid, grid.index(*start), grid.index(*end))
+        else:
+            result = func(grid, start, end)
+        nodes += len(result.trace)
+        del result
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, nodes, peak
+
+
+def compare_with_astar(maps, queries_per_map, rng):
+    """Run the grid-specific algorithms next to astar and check they agree on cost."""
+    names = ["astar", "jps", "bibfs", "biastar", "fringe"]
+    print(f"{'map':<8} {'algorithm':<10} {'nodes':>9} {'time s':>8} {'vs astar':>9} {'costs':>6}")
+    for label, grid in maps:
+        queries = random_queries(grid, queries_per_map, rng)
+        reference = [engine.solve(grid, s, e, "astar").cost for s, e in queries]
+        base = None
+        for name in names:
+            nodes = 0
+            same = True
+            started = time.perf_counter()
+            for (s, e), cost in zip(queries, reference):
+                result = engine.solve(grid, s, e, name)
+                nodes += len(result.trace)
+                same = same and result.cost == cost
+            elapsed = time.perf_counter() - started
+            base = base or elapsed
+            print(f"{label:<8} {name:<10} {nodes:>9} {elapsed:>8.3f} {base / elapsed:>8.2f}x {'ok' if same else 'DIFF':>6}")
+
+
+def compare_replanning(grid, edits, rng):
+    """Replay random wall toggles, replanning with D* Lite and with fresh astar runs."""
+    from dstar import DStarLite
+    start, end = random_queries(grid, 1, rng)[0]
+    cells = [grid.coords(i) for i in range(grid.size)]
+    stream = [[rng.choice(cells) for _ in range(rng.randint(1, 3))] for _ in range(edits)]
+    stream = [[cell for cell in batch if cell not in (start, end)] for batch in stream]
+
+    planner = DStarLite(grid, start, end)
+    incremental = full = 0.0
+    incremental_nodes = full_nodes = mismatches = 0
+    for batch in stream:
+        for cell in batch:
+            grid.toggle_wall(*cell)
+        started = time.perf_counter()
+        result = planner.plan()
+        incremental += time.perf_counter() - started
+        incremental_nodes += len(result.trace)
+        started = time.perf_counter()
+        reference = engine.solve(grid, start, end, "astar")
+        full += time.perf_counter() - started
+        full_nodes += len(reference.trace)
+        if result.cost != reference.cost and abs((result.cost or 0) - (reference.cost or 0)) > 1e-9:
+            mismatches += 1
+    planner.close()
+    print(f"Replanning over {edits} edit batches from {start} to {end}")
+    print(f"  D* Lite: {incremental:.3f}s, {incremental_nodes} nodes updated")
+    print(f"  astar:   {full:.3f}s, {full_nodes} nodes discovered")
+    print(f"  cost mismatches: {mismatches}")
+
+
+def compare_landmarks(maps, queries_per_map, count, rng):
+    """A* variants with the plain heuristic against the same searches on a landmark index."""
+    from landmarks import LandmarkIndex
+    print(f"{'map':<8} {'algorithm':<10} {'nodes':>9} {'time s':>8} {'ALT nodes':>10} {'ALT time':>9} {'costs':>6}")
+    for label, grid in maps:
+        queries = random_queries(grid, queries_per_map, rng)
+        started = time.perf_counter()
+        index = LandmarkIndex.build(grid, count)
+        print(f"{label:<8} {count} landmarks built in {time.perf_counter() - started:.2f}s, "
+              f"{sum(len(t) * t.itemsize for t in index.tables_from) / 1024:.0f} KiB")
+        for name in ("astar", "biastar", "fringe"):
+            runs = []
+            for use_index in (False, True):
+                grid.landmarks = index if use_index else None
+                nodes = 0
+                costs = []
+                started = time.perf_counter()
+                for start, end in queries:
+                    result = engine.solve(grid, start, end, name)
+                    nodes += len(result.trace)
+                    costs.append(result.cost)
+                runs.append((nodes, time.perf_counter() - started, costs))
+            (nodes, elapsed, costs), (alt_nodes, alt_elapsed, alt_costs) = runs
+            same = all(a == b or abs(a - b) < 1e-9 for a, b in zip(costs, alt_costs) if a is not None)
+            print(f"{label:<8} {name:<10} {nodes:>9} {elapsed:>8.3f} {alt_nodes:>10} {alt_elapsed:>9.3f} "
+                  f"{'ok' if same else 'DIFF':>6}")
+        index.close()
+
+
+def compare_hpa(maps, queries_per_map, cluster_size, rng):
+    """HPA* queries on a prebuilt hierarchy against flat astar: latency, peak memory, cost gap."""
+    from hpa import Hierarchy
+    print(f"{'map':<8} {'algorithm':<10} {'ms/query':>9} {'peak KiB':>10} {'nodes':>9} {'max gap':>8}")
+    for label, grid in maps:
+        queries = random_queries(grid, queries_per_map, rng)
+        started = time.perf_counter()
+        hierarchy = Hierarchy(grid, cluster_size)
+        print(f"{label:<8} {cluster_size}x{cluster_size} clusters built in {time.perf_counter() - started:.2f}s, "
+              f"~{hierarchy.nbytes() / 1024:.0f} KiB abstract graph")
+        grid.workspace()
+        costs = []
+        flat = lambda source, target: engine.astar(grid, source, target)
+        for name, search in (("astar", flat), ("hpa", hierarchy.search)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            results = [search(grid.index(*start), grid.index(*end)) for start, end in queries]
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if not costs:
+                costs = [result.cost for result in results]
+            gaps = [result.cost / best - 1 for result, best in zip(results, costs)
+                    if result.found and best]
+            print(f"{label:<8} {name:<10} {elapsed / len(queries) * 1000:>9.2f} {peak / 1024:>10.1f} "
+                  f"{sum(len(r.trace) for r in results):>9} {max(gaps, default=0):>8.3f}")
+        hierarchy.close()
+
+
+def compare_compiled(maps, queries_per_map, rng):
+    """Node-expansion throughput of the compiled kernel against the Python engine."""
+    import kernel
+    if not kernel.available():
+        print("Compiled kernel not built, run python build_kernel.py first")
+        return
+    print(f"{'map':<8} {'algorithm':<10} {'expanded':>9} {'Python/s':>10} {'kernel/s':>10} {'speedup':>8} {'same':>5}")
+    for label, grid in maps:
+        queries = [(grid.index(*s), grid.index(*e)) for s, e in random_queries(grid, queries_per_map, rng)]
+        grid.workspace()
+        for name, compiled in kernel.ALGORITHMS.items():
+            runs = []
+            for search in (engine.ALGORITHMS[name], compiled):
+                started = time.perf_counter()
+                results = [search(grid, source, target) for source, target in queries]
+                runs.append((time.perf_counter() - started, results))
+            (elapsed, results), (compiled_elapsed, compiled_results) = runs
+            same = all(a.path == b.path and a.trace == b.trace and a.cost == b.cost
+                       and a.stats.as_dict() == b.stats.as_dict()
+                       for a, b in zip(results, compiled_results))
+            expanded = sum(result.stats.expanded for result in results)
+            print(f"{label:<8} {name:<10} {expanded:>9} {expanded / elapsed:>10.0f} "
+                  f"{expanded / compiled_elapsed:>10.0f} {elapsed / compiled_elapsed:>7.1f}x "
+                  f"{'ok' if same else 'DIFF':>5}")
+
+
+def compare_flow_field(maps, agents, rng):
+    """N agents heading for one goal: an astar search each against one shared flow field."""
+    from flowfield import FlowField
+    print(f"{'map':<8} {'agents':>7} {'astar s':>8} {'field s':>8} {'build s':>8} {'speedup':>8} {'costs':>6}")
+    for label, grid in maps:
+        queries = random_queries(grid, agents + 1, rng)
+        goal = grid.index(*queries[0][1])
+        starts = [grid.index(*start) for start, _ in queries[1:]]
+        grid.workspace()
+        started = time.perf_counter()
+        costs = [engine.astar(grid, start, goal).cost for start in starts]
+        elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        field = FlowField(grid, goal)
+        built = time.perf_counter() - started
+        results = [field.search(start) for start in starts]
+        field_elapsed = time.perf_counter() - started
+        same = all(r.cost == c or (r.cost is not None and c is not None and abs(r.cost - c) < 1e-9)
+                   for r, c in zip(results, costs))
+        print(f"{label:<8} {agents:>7} {elapsed:>8.3f} {field_elapsed:>8.3f} {built:>8.3f} "
+              f"{elapsed / field_elapsed:>7.1f}x {'ok' if same else 'DIFF':>6}")
+
+
+def compare_parallel(size, density, worker_counts, rng):
+    """One large query, sequential against frontier-parallel BFS and delta-stepping."""
+    from parallel import ParallelSearch
+    grid = random_grid(size, size, density, rng)
+    source, target = 0, grid.size - 1
+    grid.cells[source] = grid.cells[target] = 0
+    weighted = grid.copy()
+    weighted.costs = bytearray(rng.randint(2, 9) if rng.random() < 0.3 else 1 for _ in range(grid.size))
+    print(f"Parallel single query, {size}x{size}, {density:.0%} walls, corner to corner")
+    print(f"{'map':<9} {'algorithm':<9} {'workers':>7} {'time s':>8} {'speedup':>8} {'cost':>10} {'same':>5}")
+    for label, grid, name in (("random", grid, "bfs"), ("random", grid, "dijkstra"), ("terrain", weighted, "dijkstra")):
+        started = time.perf_counter()
+        reference = engine.ALGORITHMS[name](grid, source, target)
+        base = time.perf_counter() - started
+        print(f"{label:<9} {name:<9} {'seq':>7} {base:>8.2f} {1:>7.2f}x {str(reference.cost):>10}")
+        for workers in worker_counts:
+            with ParallelSearch(grid, workers) as pool:  # process start-up not timed
+                started = time.perf_counter()
+                result = pool.bfs(source, target) if name == "bfs" else pool.dijkstra(source, target)
+                elapsed = time.perf_counter() - started
+            same = result.cost == reference.cost or (
+                result.cost is not None and reference.cost is not None and abs(result.cost - reference.cost) < 1e-9)
+            print(f"{label:<9} {name:<9} {workers:>7} {elapsed:>8.2f} {base / elapsed:>7.2f}x "
+                  f"{str(result.cost):>10} {'ok' if same else 'DIFF':>5}")
+
+
+def compare_pruning(maps, queries_per_map, rng):
+    """Searches on the full grid against the same searches skipping dead ends and swamps."""
+    from pruning import pruning_for
+    print(f"{'map':<8} {'algorithm':<10} {'expanded':>9} {'time s':>8} {'pruned':>9} {'time s':>8} "
+          f"{'speedup':>8} {'costs':>6}")
+    for label, grid in maps:
+        queries = random_queries(grid, queries_per_map, rng)
+        started = time.perf_counter()
+        counts = pruning_for(grid).counts()
+        open_cells = grid.size - sum(grid.cells)
+        print(f"{label:<8} pruning built in {time.perf_counter() - started:.2f}s: "
+              f"{counts['dead_ends']} dead-end and {counts['swamp_cells']} swamp cells "
+              f"({counts['swamps']} swamps) of {open_cells} open")
+        names = ("bfs", "dijkstra", "astar") if grid.uniform else ("dijkstra", "astar")
+        for name in names:
+            runs = []
+            for prune in (False, True):
+                expanded = 0
+                costs = []
+                started = time.perf_counter()
+                for start, end in queries:
+                    result = engine.solve(grid, start, end, name, prune=prune)
+                    expanded += result.stats.expanded
+                    costs.append(result.cost)
+                runs.append((expanded, time.perf_counter() - started, costs))
+            (expanded, elapsed, costs), (pruned, pruned_elapsed, pruned_costs) = runs
+            same = all(a == b or a is not None and b is not None and abs(a - b) < 1e-9
+                       for a, b in zip(costs, pruned_costs))
+            print(f"{label:<8} {name:<10} {expanded:>9} {elapsed:>8.3f} {pruned:>9} {pruned_elapsed:>8.3f} "
+                  f"{elapsed / pruned_elapsed:>7.1f}x {'ok' if same else 'DIFF':>6}")
+        grid.pruning.close()
+
+
+def measure_batch(grid, queries, algorithm, worker_counts):
+    """Print batch throughput for each process count."""
+    from batch import solve_batch
+    print(f"Batch {algorithm}, {len(queries)} queries")
+    base = None
+    for workers in worker_counts:
+        started = time.perf_counter()
+        for _ in solve_batch(grid, queries, algorithm, workers=workers):
+            pass
+        rate = len(queries) / (time.perf_counter() - started)
+        base = base or rate
+        print(f"  {workers:>3} workers: {rate:>9.1f} queries/s  ({rate / base:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark flat vs dict-based searches.")
+    parser.add_argument("--rows", type=int, default=300)
+    parser.add_argument("--cols", type=int, default=600)
+    parser.add_argument("--density", type=float, default=0.25)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--terrain", type=float, default=0.0,
+                        help="fraction of open cells given a random terrain cost 2-9")
+    parser.add_argument("--diagonal", action="store_true", help="allow diagonal moves")
+    parser.add_argument("--batch-workers", default="",
+                        help="comma separated process counts, e.g. 1,2,4,8, to measure batch scaling")
+    parser.add_argument("--batch-queries", type=int, default=2000)
+    parser.add_argument("--replan", type=int, default=0, metavar="EDITS",
+                        help="compare D* Lite against full astar replanning over this many random edit batches")
+    parser.add_argument("--accelerated", action="store_true",
+                        help="compare jps/bibfs/biastar/fringe with astar on open and maze maps")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="compare A* variants with and without a K-landmark ALT index")
+    parser.add_argument("--hpa", type=int, default=0, metavar="SIZE",
+                        help="compare HPA* with SIZE x SIZE clusters against flat astar")
+    parser.add_argument("--compiled", action="store_true",
+                        help="compare the compiled bfs/dijkstra/astar kernel with the Python engine")
+    parser.add_argument("--agents", type=int, default=0, metavar="N",
+                        help="route N agents to one goal with astar runs and with one flow field")
+    parser.add_argument("--parallel", default="",
+                        help="comma separated process counts, e.g. 2,4,8,16, to time one large query split over them")
+    parser.add_argument("--parallel-size", type=int, default=4096,
+                        help="rows and columns of the --parallel map")
+    parser.add_argument("--prune", action="store_true",
+                        help="compare searches with and without dead-end and swamp pruning")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    grid = random_grid(args.rows, args.cols, args.density, rng)
+    if args.terrain:
+        for i in range(grid.size):
+            if rng.random() < args.terrain:
+                grid.set_cost(*grid.coords(i), rng.randint(2, 9))
+    grid.diagonal = args.diagonal
+    queries = random_queries(grid, args.queries, rng)
+
+    print(f"Grid {args.rows}x{args.cols}, {args.density:.0%} walls, {len(queries)} queries")
+    print(f"Grid cells: {grid.nbytes() / 1024:.1f} KiB, "
+          f"reusable search arrays: {grid.workspace().nbytes() / 1024:.1f} KiB")
+    print(f"{'algorithm':<10} {'impl':<7} {'nodes':>9} {'time s':>8} {'us/node':>8} {'peak KiB':>10}")
+    for name in engine.ALGORITHMS:
+        impls = [("flat", engine.ALGORITHMS[name], True)]
+        if name in ("jps", "wavefront") and not grid.uniform:
+            continue
+        if name in legacy.ALGORITHMS and grid.uniform:
+            impls.insert(0, ("dict", legacy.ALGORITHMS[name], False))
+        elif name == "wavefront" and wavefront.np is None:
+            continue
+        for impl, func, flat in impls:
+            elapsed, nodes, peak = measure(func, grid, queries, flat)
+            per_node = elapsed / nodes * 1e6 if nodes else 0.0
+            print(f"{name:<10} {impl:<7} {nodes:>9} {elapsed:>8.3f} {per_node:>8.2f} {peak / 1024:>10.1f}")
+
+    if args.accelerated:
+        maps = [("open", Grid(args.rows, args.cols)), ("maze", maze_grid(args.rows, args.cols, rng))]
+        compare_with_astar(maps, args.queries, rng)
+
+    if args.landmarks:
+        maps = [("random", grid), ("maze", maze_grid(args.rows, args.cols, rng))]
+        compare_landmarks(maps, args.queries, args.landmarks, rng)
+
+    if args.hpa:
+        maps = [("random", grid), ("maze", maze_grid(args.rows, args.cols, rng)),
+                ("rooms", rooms_grid(args.rows, args.cols, rng))]
+        compare_hpa(maps, args.queries, args.hpa, rng)
+
+    if args.compiled:
+        maps = [("random", grid), ("maze", maze_grid(args.rows, args.cols, rng))]
+        compare_compiled(maps, args.queries, rng)
+
+    if args.agents:
+        maps = [("random", grid), ("maze", maze_grid(args.rows, args.cols, rng))]
+        compare_flow_field(maps, args.agents, rng)
+
+    if args.prune:
+        maps = [("maze", maze_grid(args.rows, args.cols, rng)),
+                ("braided", braided_maze_grid(args.rows, args.cols, rng)),
+                ("rooms", rooms_grid(args.rows, args.cols, rng)), ("random", grid)]
+        compare_pruning(maps, args.queries, rng)
+
+    if args.replan:
+        compare_replanning(grid, args.replan, rng)
+
+    if args.parallel:
+        worker_counts = [int(n) for n in args.parallel.split(",")]
+        compare_parallel(args.parallel_size, args.density, worker_counts, rng)
+
+    if args.batch_workers:
+        worker_counts = [int(n) for n in args.batch_workers.split(",")]
+        measure_batch(grid, random_queries(grid, args.batch_queries, rng), "astar", worker_counts)
+
+
+if __name__ == "__main__":
+    main()
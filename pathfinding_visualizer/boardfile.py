@@ -0,0 +1,172 @@
+"""Binary board files and streaming map importers.
+
+A board file keeps a whole board: walls, terrain costs, start and end.
+
+    header   HEADER below; start/end are -1 when unset
+    walls    one bit per cell in node order, most significant bit first,
+             the last byte padded with zeros
+    costs    one byte per cell, only when the COSTS flag is set
+
+Only the terrain layer is used in place, as a copy-on-write view of the
+file's mapping: its pages are read as searches touch them and edits never
+reach the file. The wall layer is not mapped. It is unpacked, a block at a
+time, into the grid's bytearray, which takes one byte per cell of memory
+(eight times its size in the file) however little of the map is searched.
+
+load_map() opens board files, Moving AI benchmark maps ("type octile"
+header, see https://movingai.com/benchmarks/formats.html) and the plain
+text maps of Grid.load(); the Moving AI importer reads one row at a time.
+Convert a map once for fast loading with:
+
+    python boardfile.py input.map output.board
+"""
+import argparse
+import mmap
+import struct
+import sys
+import time
+
+from grid import Grid, WALL
+
+MAGIC = b"PVB1"
+HEADER = struct.Struct("<4sBBHIIiiii")  # magic, version, flags, reserved, rows, cols, start r/c, end r/c
+VERSION = 1
+COSTS = 1
+DIAGONAL = 2
+
+BLOCK_BYTES = 1 << 17  # packed bytes handled per step, 1M cells
+
+# Moving AI terrain: '.' and 'G' are ground, 'S' swamp (passable), the rest
+# ('@', 'O' out of bounds, 'T' trees, 'W' water) is treated as wall
+MOVINGAI_OPEN = b".GS"
+_MOVINGAI_TABLE = bytes(0 if chr(i).encode() in MOVINGAI_OPEN else WALL for i in range(256))
+_NONZERO = bytes([0]) + bytes([1]) * 255
+
+
+def pack_bits(cells):
+    """Pack 0/1 cells into bytes, eight per byte, most significant bit first."""
+    cells = bytes(cells).translate(_NONZERO)
+    cells += bytes(-len(cells) % 8)
+    count = len(cells) // 8
+    packed = 0
+    # Byte k of every group of 8 becomes bit 7 - k; the shifted digits never carry
+    for k in range(8):
+        packed |= int.from_bytes(cells[k::8], "big") << (7 - k)
+    return packed.to_bytes(count, "big")
+
+
+def unpack_bits(packed, count):
+    """The first count cells stored in packed, as a bytearray of 0/1."""
+    width = len(packed)
+    value = int.from_bytes(packed, "big")
+    ones = int.from_bytes(b"\x01" * width, "big")
+    cells = bytearray(8 * width)
+    for k in range(8):
+        cells[k::8] = ((value >> (7 - k)) & ones).to_bytes(width, "big")
+    del cells[count:]
+    return cells
+
+
+def save(path, grid, start=None, end=None):
+    """Write grid (and the start/end cells, if set) as a board file."""
+    flags = (COSTS if grid.costs is not None else 0) | (DIAGONAL if grid.diagonal else 0)
+    sr, sc = start or (-1, -1)
+    er, ec = end or (-1, -1)
+    block = BLOCK_BYTES * 8
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, 0, grid.rows, grid.cols, sr, sc, er, ec))
+        for first in range(0, grid.size, block):
+            f.write(pack_bits(grid.cells[first:first + block]))
+        if grid.costs is not None:
+            f.write(grid.costs)
+
+
+def load(path):
+    """Map a board file; returns (grid, start, end), start/end None when unset."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    try:
+        magic, version, flags, _, rows, cols, sr, sc, er, ec = HEADER.unpack_from(mm)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a board file")
+        if version != VERSION:
+            raise ValueError(f"{path} has board format version {version}, expected {VERSION}")
+        size = rows * cols
+        wall_bytes = -(-size // 8)
+        expected = HEADER.size + wall_bytes + (size if flags & COSTS else 0)
+        if len(mm) < expected:
+            raise ValueError(f"{path} is truncated ({len(mm)} bytes, expected {expected})")
+        cells = bytearray(size)
+        offset = HEADER.size
+        for first in range(0, wall_bytes, BLOCK_BYTES):
+            stop = min(first + BLOCK_BYTES, wall_bytes)
+            count = min((stop - first) * 8, size - first * 8)
+            cells[first * 8:first * 8 + count] = unpack_bits(mm[offset + first:offset + stop], count)
+    except (ValueError, struct.error):
+        mm.close()
+        raise
+    costs = None
+    if flags & COSTS:
+        offset += wall_bytes
+        costs = memoryview(mm)[offset:offset + size]  # keeps the mapping alive
+    else:
+        mm.close()
+    grid = Grid(rows, cols, cells, costs, bool(flags & DIAGONAL))
+    start = (sr, sc) if sr >= 0 and grid.in_bounds(sr, sc) else None
+    end = (er, ec) if er >= 0 and grid.in_bounds(er, ec) else None
+    return grid, start, end
+
+
+def import_movingai(f, name="map"):
+    """Read a Moving AI .map file from binary file object f, one row at a time."""
+    header = {}
+    for line in f:
+        line = line.strip()
+        if line == b"map":
+            break
+        key, _, value = line.decode("ascii", "replace").partition(" ")
+        header[key.lower()] = value.strip()
+    try:
+        rows, cols = int(header["height"]), int(header["width"])
+    except (KeyError, ValueError):
+        raise ValueError(f"{name}: missing or bad height/width in the Moving AI header") from None
+    grid = Grid(rows, cols, diagonal=header.get("type") == "octile")
+    cells = grid.cells
+    for r in range(rows):
+        line = f.readline().rstrip(b"\r\n")
+        if len(line) != cols:
+            raise ValueError(f"{name}: row {r} has {len(line)} cells, expected {cols}")
+        cells[r * cols:(r + 1) * cols] = line.translate(_MOVINGAI_TABLE)
+    return grid
+
+
+def load_map(path):
+    """Open any supported map file; returns (grid, start, end)."""
+    with open(path, "rb") as f:
+        head = f.read(len(MAGIC))
+        if head == b"type":
+            f.seek(0)
+            return import_movingai(f, path), None, None
+    if head == MAGIC:
+        return load(path)
+    return Grid.load(path), None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a map (Moving AI .map, text or board) to a board file.")
+    parser.add_argument("map_file")
+    parser.add_argument("output")
+    parser.add_argument("--diagonal", action="store_true", help="mark the board as using diagonal moves")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    grid, start, end = load_map(args.map_file)
+    grid.diagonal = grid.diagonal or args.diagonal
+    save(args.output, grid, start, end)
+    print(f"{grid.rows}x{grid.cols} board written to {args.output} "
+          f"in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Bounded cache of search results.
+
+Results are keyed on the grid's content hash (see Grid.content_hash(),
+updated incrementally as cells are edited), its size and movement model,
+the endpoints, the algorithm, whether a landmark index was in use and
+whether the search was pruned (a pruned bfs on a diagonal or weighted grid
+may take another path), so an edit to the grid simply makes the old
+entries unreachable until they are evicted. Eviction is
+least-recently-used, bounded both by entry count and by the approximate
+bytes held in paths and traces.
+
+Cached SearchResult objects are shared between hits; treat them as
+read-only.
+"""
+import sys
+from collections import OrderedDict
+
+from engine import solve
+
+PATH_CELL_BYTES = 64  # rough size of one (row, col) tuple in a path list
+
+
+def result_size(result):
+    """Approximate bytes held by a result's path and trace."""
+    trace = result.trace
+    itemsize = getattr(trace, "itemsize", 8)
+    return len(trace) * itemsize + len(result.path) * PATH_CELL_BYTES + sys.getsizeof(result)
+
+
+class ResultCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (result, size), oldest first
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, grid, start, end, algorithm, prune=False):
+        index = grid.landmarks
+        return (grid.content_hash(), grid.rows, grid.cols, grid.diagonal,
+                tuple(start), tuple(end), algorithm, index is not None and index.valid, prune)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, result):
+        size = result_size(result)
+        if size > self.max_bytes:
+            return  # would evict everything else and still not fit
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self.entries[key] = (result, size)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def solve(self, grid, start, end, algorithm="astar", compiled=False, prune=False, recorder=None):
+        """engine.solve() through the cache.
+
+        compiled results equal the Python engine's, so both share entries.
+        recorder only hears of the searches that run, not of cache hits; a
+        search it stops is not cached.
+        """
+        if start is None or end is None:
+            return solve(grid, start, end, algorithm)  # let the engine report it
+        key = self.key(grid, start, end, algorithm, prune)
+        result = self.get(key)
+        if result is None:
+            result = solve(grid, start, end, algorithm, compiled=compiled, recorder=recorder, prune=prune)
+            self.put(key, result)
+        return result
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
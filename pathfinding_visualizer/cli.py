@@ -0,0 +1,178 @@
+"""Batch mode: solve start/end queries from a file without opening a window.
+
+Usage:
+    python cli.py MAP_FILE QUERY_FILE [--algorithm astar] [--output results.txt]
+                  [--diagonal] [--workers N] [--trace stats.jsonl [--trace-nodes]]
+                  [--open-list heap|indexed|bucket] [--tie-break g] [--compiled]
+                  [--record searches.pvt] [--parallel N] [--prune]
+
+MAP_FILE holds one text row per grid row ('#' = wall, digits 2-9 = terrain
+cost of entering that cell, anything else = empty, cost 1), or is a board
+file or Moving AI .map (see boardfile.py).
+QUERY_FILE holds one query per line: "start_row start_col end_row end_col".
+Each output line repeats the query followed by the path cost (-1 if there is
+no path) and the number of cells discovered. With --workers N the queries
+are spread over N processes sharing one read-only copy of the map.
+If MAP_FILE.alt exists (see landmarks.py) and matches the map, the A*
+variants use its landmark bounds; --no-landmarks ignores it.
+With --trace every search's statistics (see engine.SearchStats) are written
+to a file as one JSON object per line, plus the visited node ids with
+--trace-nodes.
+--compiled runs bfs, dijkstra and astar in the C kernel (see kernel.py;
+build it with build_kernel.py), with the same results as the Python engine.
+--parallel N splits every single bfs or dijkstra query over N processes
+(see parallel.py), for a few very large queries rather than many small ones.
+--record writes every search's pushes, pops and path to one compact binary
+file (see tracefile.py) that the visualizer's "Load Trace" button replays.
+--prune skips the map's dead ends and swamps (see pruning.py), built once
+before the first query and shared by all of them.
+"""
+import argparse
+import sys
+import time
+
+from boardfile import load_map
+from engine import (ALGORITHMS, COMPILED_ALGORITHMS, OPEN_LIST_ALGORITHMS, PARALLEL_ALGORITHMS,
+                    PRUNE_ALGORITHMS, solve, write_trace)
+from openlist import KINDS
+from tracefile import TraceWriter
+
+
+def read_queries(path):
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.replace(",", " ").split()
+            if len(parts) != 4:
+                raise ValueError(f"{path}:{line_no}: expected 4 numbers, got '{line}'")
+            r1, c1, r2, c2 = (int(p) for p in parts)
+            yield (r1, c1), (r2, c2)
+
+
+def format_result(result):
+    (r1, c1), (r2, c2) = result.start, result.end
+    cost = result.cost if result.found else -1
+    if isinstance(cost, float):
+        cost = round(cost, 4)
+    return f"{r1} {c1} {r2} {c2} {cost} {len(result.trace)}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve pathfinding queries headlessly.")
+    parser.add_argument("map_file")
+    parser.add_argument("query_file")
+    parser.add_argument("--algorithm", "-a", default="astar", choices=sorted(ALGORITHMS))
+    parser.add_argument("--output", "-o", help="write results here instead of stdout")
+    parser.add_argument("--diagonal", action="store_true",
+                        help="allow diagonal moves (octile costs, no corner cutting)")
+    parser.add_argument("--workers", "-j", type=int, default=1,
+                        help="solve in this many processes (results then come out in completion order)")
+    parser.add_argument("--cache", type=int, default=0, metavar="N",
+                        help="keep up to N results so repeated queries are answered without searching")
+    parser.add_argument("--no-landmarks", action="store_true",
+                        help="do not use the MAP_FILE.alt landmark index even if there is one")
+    parser.add_argument("--trace", help="write per-search statistics here, one JSON line per query")
+    parser.add_argument("--trace-nodes", action="store_true",
+                        help="include the visited node ids in the --trace file")
+    parser.add_argument("--open-list", choices=KINDS,
+                        help=f"priority queue for {', '.join(OPEN_LIST_ALGORITHMS)} (default heap, see openlist.py)")
+    parser.add_argument("--tie-break", choices=["g"],
+                        help="among equal priorities expand the node with the larger g first")
+    parser.add_argument("--compiled", action="store_true",
+                        help=f"run {', '.join(COMPILED_ALGORITHMS)} in the compiled kernel (see kernel.py)")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record every search's events here as binary traces (see tracefile.py)")
+    parser.add_argument("--parallel", type=int, metavar="N",
+                        help=f"split each {' or '.join(PARALLEL_ALGORITHMS)} query over N processes (see parallel.py)")
+    parser.add_argument("--prune", action="store_true",
+                        help="skip dead ends and swamps that no shortest path needs (see pruning.py)")
+    args = parser.parse_args(argv)
+    if args.parallel:
+        if args.algorithm not in PARALLEL_ALGORITHMS:
+            parser.error(f"--parallel applies to {', '.join(PARALLEL_ALGORITHMS)} only")
+        if args.workers > 1 or args.cache or args.compiled or args.open_list or args.tie_break:
+            parser.error("--parallel cannot be combined with --workers, --cache, --compiled, "
+                         "--open-list or --tie-break")
+    if args.cache and (args.workers > 1 or args.algorithm == "wavefront"):
+        parser.error("--cache cannot be combined with --workers or the wavefront algorithm")
+    if args.record and (args.workers > 1 or args.cache or args.algorithm == "wavefront"):
+        parser.error("--record cannot be combined with --workers, --cache or the wavefront algorithm")
+    if args.prune:
+        if args.algorithm not in PRUNE_ALGORITHMS:
+            parser.error(f"--prune applies to {', '.join(PRUNE_ALGORITHMS)} only")
+        if args.workers > 1:
+            parser.error("--prune cannot be combined with --workers")
+    open_list = {"open_list": args.open_list, "tie_break": args.tie_break}
+    if args.open_list or args.tie_break:
+        if args.algorithm not in OPEN_LIST_ALGORITHMS:
+            parser.error(f"--open-list and --tie-break apply to {', '.join(OPEN_LIST_ALGORITHMS)} only")
+        if args.workers > 1 or args.cache:
+            parser.error("--open-list and --tie-break cannot be combined with --workers or --cache")
+    if args.compiled:
+        if args.algorithm not in COMPILED_ALGORITHMS:
+            parser.error(f"--compiled applies to {', '.join(COMPILED_ALGORITHMS)} only")
+        if args.open_list or args.tie_break:
+            parser.error("--compiled cannot be combined with --open-list or --tie-break")
+        import kernel
+        if not kernel.available():
+            print("Compiled kernel not built (python build_kernel.py), using the Python engine",
+                  file=sys.stderr)
+
+    grid, _, _ = load_map(args.map_file)
+    grid.diagonal = grid.diagonal or args.diagonal
+    if not args.no_landmarks:
+        from landmarks import load_for
+        index = load_for(grid, args.map_file)
+        if index is not None and not index.valid:
+            print("Landmark index was built for a different movement model, ignoring it", file=sys.stderr)
+    out = open(args.output, "w") if args.output else sys.stdout
+    trace_file = open(args.trace, "w") if args.trace else None
+    record_file = open(args.record, "wb") if args.record else None
+    recorder = TraceWriter(record_file) if record_file else None
+    solved = 0
+    started = time.perf_counter()
+    try:
+        if args.workers > 1:
+            from batch import solve_batch
+            queries = list(read_queries(args.query_file))
+            results = (result for _, result in
+                       solve_batch(grid, queries, args.algorithm, args.workers, keep_trace=True,
+                                   compiled=args.compiled))
+        elif args.algorithm == "wavefront":
+            # One distance field answers every query sharing an endpoint
+            from wavefront import solve_many
+            results = solve_many(grid, list(read_queries(args.query_file)))
+        elif args.cache:
+            from cache import ResultCache
+            cache = ResultCache(max_entries=args.cache)
+            results = (cache.solve(grid, start, end, args.algorithm, compiled=args.compiled, prune=args.prune)
+                       for start, end in read_queries(args.query_file))
+        else:
+            results = (solve(grid, start, end, args.algorithm, compiled=args.compiled, recorder=recorder,
+                             workers=args.parallel, prune=args.prune, **open_list)
+                       for start, end in read_queries(args.query_file))
+        for result in results:
+            out.write(format_result(result) + "\n")
+            if trace_file:
+                write_trace(result, trace_file, args.trace_nodes)
+            solved += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if trace_file:
+            trace_file.close()
+        if record_file:
+            record_file.close()
+    elapsed = time.perf_counter() - started
+    print(f"Solved {solved} queries with {args.algorithm} in {elapsed:.3f}s", file=sys.stderr)
+    if args.cache:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
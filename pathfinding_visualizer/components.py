@@ -0,0 +1,211 @@
+"""Connected-component labels for instant "no path" answers.
+
+Every open cell carries a label; two cells are connected exactly when their
+labels lead to the same union-find root. Diagonal moves may not cut wall
+corners, so they never join cells that are not already joined through
+orthogonal moves, and terrain costs do not matter: one labelling serves
+every movement model.
+
+The labels follow grid edits:
+  - opening a cell unions the labels of its open neighbours, O(1);
+  - closing a cell is free unless its open neighbours stop touching each
+    other around it. Then one breadth-first search per neighbour runs in
+    lockstep; searches that meet are merged, and any that runs out of cells
+    before the last one standing has found a separate region and relabels
+    it. The work is bounded by the smaller side of the split.
+  - clear() and writes that bypass the grid API are not tracked
+    incrementally; clear() just drops the labels until the next query.
+"""
+from array import array
+from collections import deque
+
+# Neighbourhood ring around a cell, in circular order (orthogonals at even positions)
+RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+class Components:
+    def __init__(self, grid):
+        self.grid = grid
+        self.labels = None  # label per cell, -1 for walls; None until first needed
+        self.parent = []    # union-find over labels
+        grid.subscribe(self._cell_changed)
+
+    def close(self):
+        self.grid.unsubscribe(self._cell_changed)
+        if self.grid.components is self:
+            self.grid.components = None
+
+    # --- building ---
+
+    def _open_neighbours(self, node):
+        """Orthogonal open neighbours of node."""
+        grid = self.grid
+        cells, cols = grid.cells, grid.cols
+        r, c = divmod(node, cols)
+        if c + 1 < cols and not cells[node + 1]:
+            yield node + 1
+        if r + 1 < grid.rows and not cells[node + cols]:
+            yield node + cols
+        if c > 0 and not cells[node - 1]:
+            yield node - 1
+        if r > 0 and not cells[node - cols]:
+            yield node - cols
+
+    def build(self):
+        """Label every open cell from scratch with breadth-first floods."""
+        grid = self.grid
+        cells = grid.cells
+        labels = array("i", [-1]) * grid.size
+        parent = []
+        neighbours = self._open_neighbours
+        if not isinstance(cells, (bytes, bytearray)):
+            cells = bytes(cells)  # e.g. a shared memory view, which has no find()
+        node = cells.find(0)
+        while node != -1:
+            if labels[node] == -1:
+                label = len(parent)
+                parent.append(label)
+                labels[node] = label
+                queue = deque([node])
+                while queue:
+                    for nb in neighbours(queue.popleft()):
+                        if labels[nb] == -1:
+                            labels[nb] = label
+                            queue.append(nb)
+            node = cells.find(0, node + 1)
+        self.labels, self.parent = labels, parent
+
+    def find(self, label):
+        parent = self.parent
+        root = label
+        while parent[root] != root:
+            root = parent[root]
+        while parent[label] != root:  # path compression
+            parent[label], label = root, parent[label]
+        return root
+
+    def component(self, node):
+        """Root label of an open cell's region, -1 for walls."""
+        if self.labels is None:
+            self.build()
+        label = self.labels[node]
+        return -1 if label == -1 else self.find(label)
+
+    # --- queries ---
+
+    def connected(self, source, target):
+        """False when no search from node source can reach node target.
+
+        Mirrors the searches: the target must be open, while a start inside a
+        wall may still step out onto its open neighbours.
+        """
+        if source == target:
+            return True
+        if self.grid.cells[target]:
+            return False
+        goal = self.component(target)
+        if not self.grid.cells[source]:
+            return self.component(source) == goal
+        return any(self.component(nb) == goal for nb in self._open_neighbours(source))
+
+    # --- maintenance ---
+
+    def _cell_changed(self, node):
+        if self.labels is None:
+            return
+        if node is None:
+            self.labels = None  # rebuilt on the next query
+            return
+        wall = self.grid.cells[node]
+        if wall and self.labels[node] != -1:
+            self.labels[node] = -1
+            self._closed(node)
+        elif not wall and self.labels[node] == -1:
+            self._opened(node)
+        # otherwise a terrain cost changed, which connectivity ignores
+
+    def _opened(self, node):
+        roots = {self.component(nb) for nb in self._open_neighbours(node)}
+        if not roots:
+            label = len(self.parent)
+            self.parent.append(label)
+        else:
+            label = roots.pop()
+            for root in roots:
+                self.parent[root] = label
+        self.labels[node] = label
+
+    def _ring_connected(self, node):
+        """True if node's open orthogonal neighbours touch each other around it."""
+        grid = self.grid
+        cells, rows, cols = grid.cells, grid.rows, grid.cols
+        r, c = divmod(node, cols)
+        ring = []
+        for dr, dc in RING:
+            nr, nc = r + dr, c + dc
+            ring.append(0 <= nr < rows and 0 <= nc < cols and not cells[nr * cols + nc])
+        # Count circular runs of open ring cells that contain an orthogonal neighbour
+        runs = 0
+        for i in range(0, 8, 2):
+            if ring[i]:
+                # A run starts here unless it continues from the previous orthogonal
+                if not (ring[i - 1] and ring[i - 2]):
+                    runs += 1
+        if runs == 0 and all(ring[i] for i in range(0, 8, 2)):
+            runs = 1  # the whole ring is open
+        return runs <= 1
+
+    def _closed(self, node):
+        starts = list(self._open_neighbours(node))
+        if len(starts) < 2 or self._ring_connected(node):
+            return
+        # Lockstep floods, one per neighbour; owner[cell] = index of the flood that reached it
+        owner = {start: i for i, start in enumerate(starts)}
+        groups = list(range(len(starts)))  # union-find over floods
+        queues = [deque([start]) for start in starts]
+        members = [[start] for start in starts]
+
+        def group(i):
+            while groups[i] != i:
+                i = groups[i]
+            return i
+
+        neighbours = self._open_neighbours
+        active = set(range(len(starts)))
+        while len({group(i) for i in active}) > 1:
+            for i in list(active):
+                queue = queues[i]
+                if not queue:
+                    active.discard(i)
+                    g = group(i)
+                    if not any(group(j) == g for j in active) and active:
+                        self._relabel(g, members, groups)
+                    continue
+                for nb in neighbours(queue.popleft()):
+                    j = owner.get(nb)
+                    if j is None:
+                        owner[nb] = i
+                        queue.append(nb)
+                        members[i].append(nb)
+                    elif group(j) != group(i):
+                        groups[group(j)] = group(i)
+
+    def _relabel(self, g, members, groups):
+        """Give the cells found by every flood in group g a fresh label."""
+        label = len(self.parent)
+        self.parent.append(label)
+        labels = self.labels
+        for i, cells in enumerate(members):
+            j = i
+            while groups[j] != j:
+                j = groups[j]
+            if j == g:
+                for cell in cells:
+                    labels[cell] = label
+
+
+def components_for(grid):
+    """The grid's attached Components, created on first use."""
+    if grid.components is None:
+        grid.components = Components(grid)
+    return grid.components
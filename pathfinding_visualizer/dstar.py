@@ -0,0 +1,223 @@
+"""Incremental replanning with D* Lite.
+
+A DStarLite planner searches backwards from the end cell and keeps its g and
+rhs values between calls to plan(). It subscribes to the grid, so walls or
+terrain edited through the Grid API are queued and only the cells around
+those edits are repaired on the next plan() instead of searching from
+scratch. Moving the start with move_start() is also cheap.
+
+Reference: Koenig & Likhachev, "D* Lite" (AAAI 2002), optimized version.
+"""
+from array import array
+from heapq import heappush, heappop
+
+from engine import SearchResult, SearchStats
+
+INF = float('inf')
+
+# Diagonal costs are irrational, so keys that should tie can differ in the
+# last bit; shrinking the heuristic a hair keeps such ties on the safe side.
+FLOAT_SHRINK = 1 - 1e-9
+
+
+class DStarLite:
+    def __init__(self, grid, start, end):
+        self.grid = grid
+        self.start = grid.index(*start)
+        self.end = grid.index(*end)
+        self.pending = set()    # node ids edited since the last plan()
+        self.needs_reset = False
+        self.stats = SearchStats()  # counters for the current plan() call
+        grid.subscribe(self._cell_changed)
+        self._reset()
+
+    def close(self):
+        """Stop listening to grid edits."""
+        self.grid.unsubscribe(self._cell_changed)
+
+    def _reset(self):
+        size = self.grid.size
+        self.g = array("d", [INF]) * size
+        self.rhs = array("d", [INF]) * size
+        self.key1 = array("d", [0.0]) * size
+        self.key2 = array("d", [0.0]) * size
+        self.queued = bytearray(size)
+        self.open = []
+        self.km = 0
+        self.last = self.start
+        self.h = self._heuristic(self.start)
+        self.scale = self.grid.min_cost()
+        self.diagonal = self.grid.diagonal
+        self.pending.clear()
+        self.needs_reset = False
+        self.rhs[self.end] = 0
+        self._push(self.end, self.h(self.end), 0)
+
+    def _heuristic(self, start):
+        # Landmark bounds go stale with the first edit, and the queue keys must not
+        h = self.grid.base_heuristic(start)
+        if not self.grid.diagonal:
+            return h  # integer costs, keys compare exactly
+        return lambda node: h(node) * FLOAT_SHRINK
+
+    def _cell_changed(self, node):
+        if node is None:
+            self.needs_reset = True
+        else:
+            self.pending.add(node)
+
+    def _push(self, node, k1, k2):
+        self.key1[node] = k1
+        self.key2[node] = k2
+        self.queued[node] = 1
+        heappush(self.open, (k1, k2, node))
+        stats = self.stats
+        stats.generated += 1
+        if len(self.open) > stats.max_open:
+            stats.max_open = len(self.open)
+
+    def _top(self):
+        """Smallest live (k1, k2, node) in the queue, dropping stale entries."""
+        open_list, queued, key1, key2 = self.open, self.queued, self.key1, self.key2
+        while open_list:
+            k1, k2, node = open_list[0]
+            if queued[node] and key1[node] == k1 and key2[node] == k2:
+                return open_list[0]
+            heappop(open_list)
+            self.stats.stale_pops += 1
+        return None
+
+    def _update_vertex(self, node):
+        g, rhs = self.g, self.rhs
+        if node != self.end:
+            best = INF
+            if node == self.start or not self.grid.cells[node]:  # searches may start on a wall
+                for nb, step in self.grid.edges(node):
+                    cost = step + g[nb]
+                    if cost < best:
+                        best = cost
+            rhs[node] = best
+        self.queued[node] = 0
+        if g[node] != rhs[node]:
+            k2 = min(g[node], rhs[node])
+            self._push(node, k2 + self.h(node) + self.km, k2)
+
+    def _predecessors(self, node):
+        preds = self.grid.neighbors(node)
+        start = self.start
+        if self.grid.cells[start] and any(nb == node for nb, _ in self.grid.edges(start)):
+            preds.append(start)  # a walled start is nobody's neighbour but still leads out
+        return preds
+
+    def _around(self, node):
+        """The cell itself and its 3x3 neighbourhood, whose edges an edit can change."""
+        cols, rows = self.grid.cols, self.grid.rows
+        r, c = divmod(node, cols)
+        for nr in range(max(r - 1, 0), min(r + 2, rows)):
+            for nc in range(max(c - 1, 0), min(c + 2, cols)):
+                yield nr * cols + nc
+
+    def _apply_edits(self):
+        grid = self.grid
+        if self.needs_reset or grid.min_cost() != self.scale or grid.diagonal != self.diagonal:
+            # A new movement model, or a cheaper terrain minimum that would make
+            # the old keys inadmissible, means starting over
+            self._reset()
+            return
+        for node in self.pending:
+            for nb in self._around(node):
+                self._update_vertex(nb)
+        self.pending.clear()
+
+    def move_start(self, start):
+        """Move the start cell without invalidating what was already computed."""
+        node = self.grid.index(*start)
+        if node == self.start:
+            return
+        old = self.start
+        self.h = self._heuristic(node)
+        self.km += self.h(self.last)
+        self.start = self.last = node
+        if self.grid.cells[old] or self.grid.cells[node]:
+            # Only a start cell may be crossed while walled, so both ends need a recheck
+            self.pending.update((old, node))
+
+    def _compute(self, trace, recorder=None):
+        # The recorder hears of an expansion once its updates are all done, so
+        # if it raises the queue holds every inconsistent cell and a later call
+        # carries on from there
+        g, rhs, start = self.g, self.rhs, self.start
+        h = self.h
+        while True:
+            top = self._top()
+            s2 = min(g[start], rhs[start])
+            start_key = (s2 + h(start) + self.km, s2)
+            if top is None or ((top[0], top[1]) >= start_key and rhs[start] == g[start]):
+                return
+            k1, k2, node = top
+            heappop(self.open)
+            self.queued[node] = 0
+            new2 = min(g[node], rhs[node])
+            new1 = new2 + h(node) + self.km
+            if (k1, k2) < (new1, new2):
+                self._push(node, new1, new2)
+            elif g[node] > rhs[node]:
+                g[node] = rhs[node]
+                trace.append(node)
+                for nb in self._predecessors(node):
+                    self._update_vertex(nb)
+                if recorder is not None:
+                    recorder.pop(node, trace)
+            else:
+                g[node] = INF
+                trace.append(node)
+                self._update_vertex(node)
+                for nb in self._predecessors(node):
+                    self._update_vertex(nb)
+                if recorder is not None:
+                    recorder.pop(node, trace)
+
+    def _extract_path(self):
+        grid, g = self.grid, self.g
+        node = self.start
+        if g[node] == INF:
+            return []
+        path = [node]
+        for _ in range(grid.size):
+            if node == self.end:
+                return [grid.coords(n) for n in path]
+            best, best_cost = -1, INF
+            for nb, step in grid.edges(node):
+                cost = step + g[nb]
+                if cost < best_cost:
+                    best, best_cost = nb, cost
+            if best == -1:
+                return []
+            node = best
+            path.append(node)
+        return []
+
+    def plan(self, recorder=None):
+        """Repair the search after any queued edits and return the current path.
+
+        recorder.pop() hears of every expansion; if it raises, a later
+        plan() carries on from where this one stopped.
+        """
+        trace = array("i")
+        stats = self.stats = SearchStats(max_open=len(self.open))
+        self._apply_edits()
+        self._compute(trace, recorder)
+        path = self._extract_path()
+        stats.expanded = len(trace)
+        grid = self.grid
+        return SearchResult("dstar", grid.coords(self.start), grid.coords(self.end), path, trace,
+                            grid.path_cost(path) if path else None, stats)
+
+
+def dstar_lite(grid, source, target):
+    """One-shot run with a fresh planner, for use through engine.solve()."""
+    planner = DStarLite(grid, grid.coords(source), grid.coords(target))
+    try:
+        return planner.plan()
+    finally:
+        planner.close()
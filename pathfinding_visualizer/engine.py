@@ -0,0 +1,800 @@
+"""Headless search engine.
+
+Every algorithm runs to completion on a Grid and returns a SearchResult.
+Nothing in here imports Tkinter, so it can be used from scripts and servers;
+the GUI only replays the recorded trace.
+
+Each result carries a SearchStats with the search's counters (nodes
+expanded and generated, stale heap pops, largest open list, path length and
+cost, time spent) that write_trace() can save as a JSON line.
+Passing a tracefile.TraceWriter as solve(recorder=...) streams every push,
+pop, stale pop and path cell to a compact binary trace instead. A recorder
+may also raise to stop a search between two expansions, as the GUI's
+worker.Checkpoint does on cancel; the grid's search arrays are reset by
+the next search anyway.
+
+The searches work on flat node ids (``row * cols + col``) and keep their
+bookkeeping in the grid's reusable SearchSpace arrays rather than in
+tuple-keyed sets and dicts.
+"""
+import json
+import time
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+from components import components_for
+from openlist import make_open_list
+from pruning import pruning_for
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+
+class SearchStats:
+    """Counters for one search.
+
+    expanded: nodes taken off the open list and expanded (the target included)
+    generated: nodes put on the open list, the start excluded
+    stale_pops: open-list entries dropped because their node was already
+        expanded (fringe search: nodes passed over for exceeding the threshold)
+    max_open: largest open list / frontier size seen
+    search_time, render_time: seconds spent searching and animating, filled
+        in by solve() and the GUI
+    """
+    FIELDS = ("expanded", "generated", "stale_pops", "max_open", "path_length",
+              "path_cost", "search_time", "render_time")
+
+    def __init__(self, expanded=0, generated=0, stale_pops=0, max_open=0):
+        self.expanded = expanded
+        self.generated = generated
+        self.stale_pops = stale_pops
+        self.max_open = max_open
+        self.path_length = 0
+        self.path_cost = None
+        self.search_time = 0.0
+        self.render_time = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def _heap_stats(trace, expanded, open_left, max_open, starts=1):
+    """Stats for searches that push every generated node exactly once and trace it."""
+    pops = len(trace) + starts - open_left
+    return SearchStats(expanded, len(trace), pops - expanded, max_open)
+
+
+class SearchResult:
+    def __init__(self, algorithm, start, end, path, trace, cost=None, stats=None):
+        self.algorithm = algorithm
+        self.start = start
+        self.end = end
+        self.path = path      # list of (row, col) from start to end, empty if no path
+        self.trace = trace    # node ids in the order they were discovered
+        self._cost = cost
+        if stats is None:
+            stats = SearchStats(generated=len(trace))
+        stats.path_length = len(path)
+        stats.path_cost = self.cost
+        self.stats = stats
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+    @property
+    def cost(self):
+        if not self.path:
+            return None
+        return self._cost if self._cost is not None else len(self.path) - 1
+
+
+def heuristic(a, b):
+    (x1, y1), (x2, y2) = a, b
+    return abs(x1 - x2) + abs(y1 - y2)
+
+
+def build_path(grid, parent, source, target):
+    """Follow parent ids back from target and return (row, col) cells from source."""
+    cols = grid.cols
+    path = [target]
+    while path[-1] != source:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return [divmod(node, cols) for node in path]
+
+
+def _result(grid, name, source, target, path, trace, stats=None):
+    return SearchResult(name, grid.coords(source), grid.coords(target), path, trace,
+                        grid.path_cost(path) if path else None, stats)
+
+
+def _finish(grid, name, source, target, space, trace, found, stats=None):
+    path = build_path(grid, space.parent, source, target) if found else []
+    return _result(grid, name, source, target, path, trace, stats)
+
+
+def _require_uniform(grid, name):
+    if not grid.uniform:
+        raise ValueError(f"{name} needs a 4-connected grid without terrain costs")
+
+
+def dfs(grid, source, target, recorder=None):
+    space = grid.workspace()
+    stamp = space.begin()
+    opened, parent = space.opened, space.parent
+    neighbors = grid.neighbors
+    stack = [source]
+    opened[source] = stamp
+    trace = array("i")
+    max_open = 0
+
+    while stack:
+        current = stack.pop()
+        if recorder is not None:
+            recorder.pop(current, trace)
+        if current == target:
+            # Everything pushed and no longer waiting was expanded, start included
+            stats = SearchStats(len(trace) + 1 - len(stack), len(trace), 0, max_open)
+            return _finish(grid, "dfs", source, target, space, trace, True, stats)
+
+        for nb in neighbors(current):
+            if opened[nb] != stamp:
+                stack.append(nb)
+                opened[nb] = stamp
+                parent[nb] = current
+                trace.append(nb)
+        if len(stack) > max_open:
+            max_open = len(stack)
+
+    stats = SearchStats(len(trace) + 1, len(trace), 0, max_open)
+    return _finish(grid, "dfs", source, target, space, trace, False, stats)
+
+
+def bfs(grid, source, target, recorder=None):
+    space = grid.workspace()
+    stamp = space.begin()
+    opened, parent = space.opened, space.parent
+    neighbors = grid.neighbors
+    queue = deque([source])
+    opened[source] = stamp
+    trace = array("i")
+    max_open = 0
+
+    while queue:
+        current = queue.popleft()
+        if recorder is not None:
+            recorder.pop(current, trace)
+        if current == target:
+            # Everything pushed and no longer waiting was expanded, start included
+            stats = SearchStats(len(trace) + 1 - len(queue), len(trace), 0, max_open)
+            return _finish(grid, "bfs", source, target, space, trace, True, stats)
+
+        for nb in neighbors(current):
+            if opened[nb] != stamp:
+                queue.append(nb)
+                opened[nb] = stamp
+                parent[nb] = current
+                trace.append(nb)
+        if len(queue) > max_open:
+            max_open = len(queue)
+
+    stats = SearchStats(len(trace) + 1, len(trace), 0, max_open)
+    return _finish(grid, "bfs", source, target, space, trace, False, stats)
+
+
+def dijkstra(grid, source, target, open_list=None, tie_break=None, recorder=None):
+    space = grid.workspace()
+    stamp = space.begin()
+    opened, closed, parent, distance = space.opened, space.closed, space.parent, space.dist
+    edges = grid.edges
+    pq = make_open_list(open_list, grid, space, tie_break)  # by distance
+    push, pop = pq.push, pq.pop
+    push(source, 0, 0)
+    opened[source] = stamp
+    distance[source] = 0
+    trace = array("i")
+    expanded = max_open = 0
+
+    while pq:
+        current = pop()
+        if closed[current] == stamp:
+            if recorder is not None:
+                recorder.stale(current, trace)
+            continue
+        closed[current] = stamp
+        expanded += 1
+        if recorder is not None:
+            recorder.pop(current, trace)
+
+        if current == target:
+            stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+            return _finish(grid, "dijkstra", source, target, space, trace, True, stats)
+
+        dist = distance[current]
+        for nb, step in edges(current):
+            new_dist = dist + step  # step = terrain cost of the entered cell
+            if closed[nb] != stamp and (opened[nb] != stamp or new_dist < distance[nb]):
+                opened[nb] = stamp
+                distance[nb] = new_dist
+                parent[nb] = current
+                push(nb, new_dist, new_dist)
+                trace.append(nb)
+        if len(pq) > max_open:
+            max_open = len(pq)
+
+    stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+    return _finish(grid, "dijkstra", source, target, space, trace, False, stats)
+
+
+def astar(grid, source, target, open_list=None, tie_break=None, recorder=None):
+    """A*; tie_break="g" expands the deeper of two equally promising nodes first."""
+    space = grid.workspace()
+    stamp = space.begin()
+    opened, closed, parent, g_score = space.opened, space.closed, space.parent, space.dist
+    edges = grid.edges
+    h = grid.heuristic(target)
+    pq = make_open_list(open_list, grid, space, tie_break)  # by f_score
+    push, pop = pq.push, pq.pop
+    push(source, h(source), 0)
+    opened[source] = stamp
+    g_score[source] = 0
+    trace = array("i")
+    expanded = max_open = 0
+
+    while pq:
+        current = pop()
+        if closed[current] == stamp:
+            if recorder is not None:
+                recorder.stale(current, trace)
+            continue
+        closed[current] = stamp
+        expanded += 1
+        if recorder is not None:
+            recorder.pop(current, trace)
+
+        if current == target:
+            stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+            return _finish(grid, "astar", source, target, space, trace, True, stats)
+
+        g = g_score[current]
+        for nb, step in edges(current):
+            tentative_g = g + step  # Cost from start to neighbor
+            if closed[nb] != stamp and (opened[nb] != stamp or tentative_g < g_score[nb]):
+                opened[nb] = stamp
+                parent[nb] = current
+                g_score[nb] = tentative_g
+                push(nb, tentative_g + h(nb), tentative_g)
+                trace.append(nb)
+        if len(pq) > max_open:
+            max_open = len(pq)
+
+    stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+    return _finish(grid, "astar", source, target, space, trace, False, stats)
+
+
+def greedy_best_first(grid, source, target, open_list=None, tie_break=None, recorder=None):
+    space = grid.workspace()
+    stamp = space.begin()
+    closed, parent = space.closed, space.parent
+    neighbors = grid.neighbors
+    h = grid.heuristic(target)
+    pq = make_open_list(open_list, grid, space, tie_break)  # by heuristic only
+    push, pop = pq.push, pq.pop
+    push(source, h(source))
+    trace = array("i")
+    expanded = max_open = 0
+
+    while pq:
+        current = pop()
+        if closed[current] == stamp:
+            if recorder is not None:
+                recorder.stale(current, trace)
+            continue
+        closed[current] = stamp
+        expanded += 1
+        if recorder is not None:
+            recorder.pop(current, trace)
+
+        if current == target:
+            stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+            return _finish(grid, "greedy", source, target, space, trace, True, stats)
+
+        for nb in neighbors(current):
+            if closed[nb] != stamp:
+                parent[nb] = current
+                push(nb, h(nb))
+                trace.append(nb)
+        if len(pq) > max_open:
+            max_open = len(pq)
+
+    stats = SearchStats(expanded, len(trace), pq.stale_pops(len(trace) + 1, expanded), max_open)
+    return _finish(grid, "greedy", source, target, space, trace, False, stats)
+
+
+def _expand_segments(grid, points):
+    """Fill in the straight runs between consecutive jump points."""
+    if not points:
+        return []
+    path = [points[0]]
+    for r2, c2 in points[1:]:
+        r, c = path[-1]
+        dr = (r2 > r) - (r2 < r)
+        dc = (c2 > c) - (c2 < c)
+        while (r, c) != (r2, c2):
+            r, c = r + dr, c + dc
+            path.append((r, c))
+    return path
+
+
+def jump_point_search(grid, source, target, recorder=None):
+    """A* over jump points only, for 4-connected uniform-cost grids.
+
+    Straight runs without forced neighbours are skipped in one jump instead
+    of pushing every cell on them; the trace holds the jump points.
+    """
+    _require_uniform(grid, "Jump point search")
+    space = grid.workspace()
+    stamp = space.begin()
+    opened, closed, parent, g_score = space.opened, space.closed, space.parent, space.dist
+    cells, rows, cols = grid.cells, grid.rows, grid.cols
+    tr, tc = divmod(target, cols)
+
+    def walkable(r, c):
+        return 0 <= r < rows and 0 <= c < cols and not cells[r * cols + c]
+
+    def jump_horizontal(r, c, dc):
+        # Entering (r, c) from (r, c - dc)
+        while walkable(r, c):
+            if r == tr and c == tc:
+                return r * cols + c
+            if ((walkable(r - 1, c) and not walkable(r - 1, c - dc)) or
+                    (walkable(r + 1, c) and not walkable(r + 1, c - dc))):
+                return r * cols + c
+            c += dc
+        return -1
+
+    def jump_vertical(r, c, dr):
+        # Entering (r, c) from (r - dr, c)
+        while walkable(r, c):
+            if r == tr and c == tc:
+                return r * cols + c
+            if ((walkable(r, c - 1) and not walkable(r - dr, c - 1)) or
+                    (walkable(r, c + 1) and not walkable(r - dr, c + 1))):
+                return r * cols + c
+            if jump_horizontal(r, c + 1, 1) != -1 or jump_horizontal(r, c - 1, -1) != -1:
+                return r * cols + c
+            r += dr
+        return -1
+
+    sr, sc = divmod(source, cols)
+    pq = [(abs(sr - tr) + abs(sc - tc), source)]  # (f_score, node)
+    opened[source] = stamp
+    parent[source] = -1
+    g_score[source] = 0
+    trace = array("i")
+    expanded = max_open = 0
+
+    while pq:
+        _, current = heappop(pq)
+        if closed[current] == stamp:
+            if recorder is not None:
+                recorder.stale(current, trace)
+            continue
+        closed[current] = stamp
+        expanded += 1
+        if recorder is not None:
+            recorder.pop(current, trace)
+
+        if current == target:
+            points = build_path(grid, parent, source, target)
+            stats = _heap_stats(trace, expanded, len(pq), max_open)
+            return _result(grid, "jps", source, target, _expand_segments(grid, points), trace, stats)
+
+        r, c = divmod(current, cols)
+        prev = parent[current]
+        if prev == -1:
+            directions = DIRECTIONS
+        else:
+            pr, pc = divmod(prev, cols)
+            dr = (r > pr) - (r < pr)
+            dc = (c > pc) - (c < pc)
+            if dc:
+                directions = [(0, dc), (1, 0), (-1, 0)]
+            else:
+                directions = [(dr, 0), (0, 1), (0, -1)]
+
+        for dr, dc in directions:
+            if dc:
+                jp = jump_horizontal(r, c + dc, dc)
+            else:
+                jp = jump_vertical(r + dr, c, dr)
+            if jp == -1 or closed[jp] == stamp:
+                continue
+            jr, jc = divmod(jp, cols)
+            tentative_g = g_score[current] + abs(jr - r) + abs(jc - c)
+            if opened[jp] != stamp or tentative_g < g_score[jp]:
+                opened[jp] = stamp
+                parent[jp] = current
+                g_score[jp] = tentative_g
+                heappush(pq, (tentative_g + abs(jr - tr) + abs(jc - tc), jp))
+                trace.append(jp)
+        if len(pq) > max_open:
+            max_open = len(pq)
+
+    stats = _heap_stats(trace, expanded, 0, max_open)
+    return _finish(grid, "jps", source, target, space, trace, False, stats)
+
+
+def _join(grid, space, source, target, meet_forward, meet_backward, back_parent):
+    """Path source -> meet_forward, then meet_backward -> target via back_parent."""
+    path = build_path(grid, space.parent, source, meet_forward)
+    node = meet_backward
+    if meet_backward != meet_forward:
+        path.append(grid.coords(node))
+    while node != target:
+        node = back_parent[node]
+        path.append(grid.coords(node))
+    return path
+
+
+def bidirectional_bfs(grid, source, target, recorder=None):
+    """BFS from both ends, one whole level at a time on the smaller frontier."""
+    space = grid.workspace()
+    stamp = space.begin()
+    seen_f, parent_f, dist_f = space.opened, space.parent, space.dist
+    seen_b = space.scratch("opened_back", "I")
+    parent_b = space.scratch("parent_back", "i", -1)
+    dist_b = space.scratch("dist_back", "d")
+    neighbors = grid.neighbors
+    trace = array("i")
+
+    seen_f[source] = seen_b[target] = stamp
+    dist_f[source] = dist_b[target] = 0
+    if source == target:
+        return _result(grid, "bibfs", source, target, [grid.coords(source)], trace)
+
+    front_f, front_b = [source], [target]
+    expanded = 0
+    max_open = 2
+    while front_f and front_b:
+        forward = len(front_f) <= len(front_b)
+        if forward:
+            frontier, seen, parent, dist, other_seen, other_dist = front_f, seen_f, parent_f, dist_f, seen_b, dist_b
+        else:
+            frontier, seen, parent, dist, other_seen, other_dist = front_b, seen_b, parent_b, dist_b, seen_f, dist_f
+
+        best, meet = None, None
+        next_front = []
+        expanded += len(frontier)
+        for current in frontier:
+            if recorder is not None:
+                recorder.pop(current, trace)
+            d = dist[current] + 1
+            for nb in neighbors(current):
+                if other_seen[nb] == stamp:
+                    total = d + other_dist[nb]
+                    if best is None or total < best:
+                        best, meet = total, (current, nb)
+                if seen[nb] != stamp:
+                    seen[nb] = stamp
+                    parent[nb] = current
+                    dist[nb] = d
+                    next_front.append(nb)
+                    trace.append(nb)
+
+        if meet is not None:
+            if forward:
+                path = _join(grid, space, source, target, meet[0], meet[1], parent_b)
+            else:
+                path = _join(grid, space, source, target, meet[1], meet[0], parent_b)
+            stats = SearchStats(expanded, len(trace), 0, max_open)
+            return _result(grid, "bibfs", source, target, path, trace, stats)
+
+        if forward:
+            front_f = next_front
+        else:
+            front_b = next_front
+        max_open = max(max_open, len(front_f) + len(front_b))
+
+    stats = SearchStats(expanded, len(trace), 0, max_open)
+    return _result(grid, "bibfs", source, target, [], trace, stats)
+
+
+def bidirectional_astar(grid, source, target, recorder=None):
+    """A* from both ends, stopping once either open list cannot beat the best meeting."""
+    space = grid.workspace()
+    stamp = space.begin()
+    opened_f, closed_f, parent_f, g_f = space.opened, space.closed, space.parent, space.dist
+    opened_b = space.scratch("opened_back", "I")
+    closed_b = space.scratch("closed_back", "I")
+    parent_b = space.scratch("parent_back", "i", -1)
+    g_b = space.scratch("dist_back", "d")
+    h_f = grid.heuristic(target)
+    h_b = grid.heuristic(source, reverse=True)
+    trace = array("i")
+
+    pq_f = [(h_f(source), source)]
+    pq_b = [(h_b(target), target)]
+    opened_f[source] = opened_b[target] = stamp
+    g_f[source] = g_b[target] = 0
+    best, meet = float('inf'), None
+    if source == target:
+        best, meet = 0, source
+    expanded = 0
+    max_open = 2
+
+    # The backward search walks edges against their direction, so it pays
+    # the cost of the cell it is leaving rather than the one it enters
+    sides = (
+        (pq_f, opened_f, closed_f, parent_f, g_f, opened_b, g_b, grid.edges, h_f),
+        (pq_b, opened_b, closed_b, parent_b, g_b, opened_f, g_f, grid.reverse_edges, h_b),
+    )
+    while pq_f and pq_b:
+        # Drop entries for nodes already expanded so the tops are real bounds
+        while pq_f and closed_f[pq_f[0][1]] == stamp:
+            _, stale = heappop(pq_f)
+            if recorder is not None:
+                recorder.stale(stale, trace)
+        while pq_b and closed_b[pq_b[0][1]] == stamp:
+            _, stale = heappop(pq_b)
+            if recorder is not None:
+                recorder.stale(stale, trace)
+        if not pq_f or not pq_b or max(pq_f[0][0], pq_b[0][0]) >= best:
+            break
+
+        pq, opened, closed, parent, g, other_opened, other_g, edges, h = \
+            sides[0] if len(pq_f) <= len(pq_b) else sides[1]
+        _, current = heappop(pq)
+        closed[current] = stamp
+        expanded += 1
+        if recorder is not None:
+            recorder.pop(current, trace)
+
+        g_current = g[current]
+        for nb, step in edges(current):
+            if closed[nb] == stamp:
+                continue
+            tentative_g = g_current + step
+            if opened[nb] != stamp or tentative_g < g[nb]:
+                opened[nb] = stamp
+                parent[nb] = current
+                g[nb] = tentative_g
+                heappush(pq, (tentative_g + h(nb), nb))
+                trace.append(nb)
+            if other_opened[nb] == stamp and g[nb] + other_g[nb] < best:
+                best = g[nb] + other_g[nb]
+                meet = nb
+        if len(pq_f) + len(pq_b) > max_open:
+            max_open = len(pq_f) + len(pq_b)
+
+    stats = _heap_stats(trace, expanded, len(pq_f) + len(pq_b), max_open, starts=2)
+    if meet is None:
+        return _result(grid, "biastar", source, target, [], trace, stats)
+    path = _join(grid, space, source, target, meet, meet, parent_b)
+    return _result(grid, "biastar", source, target, path, trace, stats)
+
+
+def fringe_search(grid, source, target, recorder=None):
+    """Fringe search: iterative-deepening A* that keeps its frontier between passes.
+
+    The fringe is a doubly linked list over node ids; each pass walks it and
+    expands every node whose f fits under the current threshold.
+    """
+    space = grid.workspace()
+    stamp = space.begin()
+    cached, parent, g_score = space.opened, space.parent, space.dist
+    in_fringe = space.closed
+    nxt = space.scratch("fringe_next", "i", -1)
+    prv = space.scratch("fringe_prev", "i", -1)
+    edges = grid.edges
+    h = grid.heuristic(target)
+    trace = array("i")
+
+    head = source
+    nxt[source] = prv[source] = -1
+    in_fringe[source] = cached[source] = stamp
+    g_score[source] = 0
+    flimit = h(source)
+    expanded = deferred = 0
+    size = max_open = 1  # nodes on the fringe
+
+    def unlink(node):
+        nonlocal head
+        p, n = prv[node], nxt[node]
+        if p != -1:
+            nxt[p] = n
+        else:
+            head = n
+        if n != -1:
+            prv[n] = p
+        in_fringe[node] = 0
+
+    while head != -1:
+        fmin = float('inf')
+        current = head
+        while current != -1:
+            g = g_score[current]
+            f = g + h(current)
+            if f > flimit:
+                fmin = min(fmin, f)
+                deferred += 1
+                if recorder is not None:
+                    recorder.stale(current, trace)
+                current = nxt[current]
+                continue
+            expanded += 1
+            if recorder is not None:
+                recorder.pop(current, trace)
+            if current == target:
+                stats = SearchStats(expanded, len(trace), deferred, max_open)
+                return _finish(grid, "fringe", source, target, space, trace, True, stats)
+
+            # Children go right after current, so they are visited next in this pass
+            for nb, step in reversed(list(edges(current))):
+                g_nb = g + step
+                if cached[nb] == stamp and g_nb >= g_score[nb]:
+                    continue
+                if in_fringe[nb] == stamp:
+                    unlink(nb)
+                    size -= 1
+                after = nxt[current]
+                prv[nb], nxt[nb] = current, after
+                nxt[current] = nb
+                if after != -1:
+                    prv[after] = nb
+                in_fringe[nb] = cached[nb] = stamp
+                g_score[nb] = g_nb
+                parent[nb] = current
+                trace.append(nb)
+                size += 1
+
+            following = nxt[current]
+            unlink(current)
+            if size > max_open:
+                max_open = size
+            size -= 1
+            current = following
+        flimit = fmin
+
+    stats = SearchStats(expanded, len(trace), deferred, max_open)
+    return _finish(grid, "fringe", source, target, space, trace, False, stats)
+
+
+def wavefront_bfs(grid, source, target):
+    """BFS that expands whole frontiers with NumPy, see wavefront.py."""
+    from wavefront import wavefront_search  # needs NumPy, so imported on demand
+    return wavefront_search(grid, source, target)
+
+
+def dstar_lite(grid, source, target):
+    """D* Lite from scratch; keep a dstar.DStarLite around to replan incrementally."""
+    from dstar import dstar_lite
+    return dstar_lite(grid, source, target)
+
+
+def hpa(grid, source, target):
+    """Near-optimal hierarchical A* over cluster entrances, see hpa.py."""
+    from hpa import hpa_search
+    return hpa_search(grid, source, target)
+
+
+def flow_field(grid, source, target):
+    """Path read off a cached reverse search from target, see flowfield.py."""
+    from flowfield import flow_field_search
+    return flow_field_search(grid, source, target)
+
+
+ALGORITHMS = {
+    "bfs": bfs,
+    "dfs": dfs,
+    "astar": astar,
+    "dijkstra": dijkstra,
+    "greedy": greedy_best_first,
+    "wavefront": wavefront_bfs,
+    "jps": jump_point_search,
+    "bibfs": bidirectional_bfs,
+    "biastar": bidirectional_astar,
+    "fringe": fringe_search,
+    "dstar": dstar_lite,
+    "hpa": hpa,
+    "flowfield": flow_field,
+}
+
+# Searches taking open_list= and tie_break= (see openlist.py)
+OPEN_LIST_ALGORITHMS = ("dijkstra", "astar", "greedy")
+
+# Searches with a compiled version in kernel.py
+COMPILED_ALGORITHMS = ("bfs", "dijkstra", "astar")
+
+# Searches that can split one query over several processes (see parallel.py)
+PARALLEL_ALGORITHMS = ("bfs", "dijkstra")
+
+# Searches that report their pops and stale pops to a recorder (see tracefile.py)
+EVENT_ALGORITHMS = ("bfs", "dfs", "astar", "dijkstra", "greedy", "jps", "bibfs", "biastar", "fringe")
+
+# Optimal searches that can skip dead ends and swamps (see pruning.py)
+PRUNE_ALGORITHMS = ("bfs", "dijkstra", "astar", "jps", "bibfs", "biastar", "fringe")
+
+
+def solve(grid, start, end, algorithm="astar", open_list=None, tie_break=None, compiled=False,
+          recorder=None, workers=None, prune=False):
+    """Run one search to completion and return its SearchResult, timed in result.stats.
+
+    Queries between disconnected regions (see components.py) return an
+    empty result at once without searching. open_list and tie_break pick
+    the priority queue of the OPEN_LIST_ALGORITHMS, see openlist.py.
+    compiled runs the COMPILED_ALGORITHMS in the C kernel (kernel.py), or
+    in Python with the same results if it has not been built.
+    workers splits the PARALLEL_ALGORITHMS over that many processes, each
+    searching a band of rows (parallel.py); the pool lives for this one
+    query. recorder (a tracefile.TraceWriter) records the search's events;
+    the searches outside EVENT_ALGORITHMS, and compiled or parallel ones,
+    only record their pushes and path (worker.Checkpoint uses the same
+    calls to cancel a search). prune makes the PRUNE_ALGORITHMS
+    skip the grid's dead ends and swamps (pruning.py, built on first use);
+    path costs stay the same wherever the search is optimal.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+    options = {}
+    if open_list is not None or tie_break is not None:
+        if algorithm not in OPEN_LIST_ALGORITHMS:
+            raise ValueError(f"{algorithm} does not use a configurable open list")
+        if compiled:
+            raise ValueError("The compiled kernel only has the default heap open list")
+        options = {"open_list": open_list, "tie_break": tie_break}
+    search = ALGORITHMS[algorithm]
+    if compiled:
+        if algorithm not in COMPILED_ALGORITHMS:
+            raise ValueError(f"{algorithm} has no compiled version, expected one of "
+                             f"{', '.join(COMPILED_ALGORITHMS)}")
+        import kernel
+        search = kernel.ALGORITHMS[algorithm]
+    if workers is not None:
+        if algorithm not in PARALLEL_ALGORITHMS:
+            raise ValueError(f"{algorithm} has no parallel version, expected one of "
+                             f"{', '.join(PARALLEL_ALGORITHMS)}")
+        if compiled or options:
+            raise ValueError("Parallel searches cannot be combined with compiled or a custom open list")
+        import parallel
+        search = parallel.ALGORITHMS[algorithm]
+        options = {"workers": workers}
+    if prune and algorithm not in PRUNE_ALGORITHMS:
+        raise ValueError(f"{algorithm} cannot skip pruned cells, expected one of {', '.join(PRUNE_ALGORITHMS)}")
+    if start is None or end is None:
+        raise ValueError("Start or End not set!")
+    for row, col in (start, end):
+        if not grid.in_bounds(row, col):
+            raise ValueError(f"Cell ({row}, {col}) is outside the {grid.rows}x{grid.cols} grid")
+    source, target = grid.index(*start), grid.index(*end)
+    if recorder is not None:
+        recorder.begin(grid, algorithm, source, target)
+        if algorithm in EVENT_ALGORITHMS and not compiled and workers is None:
+            options["recorder"] = recorder
+    # Outside the timer: the first query on a grid builds its labels, O(cells)
+    connected = components_for(grid).connected(source, target)
+    if prune and connected:
+        pruning_for(grid).ensure()  # likewise the pruning, and its updates after edits
+    started = time.perf_counter()
+    if not connected:
+        # Start and end lie in different regions: any search would only flood the start's
+        result = SearchResult(algorithm, grid.coords(source), grid.coords(target), [], array("i"))
+    elif prune:
+        with pruning_for(grid).opened(source, target) as view:
+            result = search(view, source, target, **options)
+    else:
+        result = search(grid, source, target, **options)
+    result.stats.search_time = time.perf_counter() - started
+    if recorder is not None:
+        recorder.finish(result, grid.cols)
+    return result
+
+
+def write_trace(result, f, nodes=False):
+    """Append one JSON line describing result (stats, and the trace itself if nodes) to file f."""
+    record = {"algorithm": result.algorithm, "start": list(result.start), "end": list(result.end),
+              "found": result.found, "stats": result.stats.as_dict()}
+    if nodes:
+        record["trace"] = result.trace.tolist()
+    f.write(json.dumps(record) + "\n")
@@ -0,0 +1,215 @@
+"""Flow fields: one reverse search from a goal serves every start.
+
+A FlowField runs Dijkstra backwards from its goal over the whole region
+(BFS on plain 4-connected grids) and keeps, for every cell that can reach
+the goal, the direction of its next step on a cheapest path there, one
+byte per cell. Any number of agents then read their path off the field in
+O(path length) without searching.
+
+Fields are cached per goal on the grid (see field_for()) and dropped as
+soon as a wall or terrain cost changes, or the movement model differs;
+the next request recomputes them.
+
+As with the other searches, a goal inside a wall cannot be reached, and an
+agent standing inside a wall steps out onto its best open neighbour.
+"""
+import time
+from array import array
+from collections import OrderedDict, deque
+from heapq import heappush, heappop
+
+from engine import SearchResult, SearchStats
+
+# Direction codes, in Grid.edges() order: right, down, left, up, then the diagonals
+STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, -1), (-1, 1))
+GOAL = len(STEPS)  # code of the goal cell itself
+NONE = 255         # cells that cannot reach the goal
+
+MAX_FIELDS = 8  # fields kept per grid, least recently used dropped first
+
+
+class FlowField:
+    def __init__(self, grid, goal, recorder=None):
+        self.grid = grid
+        self.goal = goal  # node id
+        self.diagonal = grid.diagonal
+        self.direction = bytearray([NONE]) * grid.size
+        self.dist = array("d", [float("inf")]) * grid.size
+        self.queries = 0
+        self.trace = array("i")  # discovery order while building, handed to the first query
+        self.stats = self._build(recorder)
+
+    def _build(self, recorder):
+        grid, goal = self.grid, self.goal
+        cols = grid.cols
+        direction, dist, trace = self.direction, self.dist, self.trace
+        # (dr, dc) from a cell to the next one on its way -> direction code; flat
+        # index offsets would collide on grids only one or two columns wide
+        codes = {step: code for code, step in enumerate(STEPS)}
+        started = time.perf_counter()
+        direction[goal] = GOAL
+        dist[goal] = 0
+        expanded = max_open = 0
+        if grid.cells[goal]:
+            pass  # nothing reaches a wall
+        elif grid.uniform:
+            queue = deque([goal])
+            while queue:
+                current = queue.popleft()
+                if recorder is not None:
+                    recorder.pop(current, trace)
+                expanded += 1
+                d = dist[current] + 1
+                row, col = divmod(current, cols)
+                for nb in grid.neighbors(current):
+                    if direction[nb] == NONE:
+                        direction[nb] = codes[row - nb // cols, col - nb % cols]
+                        dist[nb] = d
+                        queue.append(nb)
+                        trace.append(nb)
+                if len(queue) > max_open:
+                    max_open = len(queue)
+        else:
+            closed = bytearray(grid.size)
+            pq = [(0, goal)]
+            reverse_edges = grid.reverse_edges
+            while pq:
+                d, current = heappop(pq)
+                if closed[current]:
+                    continue
+                closed[current] = 1
+                if recorder is not None:
+                    recorder.pop(current, trace)
+                expanded += 1
+                row, col = divmod(current, cols)
+                # step = cost of moving from nb into current
+                for nb, step in reverse_edges(current):
+                    new_dist = d + step
+                    if not closed[nb] and new_dist < dist[nb]:
+                        dist[nb] = new_dist
+                        direction[nb] = codes[row - nb // cols, col - nb % cols]
+                        heappush(pq, (new_dist, nb))
+                        trace.append(nb)
+                if len(pq) > max_open:
+                    max_open = len(pq)
+        pops = len(trace) + 1 if expanded else 0
+        stats = SearchStats(expanded, len(trace), pops - expanded, max_open)
+        stats.search_time = time.perf_counter() - started
+        return stats
+
+    @property
+    def reached(self):
+        """Number of cells with a path to the goal, the goal included."""
+        return self.grid.size - self.direction.count(NONE)
+
+    def step_at(self, node):
+        """(dr, dc) of the next step from a node id, None at the goal or where it is unreachable."""
+        code = self.direction[node]
+        return STEPS[code] if code < GOAL else None
+
+    def next_node(self, node):
+        """Node id one step closer to the goal, -1 at the goal or where it is unreachable."""
+        code = self.direction[node]
+        if code >= GOAL:
+            return -1
+        dr, dc = STEPS[code]
+        return node + dr * self.grid.cols + dc
+
+    def distance(self, cell):
+        """Cost of the cheapest path from a (row, col) cell to the goal, None if there is none."""
+        return self._entry(self.grid.index(*cell))[1]
+
+    def _entry(self, node):
+        """(first node on the field, cost of getting there) for an agent at node."""
+        grid = self.grid
+        if node == self.goal or not grid.cells[node]:
+            return (node, 0) if self.direction[node] != NONE else (-1, None)
+        # Inside a wall: step out onto the open neighbour with the cheapest way on
+        best, best_cost = -1, None
+        for nb, step in grid.edges(node):
+            if self.direction[nb] != NONE and (best_cost is None or step + self.dist[nb] < best_cost):
+                best, best_cost = nb, step + self.dist[nb]
+        return best, best_cost
+
+    def path_nodes(self, node):
+        """Node ids from node to the goal along the field, [] if it cannot get there."""
+        first, _ = self._entry(node)
+        if first == -1:
+            return []
+        path = [node] if first != node else []
+        direction, cols = self.direction, self.grid.cols
+        node = first
+        path.append(node)
+        while direction[node] != GOAL:
+            dr, dc = STEPS[direction[node]]
+            node += dr * cols + dc
+            path.append(node)
+        return path
+
+    def path_from(self, cell):
+        """Cheapest path from a (row, col) cell to the goal, as (row, col) cells."""
+        coords = self.grid.coords
+        return [coords(node) for node in self.path_nodes(self.grid.index(*cell))]
+
+    def search(self, source):
+        """Engine-style result for one agent; the first one also reports building the field."""
+        grid = self.grid
+        if self.queries:
+            trace, stats = array("i"), SearchStats()
+        else:
+            trace, stats = self.trace, self.stats
+            self.trace = None
+        self.queries += 1
+        path = self.path_from(grid.coords(source))
+        return SearchResult("flowfield", grid.coords(source), grid.coords(self.goal), path, trace,
+                            grid.path_cost(path) if path else None, stats)
+
+    def nbytes(self):
+        return len(self.direction) + self.dist.itemsize * len(self.dist)  # trace excluded, it is handed out
+
+
+class FlowFields:
+    """The cached fields of one grid, keyed by goal and movement model."""
+
+    def __init__(self, grid, max_fields=MAX_FIELDS):
+        self.grid = grid
+        self.max_fields = max_fields
+        self.fields = OrderedDict()  # (goal, diagonal) -> FlowField, least recently used first
+        self.builds = 0
+        grid.subscribe(self._cell_changed)
+
+    def close(self):
+        self.grid.unsubscribe(self._cell_changed)
+        if self.grid.flow_fields is self:
+            self.grid.flow_fields = None
+
+    def _cell_changed(self, node):
+        self.fields.clear()  # any wall or cost can change the cheapest ways to the goal
+
+    def get(self, goal, recorder=None):
+        """The field towards node id goal, built if it is not cached.
+
+        recorder hears of the build's pops; if it raises, nothing is cached.
+        """
+        key = (goal, self.grid.diagonal)
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+            return field
+        field = FlowField(self.grid, goal, recorder)
+        self.builds += 1
+        self.fields[key] = field
+        while len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+
+def field_for(grid, goal, recorder=None):
+    """The flow field towards node id goal, from the grid's cache."""
+    if grid.flow_fields is None:
+        grid.flow_fields = FlowFields(grid)
+    return grid.flow_fields.get(goal, recorder)
+
+
+def flow_field_search(grid, source, target):
+    return field_for(grid, target).search(source)
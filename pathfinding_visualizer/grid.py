@@ -0,0 +1,431 @@
+"""Display-independent grid model shared by the GUI and the search engine.
+
+Cells live in one flat bytearray indexed by ``row * cols + col``; the engine
+works on those integer node ids instead of (row, col) tuples.
+
+An optional terrain layer (another bytearray, 1-255) gives the cost of
+entering each cell. Grids are 4-connected unless ``diagonal`` is set, in
+which case diagonal moves cost sqrt(2) times the entered cell's cost and may
+not cut wall corners.
+"""
+from array import array
+from itertools import repeat
+from math import sqrt
+
+EMPTY = 0
+WALL = 1
+
+SQRT2 = sqrt(2)
+UNIT_STEPS = (1,) * 8
+
+# Characters accepted when reading a grid from text
+WALL_CHARS = "#@TW"
+
+MASK64 = (1 << 64) - 1
+
+
+def _zobrist(node, value):
+    """Pseudo-random 64-bit key for one cell state (splitmix64 of node and value)."""
+    x = (node * 512 + value + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def _cost_key(node, cost):
+    return _zobrist(node, 256 + cost)
+
+
+class SearchSpace:
+    """Scratch arrays for one search, sized like the grid and reused between runs.
+
+    Instead of clearing the arrays before every search, each run bumps
+    ``stamp``; a node counts as opened/closed only if its entry equals the
+    current stamp, and parent/dist are only meaningful for opened nodes.
+    """
+    def __init__(self, size):
+        self.size = size
+        self.parent = array("i", [-1]) * size
+        self.dist = array("d", [0.0]) * size
+        self.opened = array("I", [0]) * size
+        self.closed = array("I", [0]) * size
+        self.extra = {}
+        self.stamp = 0
+
+    def begin(self):
+        self.stamp += 1
+        if self.stamp >= 0xFFFFFFFF:  # wrapped, wipe the old stamps once
+            self.opened = array("I", [0]) * self.size
+            self.closed = array("I", [0]) * self.size
+            self.extra.clear()  # stamp arrays among them would hold stale values
+            self.stamp = 1
+        return self.stamp
+
+    def scratch(self, name, typecode, fill=0):
+        """Extra per-node array kept between searches, created on first request."""
+        arr = self.extra.get(name)
+        if arr is None:
+            arr = self.extra[name] = array(typecode, [fill]) * self.size
+        return arr
+
+    def nbytes(self):
+        arrays = [self.parent, self.dist, self.opened, self.closed]
+        arrays.extend(self.extra.values())
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+class Grid:
+    def __init__(self, rows, cols, cells=None, costs=None, diagonal=False):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.cells = bytearray(self.size) if cells is None else cells  # 0=empty, 1=wall
+        self.costs = costs  # None means every cell costs 1 to enter
+        self.diagonal = diagonal
+        self._min_cost = None
+        self._hash = None  # content_hash(), kept up to date by the edit methods once computed
+        self._space = None
+        self._listeners = []
+        self.landmarks = None  # optional landmarks.LandmarkIndex used by heuristic()
+        self.hierarchy = None  # hpa.Hierarchy, built by the first "hpa" search
+        self.components = None  # components.Components, checked by engine.solve()
+        self.flow_fields = None  # flowfield.FlowFields, per-goal fields cached by field_for()
+        self.pruning = None  # pruning.Pruning, dead ends and swamps skipped by solve(prune=True)
+
+    @classmethod
+    def from_lines(cls, lines):
+        """Build a grid from text rows, '#' (or @, T, W) marks a wall, digits 2-9 a terrain cost."""
+        rows = [line.rstrip("\r\n") for line in lines]
+        rows = [line for line in rows if line]
+        if not rows:
+            raise ValueError("Grid file is empty")
+        cols = max(len(line) for line in rows)
+        grid = cls(len(rows), cols)
+        for r, line in enumerate(rows):
+            base = r * cols
+            for c, ch in enumerate(line):
+                if ch in WALL_CHARS:
+                    grid.cells[base + c] = WALL
+                elif ch in "23456789":
+                    grid.set_cost(r, c, int(ch))
+        return grid
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls.from_lines(f)
+
+    def to_lines(self):
+        cols, costs = self.cols, self.costs
+        lines = []
+        for r in range(self.rows):
+            chars = []
+            for i in range(r * cols, (r + 1) * cols):
+                if self.cells[i] == WALL:
+                    chars.append("#")
+                elif costs is not None and costs[i] > 1:
+                    chars.append(str(min(costs[i], 9)))
+                else:
+                    chars.append(".")
+            lines.append("".join(chars))
+        return lines
+
+    def index(self, row, col):
+        return row * self.cols + col
+
+    def coords(self, node):
+        return divmod(node, self.cols)
+
+    def in_bounds(self, row, col):
+        return 0 <= row < self.rows and 0 <= col < self.cols
+
+    def subscribe(self, callback):
+        """Call callback(node) after a cell's wall or cost changes through this API.
+
+        node is None when the whole grid was reset by clear(). Writes made
+        straight into ``cells``/``costs`` are not reported.
+        """
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self, node):
+        for callback in self._listeners:
+            callback(node)
+
+    def is_wall(self, row, col):
+        return self.cells[row * self.cols + col] == WALL
+
+    def set_wall(self, row, col, wall=True):
+        i = row * self.cols + col
+        value = WALL if wall else EMPTY
+        if self.cells[i] != value:
+            self.cells[i] = value
+            if self._hash is not None:
+                self._hash ^= _zobrist(i, WALL)
+            self._notify(i)
+
+    def toggle_wall(self, row, col):
+        i = row * self.cols + col
+        self.cells[i] = 1 - self.cells[i]
+        if self._hash is not None:
+            self._hash ^= _zobrist(i, WALL)
+        self._notify(i)
+
+    def cost(self, row, col):
+        return 1 if self.costs is None else self.costs[row * self.cols + col]
+
+    def set_cost(self, row, col, cost):
+        if not 1 <= cost <= 255:
+            raise ValueError(f"Terrain cost must be between 1 and 255, got {cost}")
+        if self.costs is None:
+            if cost == 1:
+                return
+            self.costs = bytearray([1]) * self.size
+        i = row * self.cols + col
+        old = self.costs[i]
+        if old != cost:
+            self.costs[i] = cost
+            self._min_cost = None
+            if self._hash is not None:
+                # Cost 1 is the default and contributes nothing, like an empty cell
+                if old > 1:
+                    self._hash ^= _cost_key(i, old)
+                if cost > 1:
+                    self._hash ^= _cost_key(i, cost)
+            self._notify(i)
+
+    @property
+    def weighted(self):
+        return self.costs is not None
+
+    @property
+    def uniform(self):
+        """True for the plain 4-connected, unit-cost grid."""
+        return self.costs is None and not self.diagonal
+
+    def min_cost(self):
+        """Cheapest terrain cost, used to keep heuristics admissible."""
+        if self._min_cost is None:
+            self._min_cost = min(self.costs) if self.costs is not None and self.size else 1
+        return self._min_cost
+
+    def clear(self):
+        self.cells[:] = bytes(self.size)
+        self.costs = None
+        self._min_cost = None
+        self._hash = 0
+        self._notify(None)
+
+    def content_hash(self):
+        """64-bit Zobrist hash of the walls and terrain costs.
+
+        Computed in full once, then updated in O(1) by set_wall(),
+        toggle_wall(), set_cost() and clear(). Like the listeners it does not
+        see writes made straight into ``cells``/``costs``.
+        """
+        if self._hash is None:
+            h = 0
+            cells = self.cells
+            if not isinstance(cells, (bytes, bytearray)):
+                cells = bytes(cells)  # e.g. a shared memory view, which has no find()
+            node = cells.find(WALL)
+            while node != -1:
+                h ^= _zobrist(node, WALL)
+                node = cells.find(WALL, node + 1)
+            if self.costs is not None:
+                for node, cost in enumerate(self.costs):
+                    if cost > 1:
+                        h ^= _cost_key(node, cost)
+            self._hash = h
+        return self._hash
+
+    def copy(self):
+        costs = bytearray(self.costs) if self.costs is not None else None
+        return Grid(self.rows, self.cols, bytearray(self.cells), costs, self.diagonal)
+
+    def neighbors(self, node):
+        """Open neighbours of a node id: right/down/left/up, then the diagonals if enabled."""
+        if self.diagonal:
+            return self._neighbors8(node)
+        cells = self.cells
+        cols = self.cols
+        col = node % cols
+        result = []
+        nb = node + 1
+        if col + 1 < cols and not cells[nb]:
+            result.append(nb)
+        nb = node + cols
+        if nb < self.size and not cells[nb]:
+            result.append(nb)
+        nb = node - 1
+        if col and not cells[nb]:
+            result.append(nb)
+        nb = node - cols
+        if nb >= 0 and not cells[nb]:
+            result.append(nb)
+        return result
+
+    def _neighbors8(self, node):
+        cells = self.cells
+        cols = self.cols
+        col = node % cols
+        result = []
+        right = col + 1 < cols and not cells[node + 1]
+        if right:
+            result.append(node + 1)
+        nb = node + cols
+        down = nb < self.size and not cells[nb]
+        if down:
+            result.append(nb)
+        left = col > 0 and not cells[node - 1]
+        if left:
+            result.append(node - 1)
+        nb = node - cols
+        up = nb >= 0 and not cells[nb]
+        if up:
+            result.append(nb)
+        # Both orthogonal cells must be open, so moves never cut a wall corner
+        if down and right and not cells[node + cols + 1]:
+            result.append(node + cols + 1)
+        if down and left and not cells[node + cols - 1]:
+            result.append(node + cols - 1)
+        if up and left and not cells[node - cols - 1]:
+            result.append(node - cols - 1)
+        if up and right and not cells[node - cols + 1]:
+            result.append(node - cols + 1)
+        return result
+
+    def edges(self, node):
+        """(neighbour, step cost) pairs for the weighted searches."""
+        costs = self.costs
+        if not self.diagonal:
+            # Same as neighbors(), inlined because this runs once per expansion
+            cells = self.cells
+            cols = self.cols
+            col = node % cols
+            nbs = []
+            nb = node + 1
+            if col + 1 < cols and not cells[nb]:
+                nbs.append(nb)
+            nb = node + cols
+            if nb < self.size and not cells[nb]:
+                nbs.append(nb)
+            nb = node - 1
+            if col and not cells[nb]:
+                nbs.append(nb)
+            nb = node - cols
+            if nb >= 0 and not cells[nb]:
+                nbs.append(nb)
+            # zip() recycles its result tuple when the caller unpacks it
+            if costs is None:
+                return zip(nbs, UNIT_STEPS)
+            return zip(nbs, map(costs.__getitem__, nbs))
+        return self._edges8(node)
+
+    def _edges8(self, node):
+        cells = self.cells
+        cols = self.cols
+        costs = self.costs
+        col = node % cols
+        nbs = []
+        right = col + 1 < cols and not cells[node + 1]
+        if right:
+            nbs.append(node + 1)
+        down = node + cols < self.size and not cells[node + cols]
+        if down:
+            nbs.append(node + cols)
+        left = col > 0 and not cells[node - 1]
+        if left:
+            nbs.append(node - 1)
+        up = node >= cols and not cells[node - cols]
+        if up:
+            nbs.append(node - cols)
+        straight = len(nbs)
+        if down and right and not cells[node + cols + 1]:
+            nbs.append(node + cols + 1)
+        if down and left and not cells[node + cols - 1]:
+            nbs.append(node + cols - 1)
+        if up and left and not cells[node - cols - 1]:
+            nbs.append(node - cols - 1)
+        if up and right and not cells[node - cols + 1]:
+            nbs.append(node - cols + 1)
+        if costs is None:
+            steps = [1] * straight + [SQRT2] * (len(nbs) - straight)
+        else:
+            steps = [costs[nb] for nb in nbs]
+            for i in range(straight, len(nbs)):
+                steps[i] *= SQRT2
+        return zip(nbs, steps)
+
+    def reverse_edges(self, node):
+        """(neighbour, cost of stepping from that neighbour into node) pairs."""
+        enter = 1 if self.costs is None else self.costs[node]
+        if not self.diagonal:
+            return zip(self.neighbors(node), repeat(enter))
+        cols = self.cols
+        diagonal_enter = enter * SQRT2
+        result = []
+        for nb in self.neighbors(node):
+            d = nb - node
+            straight = d == 1 or d == -1 or d == cols or d == -cols
+            result.append((nb, enter if straight else diagonal_enter))
+        return result
+
+    def heuristic(self, target, reverse=False):
+        """Admissible, consistent estimate of the cost from a node id to target.
+
+        Uses the attached landmark index while it matches the grid, else
+        base_heuristic(). With reverse the estimate is for the cost from
+        target to the node, which differs on weighted grids.
+        """
+        index = self.landmarks
+        if index is not None and index.valid:
+            return index.heuristic(target, reverse)
+        return self.base_heuristic(target)
+
+    def base_heuristic(self, target):
+        """Manhattan distance on 4-connected grids, octile distance with
+        diagonals, both scaled by the cheapest terrain cost.
+        """
+        cols = self.cols
+        tr, tc = divmod(target, cols)
+        scale = self.min_cost()
+        if not self.diagonal:
+            if scale == 1:
+                def h(node):
+                    r, c = divmod(node, cols)
+                    return abs(r - tr) + abs(c - tc)
+            else:
+                def h(node):
+                    r, c = divmod(node, cols)
+                    return scale * (abs(r - tr) + abs(c - tc))
+            return h
+        diagonal_extra = (SQRT2 - 1) * scale
+
+        def h(node):
+            r, c = divmod(node, cols)
+            dr, dc = abs(r - tr), abs(c - tc)
+            if dr < dc:
+                dr, dc = dc, dr
+            return scale * dr + diagonal_extra * dc
+        return h
+
+    def path_cost(self, path):
+        """Total cost of a list of (row, col) cells, the first one not counted."""
+        total = 0
+        for (r1, c1), (r2, c2) in zip(path, path[1:]):
+            step = self.cost(r2, c2)
+            total += step if r1 == r2 or c1 == c2 else step * SQRT2
+        return total
+
+    def workspace(self):
+        """Shared SearchSpace for this grid (one search at a time)."""
+        if self._space is None or self._space.size != self.size:
+            self._space = SearchSpace(self.size)
+        return self._space
+
+    def nbytes(self):
+        return len(self.cells)
@@ -0,0 +1,351 @@
+"""Hierarchical path-finding (HPA*) for large grids.
+
+The grid is cut into square clusters. Wherever two neighbouring clusters
+share a run of open cells along their border, one entrance (two for runs of
+six cells or more, at the ends) becomes a pair of abstract nodes, one on
+each side, joined by an inter-cluster edge. Inside every cluster the
+distances between its abstract nodes are precomputed with a search that
+never leaves the cluster.
+
+A query connects start and end to the abstract nodes of their clusters,
+runs A* on the small abstract graph, then refines each abstract edge into
+cells with a search confined to one cluster. Paths are near-optimal, not
+optimal: they must pass through the chosen entrances.
+
+The hierarchy listens to grid edits. An edited cell only marks its cluster
+dirty; before the next query the entrances on that cluster's borders are
+recomputed, and intra-cluster distances are redone for that cluster and
+for any neighbour whose shared border actually changed.
+
+Reference: Botea, Müller & Schaeffer, "Near Optimal Hierarchical
+Path-Finding" (2004).
+"""
+from array import array
+from heapq import heappush, heappop
+
+from engine import SearchResult, SearchStats
+
+CLUSTER_SIZE = 16
+LONG_ENTRANCE = 6  # runs at least this long get an entrance at each end
+
+
+class Hierarchy:
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE):
+        self.grid = grid
+        self.size = cluster_size
+        self.crows = -(-grid.rows // cluster_size)
+        self.ccols = -(-grid.cols // cluster_size)
+        self.borders = {}   # (cluster, right/lower neighbour) -> [(node, node across)]
+        self.inter = {}     # node -> {node across a border: cost of stepping there}
+        self.intra = {}     # cluster -> {node: {node in same cluster: cost}}
+        self.dirty = set()  # clusters with edited cells
+        self.diagonal = grid.diagonal
+        for cluster in range(self.crows * self.ccols):
+            for other in self._forward_neighbours(cluster):
+                self._build_border(cluster, other)
+        for cluster in range(self.crows * self.ccols):
+            self._build_intra(cluster)
+        grid.subscribe(self._cell_changed)
+
+    def close(self):
+        """Stop listening to grid edits."""
+        self.grid.unsubscribe(self._cell_changed)
+        if self.grid.hierarchy is self:
+            self.grid.hierarchy = None
+
+    # --- geometry ---
+
+    def cluster_of(self, node):
+        r, c = divmod(node, self.grid.cols)
+        return (r // self.size) * self.ccols + c // self.size
+
+    def bounds(self, cluster):
+        """(first row, first col, last row + 1, last col + 1) of a cluster."""
+        cr, cc = divmod(cluster, self.ccols)
+        size = self.size
+        return (cr * size, cc * size,
+                min((cr + 1) * size, self.grid.rows), min((cc + 1) * size, self.grid.cols))
+
+    def _forward_neighbours(self, cluster):
+        cr, cc = divmod(cluster, self.ccols)
+        if cc + 1 < self.ccols:
+            yield cluster + 1
+        if cr + 1 < self.crows:
+            yield cluster + self.ccols
+
+    def _neighbours(self, cluster):
+        cr, cc = divmod(cluster, self.ccols)
+        if cc > 0:
+            yield cluster - 1
+        if cr > 0:
+            yield cluster - self.ccols
+        yield from self._forward_neighbours(cluster)
+
+    def nodes(self, cluster):
+        """Abstract nodes inside a cluster."""
+        return self.intra.get(cluster, {}).keys()
+
+    # --- building ---
+
+    def _border_pairs(self, cluster, other):
+        """Entrance cell pairs on the border between a cluster and its right or lower neighbour."""
+        grid = self.grid
+        cells, cols = grid.cells, grid.cols
+        r0, c0, r1, c1 = self.bounds(cluster)
+        if other - cluster != self.ccols:  # not cluster + 1: with one column of clusters that is the one below
+            # Vertical border: column c1 - 1 faces column c1
+            across = [((r * cols + c1 - 1), (r * cols + c1)) for r in range(r0, r1)]
+        else:
+            across = [((r1 - 1) * cols + c, r1 * cols + c) for c in range(c0, c1)]
+        pairs, run = [], []
+        for a, b in across + [(None, None)]:
+            if a is not None and not cells[a] and not cells[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= LONG_ENTRANCE:
+                    pairs.extend((run[0], run[-1]))
+                else:
+                    pairs.append(run[len(run) // 2])
+                run = []
+        return pairs
+
+    def _build_border(self, cluster, other):
+        """(Re)compute one border's entrances; returns True if they changed."""
+        key = (cluster, other)
+        pairs = self._border_pairs(cluster, other)
+        old = self.borders.get(key, [])
+        # Entry costs may have changed even when the entrances did not
+        inter = self.inter
+        for a, b in old:
+            for node, across in ((a, b), (b, a)):
+                edges = inter.get(node)
+                if edges is not None:
+                    edges.pop(across, None)
+                    if not edges:
+                        del inter[node]
+        cost = self.grid.cost
+        cols = self.grid.cols
+        for a, b in pairs:
+            inter.setdefault(a, {})[b] = cost(*divmod(b, cols))
+            inter.setdefault(b, {})[a] = cost(*divmod(a, cols))
+        self.borders[key] = pairs
+        return pairs != old
+
+    def _entrances(self, cluster):
+        """Abstract nodes of a cluster: its side of every border entrance."""
+        found = set()
+        for other in self._neighbours(cluster):
+            key = (cluster, other) if cluster < other else (other, cluster)
+            side = 0 if cluster < other else 1
+            for pair in self.borders.get(key, ()):
+                found.add(pair[side])
+        return found
+
+    def _build_intra(self, cluster):
+        nodes = self._entrances(cluster)
+        bounds = self.bounds(cluster)
+        table = {}
+        for node in nodes:
+            dist = self.local_distances(node, bounds, nodes)
+            table[node] = {other: d for other, d in dist.items() if other != node}
+        self.intra[cluster] = table
+
+    def _cell_changed(self, node):
+        if node is None:
+            self.dirty.update(range(self.crows * self.ccols))
+        else:
+            self.dirty.add(self.cluster_of(node))
+
+    def refresh(self):
+        """Rebuild what edits since the last query invalidated."""
+        if self.grid.diagonal != self.diagonal:
+            # Every intra-cluster distance depends on the movement model
+            self.diagonal = self.grid.diagonal
+            self.dirty.update(range(self.crows * self.ccols))
+        if not self.dirty:
+            return
+        rebuild = set(self.dirty)
+        for cluster in self.dirty:
+            for other in self._neighbours(cluster):
+                key = (cluster, other) if cluster < other else (other, cluster)
+                if self._build_border(*key):
+                    rebuild.add(other)
+        self.dirty.clear()
+        for cluster in rebuild:
+            self._build_intra(cluster)
+
+    # --- searching ---
+
+    def local_distances(self, source, bounds, targets, reverse=False):
+        """Costs from source (to source if reverse) to the targets, never leaving bounds."""
+        grid = self.grid
+        cols = grid.cols
+        r0, c0, r1, c1 = bounds
+        edges = grid.reverse_edges if reverse else grid.edges
+        dist = {source: 0}
+        found = {}
+        done = set()
+        pq = [(0, source)]
+        remaining = len(targets)
+        while pq and remaining:
+            d, current = heappop(pq)
+            if current in done:
+                continue
+            done.add(current)
+            if current in targets:
+                found[current] = d
+                remaining -= 1
+            for nb, step in edges(current):
+                r, c = divmod(nb, cols)
+                if r0 <= r < r1 and c0 <= c < c1 and nb not in done:
+                    new_dist = d + step
+                    if new_dist < dist.get(nb, float('inf')):
+                        dist[nb] = new_dist
+                        heappush(pq, (new_dist, nb))
+        return found
+
+    def local_path(self, source, target, bounds, trace):
+        """Node ids of a cheapest path from source to target inside bounds (A*)."""
+        grid = self.grid
+        cols = grid.cols
+        r0, c0, r1, c1 = bounds
+        h = grid.heuristic(target)
+        g = {source: 0}
+        parent = {source: -1}
+        closed = set()
+        pq = [(h(source), source)]
+        while pq:
+            _, current = heappop(pq)
+            if current in closed:
+                continue
+            closed.add(current)
+            if current == target:
+                path = [current]
+                while parent[path[-1]] != -1:
+                    path.append(parent[path[-1]])
+                path.reverse()
+                return path
+            for nb, step in grid.edges(current):
+                r, c = divmod(nb, cols)
+                if r0 <= r < r1 and c0 <= c < c1 and nb not in closed:
+                    tentative = g[current] + step
+                    if tentative < g.get(nb, float('inf')):
+                        g[nb] = tentative
+                        parent[nb] = current
+                        heappush(pq, (tentative + h(nb), nb))
+                        trace.append(nb)
+        return []
+
+    def search(self, source, target):
+        """HPA* query between two node ids; returns a SearchResult named "hpa"."""
+        self.refresh()
+        grid = self.grid
+        trace = array("i")
+        name = "hpa"
+        coords = grid.coords
+        if source == target:
+            return SearchResult(name, coords(source), coords(target), [coords(source)], trace)
+        if grid.cells[target]:
+            return SearchResult(name, coords(source), coords(target), [], trace)  # like the flat searches
+
+        # Temporary edges for the endpoints, without touching the stored graph.
+        # A start inside a wall (the flat searches allow one) leaves through
+        # its neighbours, which may lie in other clusters.
+        end_cluster = self.cluster_of(target)
+        origins = list(grid.edges(source)) if grid.cells[source] else [(source, 0)]
+        start_edges, start_via = {}, {}
+        for origin, offset in origins:
+            cluster = self.cluster_of(origin)
+            targets = set(self.nodes(cluster))
+            if cluster == end_cluster:
+                targets.add(target)
+            for node, d in self.local_distances(origin, self.bounds(cluster), targets).items():
+                if node != source and offset + d < start_edges.get(node, float('inf')):
+                    start_edges[node] = offset + d
+                    start_via[node] = origin
+        end_nodes = set(self.nodes(end_cluster))
+        into_end = self.local_distances(target, self.bounds(end_cluster), end_nodes, reverse=True)
+
+        def edges(node):
+            if node == source:
+                yield from start_edges.items()
+                yield from self.inter.get(node, {}).items()
+                return
+            yield from self.intra[self.cluster_of(node)].get(node, {}).items()
+            yield from self.inter.get(node, {}).items()
+            if node in into_end:
+                yield target, into_end[node]
+
+        h = grid.heuristic(target)
+        g = {source: 0}
+        parent = {source: -1}
+        closed = set()
+        pq = [(h(source), source)]
+        expanded = max_open = 0
+        abstract = []
+        while pq:
+            _, current = heappop(pq)
+            if current in closed:
+                continue
+            closed.add(current)
+            expanded += 1
+            if current == target:
+                abstract = [current]
+                while parent[abstract[-1]] != -1:
+                    abstract.append(parent[abstract[-1]])
+                abstract.reverse()
+                break
+            for nb, cost in edges(current):
+                if nb in closed:
+                    continue
+                tentative = g[current] + cost
+                if tentative < g.get(nb, float('inf')):
+                    g[nb] = tentative
+                    parent[nb] = current
+                    heappush(pq, (tentative + h(nb), nb))
+                    trace.append(nb)
+            max_open = max(max_open, len(pq))
+
+        stats = SearchStats(expanded, len(trace), 0, max_open)
+        if not abstract:
+            return SearchResult(name, coords(source), coords(target), [], trace, stats=stats)
+
+        # Refine: inter-cluster edges are single steps, the rest local searches
+        path = [source]
+        for a, b in zip(abstract, abstract[1:]):
+            if a == source and b in start_via:
+                origin = start_via[b]
+                if origin != source:
+                    path.append(origin)
+                path.extend(self.local_path(origin, b, self.bounds(self.cluster_of(origin)), trace)[1:])
+                continue
+            cluster = self.cluster_of(a)
+            if cluster != self.cluster_of(b):
+                path.append(b)
+            else:
+                path.extend(self.local_path(a, b, self.bounds(cluster), trace)[1:])
+        stats.generated = len(trace)  # refinement pushes count too
+        cells = [coords(node) for node in path]
+        return SearchResult(name, coords(source), coords(target), cells, trace,
+                            grid.path_cost(cells), stats)
+
+    def nbytes(self):
+        """Rough size of the abstract graph in bytes (64 per stored edge)."""
+        edges = sum(len(e) for e in self.inter.values())
+        edges += sum(len(e) for table in self.intra.values() for e in table.values())
+        return edges * 64
+
+
+def hierarchy_for(grid, cluster_size=CLUSTER_SIZE):
+    """The grid's attached Hierarchy, built and attached on first use."""
+    hierarchy = grid.hierarchy
+    if hierarchy is None or hierarchy.size != cluster_size:
+        if hierarchy is not None:
+            hierarchy.close()
+        hierarchy = grid.hierarchy = Hierarchy(grid, cluster_size)
+    return hierarchy
+
+
+def hpa_search(grid, source, target):
+    return hierarchy_for(grid).search(source, target)
@@ -0,0 +1,82 @@
+"""Compiled BFS, Dijkstra and A*, with the pure-Python engine as fallback.
+
+The searches in _kernel.c walk the grid's flat cell and cost buffers and
+write into the same SearchSpace arrays as engine.py, in the same order, so
+paths, traces and SearchStats are identical; only the inner loop no longer
+runs in the interpreter (and without holding the GIL). Build the module
+with ``python build_kernel.py``. When it is missing, each function here
+quietly runs its engine.py counterpart instead, and so does astar() while a
+landmark index (landmarks.py) supplies the heuristic.
+
+Pass compiled=True to engine.solve(), or --compiled to cli.py, to use it.
+"""
+from array import array
+
+import engine
+from engine import SearchResult, SearchStats
+from grid import SQRT2
+
+try:
+    import _kernel
+except ImportError:
+    _kernel = None
+
+
+def available():
+    """True if the compiled module is built and importable."""
+    return _kernel is not None
+
+
+def _result(grid, name, source, target, space, raw, found, stats):
+    """engine._finish() with the path and its cost built by the kernel."""
+    trace = array("i")
+    trace.frombytes(raw)
+    stats.generated = len(trace)
+    path, cost = [], None
+    if found:
+        path, cost = _kernel.path(space.parent, grid.costs, grid.rows, grid.cols, source, target)
+    return SearchResult(name, grid.coords(source), grid.coords(target), path, trace, cost, stats)
+
+
+def bfs(grid, source, target):
+    if _kernel is None:
+        return engine.bfs(grid, source, target)
+    space = grid.workspace()
+    stamp = space.begin()
+    found, raw, expanded, stale, max_open = _kernel.bfs(
+        grid.cells, grid.rows, grid.cols, grid.diagonal, source, target,
+        space.opened, space.parent, stamp)
+    stats = SearchStats(expanded, 0, stale, max_open)
+    return _result(grid, "bfs", source, target, space, raw, found, stats)
+
+
+def _best_first(grid, name, source, target, heuristic):
+    space = grid.workspace()
+    stamp = space.begin()
+    scale = grid.min_cost()
+    found, raw, expanded, stale, max_open = _kernel.best_first(
+        grid.cells, grid.costs, grid.rows, grid.cols, grid.diagonal, source, target,
+        space.opened, space.closed, space.parent, space.dist, stamp,
+        heuristic, scale, (SQRT2 - 1) * scale)
+    stats = SearchStats(expanded, 0, stale, max_open)
+    return _result(grid, name, source, target, space, raw, found, stats)
+
+
+def dijkstra(grid, source, target):
+    if _kernel is None:
+        return engine.dijkstra(grid, source, target)
+    return _best_first(grid, "dijkstra", source, target, False)
+
+
+def astar(grid, source, target):
+    index = grid.landmarks
+    if _kernel is None or (index is not None and index.valid):
+        return engine.astar(grid, source, target)
+    return _best_first(grid, "astar", source, target, True)
+
+
+ALGORITHMS = {
+    "bfs": bfs,
+    "dijkstra": dijkstra,
+    "astar": astar,
+}
@@ -0,0 +1,307 @@
+"""Landmark (ALT) lower bounds for A* on static maps.
+
+A few landmark cells are chosen far apart, and the exact distance from each
+landmark to every cell is stored. By the triangle inequality
+|d(L, target) - d(L, node)| never exceeds the true distance from node to
+target, and around long walls it is far tighter than Manhattan distance.
+On weighted grids the cost of a move depends on the entered cell, so the
+distances to each landmark are stored as well and both directed bounds used.
+
+Build an index once per map and save it next to the map file:
+
+    python landmarks.py map.txt [--count 8] [--diagonal]
+
+cli.py and the GUI pick up MAP.alt automatically. The file is memory-mapped
+when loaded, so tables for big maps are paged in on demand rather than read
+up front. Once attached, Grid.heuristic() returns ALT bounds; any wall or
+terrain edit marks the index stale, searches fall back to the plain
+heuristic, and rebuild() recomputes the tables for the edited grid.
+"""
+import argparse
+import mmap
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+from collections import deque
+from heapq import heappush, heappop
+
+MAGIC = b"ALT1"
+HEADER = struct.Struct("<4sBBHIIII")  # magic, flags, typecode, reserved, rows, cols, count, fingerprint
+DIAGONAL = 1
+DIRECTED = 2
+
+UNREACHABLE = 1e30  # any finite bound minus this is hugely negative, two of these cancel
+INT_UNREACHABLE = 2 ** 31 - 1
+
+# Sums of diagonal steps are irrational, so bounds made of them are shrunk a
+# hair to stay below the true cost despite rounding.
+FLOAT_SHRINK = 1 - 1e-9
+
+
+def index_path(map_path):
+    """Where the index for a map file lives."""
+    return map_path + ".alt"
+
+
+def fingerprint(grid):
+    """Checksum of the walls and terrain, stored in the index to catch edited maps."""
+    crc = zlib.crc32(grid.cells)
+    if grid.costs is not None:
+        crc = zlib.crc32(grid.costs, crc)
+    return crc
+
+
+def distances(grid, source, reverse=False):
+    """Cost from source to every cell (to source from every cell if reverse).
+
+    Unreachable cells and walls hold UNREACHABLE (INT_UNREACHABLE in the
+    integer tables used for plain 4-connected grids).
+    """
+    size = grid.size
+    if grid.uniform:
+        dist = array("i", [INT_UNREACHABLE]) * size
+        dist[source] = 0
+        neighbors = grid.neighbors
+        queue = deque([source])
+        while queue:
+            current = queue.popleft()
+            d = dist[current] + 1
+            for nb in neighbors(current):
+                if dist[nb] == INT_UNREACHABLE:
+                    dist[nb] = d
+                    queue.append(nb)
+        return dist
+
+    dist = array("d", [UNREACHABLE]) * size
+    done = bytearray(size)
+    edges = grid.reverse_edges if reverse else grid.edges
+    dist[source] = 0
+    pq = [(0, source)]
+    while pq:
+        d, current = heappop(pq)
+        if done[current]:
+            continue
+        done[current] = 1
+        for nb, step in edges(current):
+            new_dist = d + step
+            if new_dist < dist[nb]:
+                dist[nb] = new_dist
+                heappush(pq, (new_dist, nb))
+    return dist
+
+
+def _farthest(grid, nearest, unreachable):
+    """Open cell with the largest finite distance to its nearest landmark so far."""
+    best, best_dist = -1, -1
+    cells = grid.cells
+    for node, d in enumerate(nearest):
+        if best_dist < d < unreachable and not cells[node]:
+            best, best_dist = node, d
+    return best
+
+
+def select(grid, count=8, seed=0):
+    """Pick up to count landmarks by farthest-point selection.
+
+    Returns (landmark ids, distance tables from them, tables to them or None
+    when moves cost the same both ways).
+    """
+    open_cells = [node for node in range(grid.size) if not grid.cells[node]]
+    if not open_cells:
+        return [], [], None
+    directed = grid.costs is not None
+    # The first landmark is the cell farthest from a random start, each
+    # next one the cell farthest from all landmarks chosen so far
+    nearest = distances(grid, random.Random(seed).choice(open_cells))
+    unreachable = INT_UNREACHABLE if nearest.typecode == "i" else UNREACHABLE
+    landmarks, tables_from, tables_to = [], [], []
+    for _ in range(count):
+        node = _farthest(grid, nearest, unreachable)
+        if node == -1 or node in landmarks:
+            break
+        table = distances(grid, node)
+        landmarks.append(node)
+        tables_from.append(table)
+        if directed:
+            tables_to.append(distances(grid, node, reverse=True))
+        if len(landmarks) == 1:
+            nearest = table
+        else:
+            nearest = array(table.typecode, map(min, nearest, table))
+    return landmarks, tables_from, tables_to if directed else None
+
+
+class LandmarkIndex:
+    def __init__(self, grid, landmarks, tables_from, tables_to=None, diagonal=None):
+        self.grid = grid
+        self.landmarks = landmarks      # node ids
+        self.tables_from = tables_from  # tables_from[k][node] = d(landmark k, node)
+        self.tables_to = tables_to      # d(node, landmark k); None when edges are symmetric
+        self.diagonal = grid.diagonal if diagonal is None else diagonal
+        self.stale = False
+        self._mmap = None
+        grid.subscribe(self._cell_changed)
+
+    @classmethod
+    def build(cls, grid, count=8, seed=0):
+        """Choose count landmarks and compute their distance tables."""
+        return cls(grid, *select(grid, count, seed))
+
+    def close(self):
+        """Stop listening to grid edits and release the mapped file."""
+        self.grid.unsubscribe(self._cell_changed)
+        if self.grid.landmarks is self:
+            self.grid.landmarks = None
+        self.tables_from = self.tables_to = None
+        self._release()
+
+    def _release(self):
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # a heuristic still holds table views; the map goes with them
+            self._mmap = None
+
+    def _cell_changed(self, node):
+        self.stale = True
+
+    @property
+    def valid(self):
+        """True while the tables still describe the grid they were built for."""
+        return not self.stale and self.grid.diagonal == self.diagonal and bool(self.landmarks)
+
+    def rebuild(self):
+        """Recompute landmarks and tables for the grid as it is now."""
+        landmarks, tables_from, tables_to = select(self.grid, len(self.landmarks) or 8)
+        self.tables_from = self.tables_to = None
+        self._release()
+        self.landmarks, self.tables_from, self.tables_to = landmarks, tables_from, tables_to
+        self.diagonal = self.grid.diagonal
+        self.stale = False
+
+    def heuristic(self, target, reverse=False):
+        """Lower bound on the cost from a node id to target (from target to the node if reverse)."""
+        base = self.grid.base_heuristic(target)
+        if self.tables_to is None:
+            pairs = [(table, table[target]) for table in self.tables_from]
+
+            def h(node):
+                best = base(node)
+                for table, dt in pairs:
+                    d = table[node] - dt
+                    if d < 0:
+                        d = -d
+                    if d > best:
+                        best = d
+                return best
+        elif not reverse:
+            # d(node, target) >= d(L, target) - d(L, node) and >= d(node, L) - d(target, L)
+            pairs = [(f, f[target], t, t[target]) for f, t in zip(self.tables_from, self.tables_to)]
+
+            def h(node):
+                best = base(node)
+                for f, ft, t, tt in pairs:
+                    d = max(ft - f[node], t[node] - tt)
+                    if d > best:
+                        best = d
+                return best
+        else:
+            pairs = [(f, f[target], t, t[target]) for f, t in zip(self.tables_from, self.tables_to)]
+
+            def h(node):
+                best = base(node)
+                for f, ft, t, tt in pairs:
+                    d = max(f[node] - ft, tt - t[node])
+                    if d > best:
+                        best = d
+                return best
+        if not self.diagonal:
+            return h  # integer costs, the bounds are exact
+        return lambda node: h(node) * FLOAT_SHRINK
+
+    def save(self, path):
+        tables = list(self.tables_from) + list(self.tables_to or [])
+        typecode = tables[0].typecode if tables else "i"
+        flags = (DIAGONAL if self.diagonal else 0) | (DIRECTED if self.tables_to is not None else 0)
+        grid = self.grid
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, flags, ord(typecode), 0, grid.rows, grid.cols,
+                                len(self.landmarks), fingerprint(grid)))
+            f.write(array("i", self.landmarks).tobytes())
+            for table in tables:
+                f.write(table.tobytes() if isinstance(table, array) else bytes(table))
+
+    @classmethod
+    def load(cls, path, grid):
+        """Map an index file for grid; ValueError if it was built for a different map."""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, flags, typecode, _, rows, cols, count, crc = HEADER.unpack_from(mm)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a landmark index")
+            if (rows, cols) != (grid.rows, grid.cols) or crc != fingerprint(grid):
+                raise ValueError(f"{path} was built for a different map")
+            typecode = chr(typecode)
+            view = memoryview(mm)
+            offset = HEADER.size
+            landmarks = list(view[offset:offset + 4 * count].cast("i"))
+            offset += 4 * count
+            table_bytes = grid.size * struct.calcsize(typecode)
+            tables = []
+            for _ in range(count * (2 if flags & DIRECTED else 1)):
+                tables.append(view[offset:offset + table_bytes].cast(typecode))
+                offset += table_bytes
+        except (ValueError, struct.error):
+            mm.close()
+            raise
+        index = cls(grid, landmarks, tables[:count], tables[count:] if flags & DIRECTED else None,
+                    diagonal=bool(flags & DIAGONAL))
+        index._mmap = mm
+        return index
+
+
+def attach(grid, index):
+    """Make grid.heuristic() use index while it is valid."""
+    if grid.landmarks is not None and grid.landmarks is not index:
+        grid.landmarks.close()
+    grid.landmarks = index
+    return index
+
+
+def load_for(grid, map_path):
+    """Attach the index saved next to map_path if there is a matching one; returns it or None."""
+    try:
+        index = LandmarkIndex.load(index_path(map_path), grid)
+    except (OSError, ValueError):
+        return None
+    return attach(grid, index)
+
+
+def main(argv=None):
+    from boardfile import load_map
+    parser = argparse.ArgumentParser(description="Build a landmark (ALT) heuristic index for a map file.")
+    parser.add_argument("map_file")
+    parser.add_argument("--count", "-k", type=int, default=8, help="number of landmarks (default 8)")
+    parser.add_argument("--diagonal", action="store_true", help="build for diagonal moves")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", "-o", help="index file (default MAP_FILE.alt)")
+    args = parser.parse_args(argv)
+
+    grid, _, _ = load_map(args.map_file)
+    grid.diagonal = grid.diagonal or args.diagonal
+    started = time.perf_counter()
+    index = LandmarkIndex.build(grid, args.count, args.seed)
+    path = args.output or index_path(args.map_file)
+    index.save(path)
+    print(f"{len(index.landmarks)} landmarks for {grid.rows}x{grid.cols} written to {path} "
+          f"in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Reference dict-based implementations of the five searches.
+
+These keep the original set-of-tuples / dict-of-tuples bookkeeping and are
+only used as the baseline in benchmark.py and as a correctness oracle for
+the flat-array engine. Their traces hold (row, col) tuples, not node ids.
+"""
+from collections import deque
+from heapq import heappush, heappop
+
+from engine import SearchResult, heuristic
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+
+def build_path(parent, start, end):
+    if end != start and end not in parent:
+        return []
+    path = [end]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
+
+
+def _neighbors(grid, row, col):
+    for dr, dc in DIRECTIONS:
+        nr, nc = row + dr, col + dc
+        if 0 <= nr < grid.rows and 0 <= nc < grid.cols and not grid.is_wall(nr, nc):
+            yield nr, nc
+
+
+def dfs(grid, start, end):
+    stack = [start]
+    visited = set([start])
+    parent = {}
+    trace = []
+
+    while stack:
+        current = stack.pop()
+        if current == end:
+            return SearchResult("dfs", start, end, build_path(parent, start, end), trace)
+
+        for neighbor in _neighbors(grid, *current):
+            if neighbor not in visited:
+                stack.append(neighbor)
+                visited.add(neighbor)
+                parent[neighbor] = current
+                trace.append(neighbor)
+
+    return SearchResult("dfs", start, end, [], trace)
+
+
+def bfs(grid, start, end):
+    queue = deque([start])
+    visited = set([start])
+    parent = {}
+    trace = []
+
+    while queue:
+        current = queue.popleft()
+        if current == end:
+            return SearchResult("bfs", start, end, build_path(parent, start, end), trace)
+
+        for neighbor in _neighbors(grid, *current):
+            if neighbor not in visited:
+                queue.append(neighbor)
+                visited.add(neighbor)
+                parent[neighbor] = current
+                trace.append(neighbor)
+
+    return SearchResult("bfs", start, end, [], trace)
+
+
+def dijkstra(grid, start, end):
+    pq = [(0, start)]  # (distance, node)
+    visited = set()
+    parent = {}
+    distance = {start: 0}
+    trace = []
+
+    while pq:
+        dist, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+
+        if current == end:
+            return SearchResult("dijkstra", start, end, build_path(parent, start, end), trace)
+
+        for neighbor in _neighbors(grid, *current):
+            if neighbor not in visited:
+                new_dist = dist + 1  # All edges weight = 1
+                if new_dist < distance.get(neighbor, float('inf')):
+                    distance[neighbor] = new_dist
+                    parent[neighbor] = current
+                    heappush(pq, (new_dist, neighbor))
+                    trace.append(neighbor)
+
+    return SearchResult("dijkstra", start, end, [], trace)
+
+
+def astar(grid, start, end):
+    pq = [(heuristic(start, end), start)]  # (f_score, node)
+    visited = set()
+    parent = {}
+    g_score = {start: 0}  # Distance from start
+    trace = []
+
+    while pq:
+        _, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+
+        if current == end:
+            return SearchResult("astar", start, end, build_path(parent, start, end), trace)
+
+        for neighbor in _neighbors(grid, *current):
+            if neighbor not in visited:
+                tentative_g = g_score[current] + 1  # Cost from start to neighbor
+                if tentative_g < g_score.get(neighbor, float('inf')):
+                    parent[neighbor] = current
+                    g_score[neighbor] = tentative_g
+                    heappush(pq, (tentative_g + heuristic(neighbor, end), neighbor))
+                    trace.append(neighbor)
+
+    return SearchResult("astar", start, end, [], trace)
+
+
+def greedy_best_first(grid, start, end):
+    pq = [(heuristic(start, end), start)]  # (priority, node)
+    visited = set()
+    parent = {}
+    trace = []
+
+    while pq:
+        _, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+
+        if current == end:
+            return SearchResult("greedy", start, end, build_path(parent, start, end), trace)
+
+        for neighbor in _neighbors(grid, *current):
+            if neighbor not in visited:
+                parent[neighbor] = current
+                heappush(pq, (heuristic(neighbor, end), neighbor))
+                trace.append(neighbor)
+
+    return SearchResult("greedy", start, end, [], trace)
+
+
+ALGORITHMS = {
+    "bfs": bfs,
+    "dfs": dfs,
+    "astar": astar,
+    "dijkstra": dijkstra,
+    "greedy": greedy_best_first,
+}
@@ -0,0 +1,141 @@
+"""Load generator for service.py.
+
+Usage:
+    python loadgen.py [--url http://127.0.0.1:8765] [--map NAME] [--load PATH]
+                      [--concurrency 16] [--requests 2000] [--algorithm astar]
+                      [--edits 0.0] [--seed 1]
+
+Each of --concurrency threads keeps one HTTP connection open and sends
+queries between random cells of the map back to back; a fraction --edits
+of the requests toggle a random wall instead. Prints the latency percentiles
+and throughput seen by the clients, then the server's own /stats.
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from service import percentiles
+
+
+class Client:
+    def __init__(self, host, port):
+        self.conn = http.client.HTTPConnection(host, port)
+
+    def request(self, method, path, body=None):
+        """(status, decoded JSON body) of one request on the kept-alive connection."""
+        data = json.dumps(body).encode() if body is not None else None  # bytes go out with the headers
+        self.conn.request(method, path, data, {"Content-Type": "application/json"})
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    def close(self):
+        self.conn.close()
+
+
+def run(host, port, name, rows, cols, concurrency, requests, algorithm, edits, seed):
+    """Drive the service from concurrency threads; returns (latencies in ms, failures, seconds)."""
+    latencies, failures = [], []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client(number):
+        rng = random.Random(seed * 1000 + number)
+        conn = Client(host, port)
+        local = []
+
+        def cell():
+            return [rng.randrange(rows), rng.randrange(cols)]
+
+        try:
+            for _ in counter:  # shared, so the threads split the requests between them
+                started = time.perf_counter()
+                if rng.random() < edits:
+                    status, body = conn.request("POST", f"/maps/{name}/edit",
+                                                {"walls": [cell() + [rng.random() < 0.5]]})
+                else:
+                    status, body = conn.request("POST", f"/maps/{name}/query",
+                                                {"start": cell(), "end": cell(), "algorithm": algorithm,
+                                                 "path": False})
+                local.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    with lock:
+                        failures.append((status, body.get("error")))
+        finally:
+            conn.close()
+            with lock:
+                latencies.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, failures, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send concurrent path queries to a running service.py.")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--map", default=None, help="map name on the server (default: the first one loaded)")
+    parser.add_argument("--load", default=None, metavar="PATH",
+                        help="have the server load this map file first, under --map or its file name")
+    parser.add_argument("--concurrency", "-c", type=int, default=16, help="client threads (default 16)")
+    parser.add_argument("--requests", "-n", type=int, default=2000, help="total requests (default 2000)")
+    parser.add_argument("--algorithm", default="astar")
+    parser.add_argument("--edits", type=float, default=0.0,
+                        help="fraction of requests that toggle a random wall instead of querying")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    admin = Client(url.hostname or "127.0.0.1", url.port or 80)
+    try:
+        if args.load:
+            name = args.map or args.load.replace("\\", "/").rsplit("/", 1)[-1].rsplit(".", 1)[0]
+            status, body = admin.request("POST", "/maps", {"name": name, "path": args.load})
+            if status != 200:
+                print(f"Could not load {args.load}: {body.get('error')}", file=sys.stderr)
+                return 1
+            args.map = name
+        status, body = admin.request("GET", "/maps")
+        maps = {info["name"]: info for info in body["maps"]}
+        if not maps:
+            print("The server has no maps loaded; pass --load PATH", file=sys.stderr)
+            return 1
+        info = maps.get(args.map or next(iter(maps)))
+        if info is None:
+            print(f"No map named {args.map} on the server, it has {', '.join(maps)}", file=sys.stderr)
+            return 1
+
+        print(f"{args.requests} requests to {info['name']} ({info['rows']}x{info['cols']}) "
+              f"from {args.concurrency} clients, {args.algorithm}, {args.edits:.0%} edits")
+        latencies, failures, elapsed = run(url.hostname or "127.0.0.1", url.port or 80, info["name"],
+                                           info["rows"], info["cols"], args.concurrency, args.requests,
+                                           args.algorithm, args.edits, args.seed)
+        client = percentiles(latencies)
+        print(f"client: {len(latencies) / elapsed:.0f} requests/s over {elapsed:.2f} s, latency ms "
+              + " ".join(f"{key} {value:.2f}" for key, value in client.items()))
+        if failures:
+            print(f"{len(failures)} failed, first: {failures[0]}")
+        _, stats = admin.request("GET", "/stats")
+        server = stats["latency_ms"]
+        print(f"server: {stats['queries']} queries in {stats['batches']} batches "
+              f"(mean {stats['mean_batch']:.1f}), {stats['recent_queries_per_s']:.0f} queries/s recently, "
+              f"latency ms " + " ".join(f"{key} {server[key]:.2f}" for key in ("p50", "p90", "p99", "max")
+                                        if server[key] is not None))
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Could not reach {args.url}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        admin.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,678 +1,933 @@
-import tkinter as tk
-from tkinter import messagebox
-from collections import deque
-import random
-import os
-SETTINGS_FILE = "settings.txt"
-
-def load_settings():
-    """Read settings from file, return dictionary."""
-    if not os.path.exists(SETTINGS_FILE):
-        return {"show_tutorial": True}
-    with open(SETTINGS_FILE, "r") as f:
-        lines = f.readlines()
-    settings = {}
-    for line in lines:
-        key, value = line.strip().split("=")
-        settings[key] = value.lower() == "true"
-    return settings
-
-def save_settings(settings):
-    """Save settings to file."""
-    with open(SETTINGS_FILE, "w") as f:
-        for key, value in settings.items():
-            f.write(f"{key}={'True' if value else 'False'}\n")
-
-def show_tutorial():
-    tutorial = tk.Tk()
-    tutorial.title("Pathfinding Visualizer - Tutorial")
-    tutorial.geometry("550x500")
-    tutorial.config(bg="white")
-
-    title = tk.Label(
-        tutorial, 
-        text="Welcome to Pathfinding Visualizer", 
-        font=("Arial", 16, "bold"),
-        pady=10,
-        bg="white"
-    )
-    title.pack()
-
-    info = """    
-This tool helps you visualize popular pathfinding algorithms.
-
-What is a pathfinding algorithm?
-At its core, a pathfinding algorithm seeks to find the shortest path between two points. This application visualizes various pathfinding algorithms in action!
-
-If you want to dive right in, feel free to press the "Skip Tutorial" button below.
-Controls:
-• Press 'S'and click on the grid  to set the START node (green).
-• Press 'E' and click on the grid to set the END node (red).
-• Press 'W' or double-click drag mouse to place WALLS (black).
-• Use the right-side panel to select algorithms.
-• Control the speed of the animation with the speed options on the right-side panel
-• After running, the shortest path is shown in light blue.
-
-Features:
-• Supports BFS, DFS, A*, Dijkstra, and Greedy BFS.
-• Weighted & unweighted algorithms.
-• Live animation of search process.
-• Clear the grid with the "Clear Board" button.
-• Click on the grid to place/remove walls.
-• Double-click to toggle drag mode for placing/removing walls.
-• speed control of animation.
-    """
-    tk.Label(
-        tutorial,
-        text=info,
-        font=("Arial", 11),
-        justify="left",
-        padx=20,
-        pady=10,
-        bg="white"
-    ).pack()
-
-    dont_show_var = tk.BooleanVar(value=False)
-    tk.Checkbutton(
-        tutorial, 
-        text="Don't show this tutorial again", 
-        variable=dont_show_var,
-        bg="white",
-        font=("Arial", 10)
-    ).pack(pady=5)
-
-    btn_frame = tk.Frame(tutorial, bg="white")
-    btn_frame.pack(pady=15)
-
-    tk.Button(
-        btn_frame, 
-        text="Start Visualizing", 
-        font=("Arial", 12, "bold"),
-        bg="#27AE60", 
-        fg="white", 
-        width=15,
-        command=lambda: start_main(tutorial, dont_show_var)
-    ).grid(row=0, column=0, padx=10)
-
-    tk.Button(
-        btn_frame, 
-        text="Skip Tutorial", 
-        font=("Arial", 12, "bold"),
-        bg="#7F8C8D", 
-        fg="white", 
-        width=15,
-        command=lambda: start_main(tutorial, dont_show_var)
-    ).grid(row=0, column=1, padx=10)
-
-    tutorial.mainloop()
-
-def start_main(tutorial_window, dont_show_var):
-    settings = load_settings()
-    if dont_show_var.get():
-        settings["show_tutorial"] = False
-        save_settings(settings)
-    tutorial_window.destroy()
-    run_visualizer()
-    
-
-# Constants
-ROWS, COLS = 20, 40  # Grid size
-CELL_SIZE = 25
-WIDTH = COLS * CELL_SIZE
-HEIGHT = ROWS * CELL_SIZE
-
-# Colors
-EMPTY_COLOR = "white"
-WALL_COLOR = "black"
-class PathfindingVisualizer:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Pathfinding Visualizer")
-
-        self.grid = [[0 for _ in range(COLS)] for _ in range(ROWS)]  # 0=empty, 1=wall
-        self.start = None
-        self.end = None
-
-        self.mode = "wall"
-        self.drag_mode = True
-        self.is_running = False
-
-        self.algo_descriptions = {
-            "BFS": "Breath-first Search is unweighted and guarantees the shortest path!",
-            "DFS": "Depth-first Search is unweighted and does not guarantee the shortest path!",
-            "A*": "A* Search is weighted and guarantees the shortest path!",
-            "Dijkstra": "Dijkstra's Algorithm is weighted and guarantees the shortest path!",
-            "Greedy BFS": "Greedy Best-first Search is weighted and does not guarantee the shortest path!"
-}
-
-        # Main container
-        main_frame = tk.Frame(self.root)
-        main_frame.pack(fill="both", expand=True)
-
-        # 📌 Legend Frame (above the grid)
-        legend_frame = tk.Frame(main_frame)
-        legend_frame.pack(side="top", pady=10)
-
-        def add_legend_item(parent, color, text):
-            box = tk.Label(parent, bg=color, width=2, height=1, relief="solid", borderwidth=1)
-            box.pack(side="left", padx=(0, 5))
-            label = tk.Label(parent, text=text)
-            label.pack(side="left", padx=(0, 15))
-
-        # Add legend items
-        add_legend_item(legend_frame, "green", "Start Node")
-        add_legend_item(legend_frame, "red", "End Node")
-        add_legend_item(legend_frame, "white", "Unvisited Node")
-        add_legend_item(legend_frame, "black", "Wall Node")
-        add_legend_item(legend_frame, "lightblue", "Shortest Path Found")
-        label = tk.Label(legend_frame,   font=("Arial", 13, "bold"), text="Visited nodes: shown in random colors", fg="#34495E") # Dark grayish blue
-        label.pack(side="left", padx=(0, 15))
-
-        #Left panel (Description+Grid)
-        left_panel = tk.Frame(main_frame, bg="midnight blue")
-        left_panel.pack(side="left", fill="both", expand=True)
-
-        # Description label above the grid
-        self.algo_description = tk.Label(
-            left_panel,
-            text="Select an algorithm to see details",
-            font=("Arial", 14, "italic"),
-            fg="white",
-            bg="medium aquamarine",
-            anchor="w",
-            wraplength=500,
-            justify="left"
-        )
-        self.algo_description.pack(pady=10)
-        # Canvas for grid
-        self.canvas = tk.Canvas(left_panel, width=600, height=600, bg="white")
-        self.canvas.pack(padx=10, pady=10, fill="both", expand=True)
-
-        # Right panel for controls
-        side_frame = tk.Frame(main_frame, width=240, bg="midnight blue")  # set width
-        side_frame.pack(side="right", fill="y")  # fill vertically
-        side_frame.pack_propagate(False)  # prevent auto-shrink to content
-
-        # Heading
-        self.algo_heading = tk.Label(side_frame,fg="white", bg="midnight blue", text="Select Algorithm", font=("Arial", 16, "bold"))
-        self.algo_heading.pack(pady=10)
-
-        algorithms = [
-            ("BFS", self.bfs),
-            ("DFS", self.dfs),
-            ("A*", self.astar),
-            ("Dijkstra", self.dijkstra),
-            ("Greedy BFS", self.greedy_best_first)
-        ]
-        for name, func in algorithms:
-            tk.Button(side_frame, font=("Arial", 13, "bold"), text=name, height=2, width=30, fg="white", bg="medium aquamarine",
-                    command=lambda f=func, n=name: self.run_algorithm_with_heading(f, n)
-            ).pack(pady=5)
-
-        # Speed controls
-        self.speed_var = tk.StringVar(value="Average")
-        tk.Label(side_frame,fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Speed:").pack(pady=(15, 0))
-        tk.Radiobutton(side_frame, fg="white",bg="midnight blue", font=("Arial", 16, "bold"), text="Average", variable=self.speed_var, value="Average").pack(anchor="w")
-        tk.Radiobutton(side_frame, fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Fast", variable=self.speed_var, value="Fast").pack(anchor="w")
-        tk.Radiobutton(side_frame, fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Slow", variable=self.speed_var, value="Slow").pack(anchor="w")
-
-        # Clear board button
-        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Clear Board",bg="lightblue", width=30, command=self.clear_grid).pack(pady=10)
-
-        # Event bindings
-        self.canvas.bind("<Button-1>", self.handle_left_click)
-        self.canvas.bind("<Double-Button-1>", self.start_drag_mode)
-        self.canvas.bind("<B1-Motion>", self.handle_drag)
-        self.canvas.bind("<ButtonRelease-1>", self.stop_drag_mode)
-
-        self.root.bind("s", self.set_mode_start)
-        self.root.bind("e", self.set_mode_end)
-        self.root.bind("w", self.set_mode_wall)
-
-        self.draw_grid()
-
-    def run_algorithm_with_heading(self, algo_func, algo_name):
-        # Update heading on the right
-        self.algo_heading.config(text=algo_name)
-
-        # Update description above the grid
-        desc = self.algo_descriptions.get(algo_name, "")
-        self.algo_description.config(text=desc)
-
-        # Run the algorithm
-        self.run_algorithm(algo_func)
-
-    def clear_grid(self):
-        if self.is_running:
-            return 
-        for (row, col), rect in self.rects.items():
-            self.canvas.itemconfig(rect, fill=EMPTY_COLOR)
-            self.grid[row][col] = 0  # reset logical state
-
-        self.start = None
-        self.end = None
-
-    def handle_drag(self, event):
-        if not self.drag_mode:
-            return
-
-        row = event.y // CELL_SIZE
-        col = event.x // CELL_SIZE
-        if 0 <= row < ROWS and 0 <= col < COLS:
-            if (row, col) != self.start and (row, col) != self.end:
-                if self.grid[row][col] != 1:
-                    self.grid[row][col] = 1
-                    self.draw_grid()
-    
-    def start_drag_mode(self, event):
-        self.drag_mode = True
-        self.handle_drag(event)  # draw immediately on double-click hold
-        print("Drag mode ON")
-
-    def stop_drag_mode(self, event):
-        if self.drag_mode:
-            self.drag_mode = False
-            print("Drag mode OFF")
-   
-    def draw_grid(self):
-        self.rects = {}  # Add this at the start of draw_grid()
-        self.canvas.delete("all")
-        for row in range(ROWS):
-            for col in range(COLS):
-                color = EMPTY_COLOR
-                if self.grid[row][col] == 1:
-                    color = WALL_COLOR
-                if self.start == (row, col):
-                    color = "green"
-                elif self.end == (row, col):
-                    color = "red"
-
-                x1, y1 = col * CELL_SIZE, row * CELL_SIZE
-                x2, y2 = x1 + CELL_SIZE, y1 + CELL_SIZE
-                rect = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="gray")
-                self.rects[(row, col)] = rect
-
-    def handle_left_click(self, event):
-        row = event.y // CELL_SIZE
-        col = event.x // CELL_SIZE
-        if 0 <= row < ROWS and 0 <= col < COLS:
-            if self.mode == "wall":
-                if (row, col) != self.start and (row, col) != self.end:
-                    self.grid[row][col] = 1 - self.grid[row][col]
-            elif self.mode == "start":
-                if self.start:
-                    old_r, old_c = self.start
-                    self.grid[old_r][old_c] = 0
-                self.start = (row, col)
-            elif self.mode == "end":
-                if self.end:
-                    old_r, old_c = self.end
-                    self.grid[old_r][old_c] = 0
-                self.end = (row, col)
-            self.draw_grid()
-
-    def set_mode_start(self, event=None):
-        self.mode = "start"
-        print("Mode: Place Start Node (green)")
-
-    def set_mode_end(self, event=None):
-        self.mode = "end"
-        print("Mode: Place End Node (red)")
-
-    def set_mode_wall(self, event=None):
-        self.mode = "wall"
-        print("Mode: Place/Remove Walls")
-
-    def random_color(self):
-        return f"#{random.randint(50,255):02x}{random.randint(50,255):02x}{random.randint(50,255):02x}"
-
-    def dfs(self):
-        traversal_color = self.random_color()
-        if not self.start or not self.end:
-            print("Start or End not set!")
-            self.is_running = False
-            return
-
-        start, end = self.start, self.end
-        stack = [start]
-        visited = set([start])
-        parent = {}
-
-        def visit_next():
-            if not stack:
-                print("No path found.")
-                self.is_running = False
-                return
-
-            current = stack.pop()
-            row, col = current
-
-            if current == end:
-                print("Path found!")
-                self.draw_path(parent)
-                self.is_running = False
-                return
-
-            for dr, dc in [(0,1), (1,0), (0,-1), (-1,0)]:
-                nr, nc = row + dr, col + dc
-                neighbor = (nr, nc)
-                if (
-                    0 <= nr < ROWS and 0 <= nc < COLS and
-                    self.grid[nr][nc] != 1 and  # not wall
-                    neighbor not in visited
-                ):
-                    stack.append(neighbor)
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    self.canvas.itemconfig(
-                        self.get_canvas_id(nr, nc), fill=traversal_color
-                    )
-
-            if stack:
-                self.root.after(self.get_speed_delay(), visit_next)  # Delay for animation
-            else:
-                # No more nodes to visit, mark done
-                self.is_running = False
-        visit_next()
-        
-    def bfs(self):
-        traversal_color = self.random_color()
-        if not self.start or not self.end:
-            print("Start or End not set!")
-            self.is_running = False
-            return
-
-        start, end = self.start, self.end
-        queue = deque([start])
-        visited = set([start])
-        parent = {}
-
-        def visit_next():
-            if not queue:
-                print("No path found.")
-                self.is_running = False
-                return
-
-            current = queue.popleft()
-            row, col = current
-
-            if current == end:
-                print("Path found!")
-                self.draw_path(parent)
-                self.is_running = False
-                return
-
-            for dr, dc in [(0,1), (1,0), (0,-1), (-1,0)]:
-                nr, nc = row + dr, col + dc
-                neighbor = (nr, nc)
-                if (
-                    0 <= nr < ROWS and 0 <= nc < COLS and
-                    self.grid[nr][nc] != 1 and  # not wall
-                    neighbor not in visited
-                ):
-                    queue.append(neighbor)
-                    visited.add(neighbor)
-                    parent[neighbor] = current
-                    self.canvas.itemconfig(
-                        self.get_canvas_id(nr, nc), fill=traversal_color
-                    )
-
-            if queue:
-                self.root.after(self.get_speed_delay(), visit_next)
-            else:
-                # No more nodes to visit, mark done
-                self.is_running = False
-        visit_next()
-    
-    def get_canvas_id(self, row, col):
-   
-        return self.rects.get((row, col))
-
-    def draw_path(self, parent):
-        current = self.end
-        while current != self.start:
-            if current in parent:
-                row, col = current
-                self.canvas.itemconfig(
-                    self.get_canvas_id(row, col), fill="aquamarine"
-                )
-                current = parent[current]
-            else:
-                break
-
-    def dijkstra(self):
-        traversal_color = self.random_color()  # Random color for this run
-
-        if not self.start or not self.end:
-            print("Start or End not set!")
-            self.is_running = False
-            return
-
-        start, end = self.start, self.end
-
-        # Priority queue for picking the closest node first
-        from heapq import heappush, heappop
-        pq = []
-        heappush(pq, (0, start))  # (distance, node)
-
-        visited = set()
-        parent = {}
-        distance = {start: 0}
-
-        def visit_next():
-            if not pq:
-                print("No path found.")
-                self.is_running = False
-                return
-
-            dist, current = heappop(pq)
-            if current in visited:
-                self.root.after(1, visit_next)
-                return
-
-            visited.add(current)
-            row, col = current
-
-            if current == end:
-                print("Path found!")
-                self.draw_path(parent)
-                self.is_running = False
-                return
-
-            # Explore neighbors
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = row + dr, col + dc
-                neighbor = (nr, nc)
-
-                if (
-                    0 <= nr < ROWS and 0 <= nc < COLS and
-                    self.grid[nr][nc] != 1 and  # Not a wall
-                    neighbor not in visited
-                ):
-                    new_dist = dist + 1  # All edges weight = 1
-                    if new_dist < distance.get(neighbor, float('inf')):
-                        distance[neighbor] = new_dist
-                        parent[neighbor] = current
-                        heappush(pq, (new_dist, neighbor))
-                        self.canvas.itemconfig(
-                            self.get_canvas_id(nr, nc), fill=traversal_color
-                        )
-
-            if pq:
-                self.root.after(self.get_speed_delay(), visit_next)  # Delay for animation
-            else:
-                # No more nodes to visit, mark done
-                self.is_running = False
-        visit_next()
-       
-    def astar(self):
-        traversal_color = self.random_color()  # Random color for this run
-
-        if not self.start or not self.end:
-            print("Start or End not set!")
-            self.is_running = False
-            return
-
-        start, end = self.start, self.end
-
-        from heapq import heappush, heappop
-        pq = []
-        heappush(pq, (0, start))  # (f_score, node)
-
-        visited = set()
-        parent = {}
-        g_score = {start: 0}  # Distance from start
-        f_score = {start: self.heuristic(start, end)}  # Estimated total cost
-
-        def visit_next():
-            if not pq:
-                print("No path found.")
-                self.is_running = False
-                return
-
-            _, current = heappop(pq)
-            if current in visited:
-                self.root.after(1, visit_next)
-                return
-
-            visited.add(current)
-            row, col = current
-
-            if current == end:
-                print("Path found!")
-                self.draw_path(parent)
-                self.is_running = False
-                return
-
-            # Explore neighbors
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = row + dr, col + dc
-                neighbor = (nr, nc)
-
-                if (
-                    0 <= nr < ROWS and 0 <= nc < COLS and
-                    self.grid[nr][nc] != 1 and  # Not a wall
-                    neighbor not in visited
-                ):
-                    tentative_g = g_score[current] + 1  # Cost from start to neighbor
-                    if tentative_g < g_score.get(neighbor, float('inf')):
-                        parent[neighbor] = current
-                        g_score[neighbor] = tentative_g
-                        f_score[neighbor] = tentative_g + self.heuristic(neighbor, end)
-                        heappush(pq, (f_score[neighbor], neighbor))
-                        self.canvas.itemconfig(
-                            self.get_canvas_id(nr, nc), fill=traversal_color
-                        )
-
-            if pq:
-                self.root.after(self.get_speed_delay(), visit_next)  # Delay for animation
-            else:
-                # No more nodes to visit, mark done
-                self.is_running = False
-        visit_next()
-    
-    def heuristic(self, a, b):
-        (x1, y1), (x2, y2) = a, b
-        return abs(x1 - x2) + abs(y1 - y2)
-
-    def greedy_best_first(self):
-        traversal_color = self.random_color()  # Random color for this run
-
-        if not self.start or not self.end:
-            print("Start or End not set!")
-            self.is_running = False
-            return
-
-        start, end = self.start, self.end
-
-        from heapq import heappush, heappop
-        pq = []
-        heappush(pq, (self.heuristic(start, end), start))  # (priority, node)
-
-        visited = set()
-        parent = {}
-
-        def visit_next():
-            if not pq:
-                print("No path found.")
-                self.is_running = False
-                return
-
-            _, current = heappop(pq)
-            if current in visited:
-                self.root.after(1, visit_next)
-                return
-
-            visited.add(current)
-            row, col = current
-
-            if current == end:
-                print("Path found!")
-                self.draw_path(parent)
-                self.is_running = False
-                return
-
-            # Explore neighbors
-            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
-                nr, nc = row + dr, col + dc
-                neighbor = (nr, nc)
-
-                if (
-                    0 <= nr < ROWS and 0 <= nc < COLS and
-                    self.grid[nr][nc] != 1 and  # Not a wall
-                    neighbor not in visited
-                ):
-                    parent[neighbor] = current
-                    heappush(pq, (self.heuristic(neighbor, end), neighbor))
-                    self.canvas.itemconfig(
-                        self.get_canvas_id(nr, nc), fill=traversal_color
-                    )
-
-            if pq:
-                self.root.after(self.get_speed_delay(), visit_next)  # Delay for animation
-            else:
-                # No more nodes to visit, mark done
-                self.is_running = False
-        visit_next()
-       
-    def run_algorithm(self, algo_func):
-        if self.is_running:
-            return
-        if not getattr(self, "start", None) or not getattr(self, "end", None):
-            messagebox.showinfo(
-                "Set START and END before running an algorithm."
-            )
-            return
-        
-        for (row,col),rect in self.rects.items():
-            if self.grid[row][col] != 1 and (row,col) not in [self.start,self.end]:  # Not a wall and not start/end 
-                self.canvas.itemconfig(rect, fill=EMPTY_COLOR)
-        
-        if self.start:
-            self.canvas.itemconfig(self.rects[self.start], fill="green")
-        if self.end:
-            self.canvas.itemconfig(self.rects[self.end], fill="red")
-        self.is_running = True
-        # Run the algorithm
-        algo_func()
-
-    def get_speed_delay(self):
-        if self.speed_var.get() == "Fast":
-            return 10      # ms
-        elif self.speed_var.get() == "Average":
-            return 50
-        else:  # Slow
-            return 150
-
-
-def run_visualizer():
-    root = tk.Tk()
-    app = PathfindingVisualizer(root)
-    root.mainloop()
-
-if __name__ == "__main__":
-    settings = load_settings()
-    if settings.get("show_tutorial", True):
-        show_tutorial()
-    else:
-        run_visualizer()
\ No newline at end of file
+import tkinter as tk
+from tkinter import filedialog, messagebox, simpledialog
+import argparse
+import random
+import os
+import time
+
+from boardfile import load_map, save
+from cache import ResultCache
+from components import components_for
+from dstar import DStarLite
+from engine import PRUNE_ALGORITHMS, write_trace
+from flowfield import field_for
+from grid import Grid
+from landmarks import load_for
+from renderer import make_renderer
+from tracefile import PATH, POP, PUSH, STALE, read_traces
+from worker import SearchJob
+SETTINGS_FILE = "settings.txt"
+
+def load_settings():
+    """Read settings from file, return dictionary."""
+    if not os.path.exists(SETTINGS_FILE):
+        return {"show_tutorial": True}
+    with open(SETTINGS_FILE, "r") as f:
+        lines = f.readlines()
+    settings = {}
+    for line in lines:
+        key, value = line.strip().split("=")
+        settings[key] = value.lower() == "true"
+    return settings
+
+def save_settings(settings):
+    """Save settings to file."""
+    with open(SETTINGS_FILE, "w") as f:
+        for key, value in settings.items():
+            f.write(f"{key}={'True' if value else 'False'}\n")
+
+def show_tutorial(options):
+    tutorial = tk.Tk()
+    tutorial.title("Pathfinding Visualizer - Tutorial")
+    tutorial.geometry("550x540")
+    tutorial.config(bg="white")
+
+    title = tk.Label(
+        tutorial, 
+        text="Welcome to Pathfinding Visualizer", 
+        font=("Arial", 16, "bold"),
+        pady=10,
+        bg="white"
+    )
+    title.pack()
+
+    info = """    
+This tool helps you visualize popular pathfinding algorithms.
+
+What is a pathfinding algorithm?
+At its core, a pathfinding algorithm seeks to find the shortest path between two points. This application visualizes various pathfinding algorithms in action!
+
+If you want to dive right in, feel free to press the "Skip Tutorial" button below.
+Controls:
+• Press 'S'and click on the grid  to set the START node (green).
+• Press 'E' and click on the grid to set the END node (red).
+• Press 'W' or double-click drag mouse to place WALLS (black).
+• Press 'T' and click to place HEAVY TERRAIN (brown), which costs more to cross.
+• Use the right-side panel to select algorithms.
+• Scroll the mouse wheel to zoom and drag with the right button to pan.
+• Control the speed of the animation with the speed options on the right-side panel
+  ("Instant" shows the finished search right away)
+• Searches run in the background: keep editing walls while they work,
+  press Esc or "Cancel" to stop one and "Restart" to run it again.
+• After running, the shortest path is shown in light blue.
+
+Features:
+• Supports BFS, DFS, A*, Dijkstra, Greedy BFS, Jump Point Search,
+  Bidirectional BFS, Bidirectional A*, Fringe Search, D* Lite, HPA*
+  and flow fields (arrows from every cell towards the end).
+• Weighted & unweighted algorithms, with optional diagonal moves.
+• Live animation of search process.
+• Replay searches recorded with cli.py --record using "Load Trace"
+  and drag the bar below the statistics to seek.
+• Clear the grid with the "Clear Board" button.
+• Click on the grid to place/remove walls.
+• Double-click to toggle drag mode for placing/removing walls.
+• speed control of animation.
+    """
+    tk.Label(
+        tutorial,
+        text=info,
+        font=("Arial", 11),
+        justify="left",
+        padx=20,
+        pady=10,
+        bg="white"
+    ).pack()
+
+    dont_show_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(
+        tutorial, 
+        text="Don't show this tutorial again", 
+        variable=dont_show_var,
+        bg="white",
+        font=("Arial", 10)
+    ).pack(pady=5)
+
+    btn_frame = tk.Frame(tutorial, bg="white")
+    btn_frame.pack(pady=15)
+
+    tk.Button(
+        btn_frame, 
+        text="Start Visualizing", 
+        font=("Arial", 12, "bold"),
+        bg="#27AE60", 
+        fg="white", 
+        width=15,
+        command=lambda: start_main(tutorial, dont_show_var, options)
+    ).grid(row=0, column=0, padx=10)
+
+    tk.Button(
+        btn_frame, 
+        text="Skip Tutorial", 
+        font=("Arial", 12, "bold"),
+        bg="#7F8C8D", 
+        fg="white", 
+        width=15,
+        command=lambda: start_main(tutorial, dont_show_var, options)
+    ).grid(row=0, column=1, padx=10)
+
+    tutorial.mainloop()
+
+def start_main(tutorial_window, dont_show_var, options):
+    settings = load_settings()
+    if dont_show_var.get():
+        settings["show_tutorial"] = False
+        save_settings(settings)
+    tutorial_window.destroy()
+    run_visualizer(**options)
+    
+
+# Constants
+ROWS, COLS = 20, 40  # Default grid size, see --rows/--cols
+CELL_SIZE = 25
+WIDTH = COLS * CELL_SIZE
+HEIGHT = ROWS * CELL_SIZE
+
+# Colors
+EMPTY_COLOR = "white"
+WALL_COLOR = "black"
+TERRAIN_COLOR = "sandy brown"
+
+TERRAIN_COST = 5  # cost of entering a heavy terrain cell, normal cells cost 1
+
+FRONTIER_COLOR = "light goldenrod"  # pushed but not expanded yet, in recorded traces
+
+# Animation: searches finish first, then their events are painted in frames
+FRAME_MS = 16  # about 60 frames per second
+POLL_MS = 50  # how often a running search job is checked on
+SPEEDS = {"Slow": 100, "Average": 500, "Fast": 3000, "Instant": None}  # events per second
+
+
+def cells_between(a, b):
+    """Grid cells on the straight line from a to b, both included (Bresenham)."""
+    (r0, c0), (r1, c1) = a, b
+    dr, dc = abs(r1 - r0), -abs(c1 - c0)
+    sr = 1 if r0 < r1 else -1
+    sc = 1 if c0 < c1 else -1
+    err = dr + dc
+    cells = []
+    while True:
+        cells.append((r0, c0))
+        if (r0, c0) == (r1, c1):
+            return cells
+        e2 = 2 * err
+        if e2 >= dc:
+            err += dc
+            r0 += sr
+        if e2 <= dr:
+            err += dr
+            c0 += sc
+
+
+class PathfindingVisualizer:
+    def __init__(self, root, rows=ROWS, cols=COLS, grid=None, trace_file=None, start=None, end=None):
+        self.root = root
+        self.root.title("Pathfinding Visualizer")
+
+        self.grid = grid or Grid(rows, cols)  # 0=empty, 1=wall
+        self.start = start
+        self.end = end
+
+        self.planner = None  # D* Lite state kept between runs
+        self.trace_file = trace_file  # append each run's statistics here if set
+        self.cache = ResultCache()  # re-running an unchanged search replays the stored result
+
+        self.mode = "wall"
+        self.drag_mode = True
+        self.last_drag_cell = None
+        self.pan_from = None
+        self.search_cells = set()  # cells currently showing search colors
+        self.job = None  # worker.SearchJob while a search runs in the background
+        self.animation = None  # after() id of the next replay frame
+        self.shadow = None  # copy of the grid taking edits made while a job runs
+        self.edited = set()  # nodes edited on the shadow, copied to the grid afterwards
+        self.last_algorithm = None
+        self.restart_requested = False
+        self.field = None  # flow field drawn as arrows, until the next edit or run
+        self.job_field = None  # flow field built by the running job
+        self.recording = None  # tracefile.TraceReader of the loaded trace
+        self.recording_file = None
+        self.recording_colors = None  # by event kind
+        self.trace_position = 0  # events of the recording shown
+
+        self.algo_descriptions = {
+            "BFS": "Breath-first Search is unweighted and guarantees the shortest path!",
+            "DFS": "Depth-first Search is unweighted and does not guarantee the shortest path!",
+            "A*": "A* Search is weighted and guarantees the cheapest path!",
+            "Dijkstra": "Dijkstra's Algorithm is weighted and guarantees the cheapest path!",
+            "Greedy BFS": "Greedy Best-first Search is weighted and does not guarantee the shortest path!",
+            "Jump Point Search": "Jump Point Search skips straight runs of cells and guarantees the shortest path!",
+            "Bidirectional BFS": "Bidirectional BFS searches from both ends at once and guarantees the shortest path!",
+            "Bidirectional A*": "Bidirectional A* runs A* from both ends at once and guarantees the shortest path!",
+            "Fringe Search": "Fringe Search is an iterative-deepening A* that guarantees the shortest path!",
+            "D* Lite": "D* Lite keeps its search between runs and only repairs what your edits changed. Guarantees the cheapest path!",
+            "HPA*": "HPA* plans over cluster entrances first, then fills in the cells. Very fast on huge maps, but the path is only near-optimal!",
+            "Flow Field": "A flow field searches backwards from the end once; every cell's arrow then leads to it along a cheapest path!"
+}
+
+        # Main container
+        main_frame = tk.Frame(self.root)
+        main_frame.pack(fill="both", expand=True)
+
+        # 📌 Legend Frame (above the grid)
+        legend_frame = tk.Frame(main_frame)
+        legend_frame.pack(side="top", pady=10)
+
+        def add_legend_item(parent, color, text):
+            box = tk.Label(parent, bg=color, width=2, height=1, relief="solid", borderwidth=1)
+            box.pack(side="left", padx=(0, 5))
+            label = tk.Label(parent, text=text)
+            label.pack(side="left", padx=(0, 15))
+
+        # Add legend items
+        add_legend_item(legend_frame, "green", "Start Node")
+        add_legend_item(legend_frame, "red", "End Node")
+        add_legend_item(legend_frame, "white", "Unvisited Node")
+        add_legend_item(legend_frame, "black", "Wall Node")
+        add_legend_item(legend_frame, TERRAIN_COLOR, f"Heavy Terrain (cost {TERRAIN_COST})")
+        add_legend_item(legend_frame, "lightblue", "Shortest Path Found")
+        label = tk.Label(legend_frame,   font=("Arial", 13, "bold"), text="Visited nodes: shown in random colors", fg="#34495E") # Dark grayish blue
+        label.pack(side="left", padx=(0, 15))
+
+        #Left panel (Description+Grid)
+        left_panel = tk.Frame(main_frame, bg="midnight blue")
+        left_panel.pack(side="left", fill="both", expand=True)
+
+        # Description label above the grid
+        self.algo_description = tk.Label(
+            left_panel,
+            text="Select an algorithm to see details",
+            font=("Arial", 14, "italic"),
+            fg="white",
+            bg="medium aquamarine",
+            anchor="w",
+            wraplength=500,
+            justify="left"
+        )
+        self.algo_description.pack(pady=10)
+        # Canvas for grid
+        self.canvas = tk.Canvas(left_panel, width=600, height=600, bg="white")
+        self.canvas.pack(padx=10, pady=10, fill="both", expand=True)
+
+        # Right panel for controls
+        side_frame = tk.Frame(main_frame, width=240, bg="midnight blue")  # set width
+        side_frame.pack(side="right", fill="y")  # fill vertically
+        side_frame.pack_propagate(False)  # prevent auto-shrink to content
+
+        # Heading
+        self.algo_heading = tk.Label(side_frame,fg="white", bg="midnight blue", text="Select Algorithm", font=("Arial", 16, "bold"))
+        self.algo_heading.pack(pady=10)
+
+        algorithms = [
+            ("BFS", "bfs"),
+            ("DFS", "dfs"),
+            ("A*", "astar"),
+            ("Dijkstra", "dijkstra"),
+            ("Greedy BFS", "greedy"),
+            ("Jump Point Search", "jps"),
+            ("Bidirectional BFS", "bibfs"),
+            ("Bidirectional A*", "biastar"),
+            ("Fringe Search", "fringe"),
+            ("D* Lite", "dstar"),
+            ("HPA*", "hpa"),
+            ("Flow Field", "flowfield")
+        ]
+        for name, key in algorithms:
+            tk.Button(side_frame, font=("Arial", 13, "bold"), text=name, height=2, width=30, fg="white", bg="medium aquamarine",
+                    command=lambda k=key, n=name: self.run_algorithm_with_heading(k, n)
+            ).pack(pady=5)
+
+        # Speed controls
+        self.speed_var = tk.StringVar(value="Average")
+        tk.Label(side_frame,fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Speed:").pack(pady=(15, 0))
+        tk.Radiobutton(side_frame, fg="white",bg="midnight blue", font=("Arial", 16, "bold"), text="Average", variable=self.speed_var, value="Average").pack(anchor="w")
+        tk.Radiobutton(side_frame, fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Fast", variable=self.speed_var, value="Fast").pack(anchor="w")
+        tk.Radiobutton(side_frame, fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Slow", variable=self.speed_var, value="Slow").pack(anchor="w")
+        tk.Radiobutton(side_frame, fg="white", bg="midnight blue", font=("Arial", 16, "bold"), text="Instant", variable=self.speed_var, value="Instant").pack(anchor="w")
+
+        # Movement options
+        self.diagonal_var = tk.BooleanVar(value=self.grid.diagonal)
+        tk.Checkbutton(side_frame, fg="white", bg="midnight blue", selectcolor="midnight blue", font=("Arial", 14, "bold"),
+                       text="Diagonal moves", variable=self.diagonal_var, command=self.toggle_diagonal).pack(anchor="w", pady=(10, 0))
+        self.prune_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(side_frame, fg="white", bg="midnight blue", selectcolor="midnight blue", font=("Arial", 14, "bold"),
+                       text="Prune dead ends", variable=self.prune_var).pack(anchor="w")
+
+        # Statistics of the last search, updated while it animates
+        self.stats_label = tk.Label(side_frame, fg="white", bg="midnight blue", font=("Arial", 11),
+                                    justify="left", anchor="w", text="")
+        self.stats_label.pack(anchor="w", padx=10, pady=(10, 0))
+
+        # Seek bar for a loaded trace (Load Trace)
+        self.seek_bar = tk.Scale(side_frame, from_=0, to=0, orient="horizontal", showvalue=False,
+                                 bg="midnight blue", highlightthickness=0, state="disabled",
+                                 command=self.seek_trace)
+        self.seek_bar.pack(fill="x", padx=10)
+
+        # Clear board button
+        # Search controls
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Cancel",bg="lightblue", width=30, command=self.cancel).pack(pady=(10, 0))
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Restart",bg="lightblue", width=30, command=self.restart).pack(pady=(10, 0))
+
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Clear Board",bg="lightblue", width=30, command=self.clear_grid).pack(pady=10)
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Grid Size",bg="lightblue", width=30, command=self.ask_grid_size).pack()
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Save Board",bg="lightblue", width=30, command=self.save_board).pack(pady=(10, 0))
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Load Board",bg="lightblue", width=30, command=self.load_board).pack(pady=(10, 0))
+        tk.Button(side_frame, font=("Arial", 10, "bold"),height=2, fg="white", text="Load Trace",bg="lightblue", width=30, command=self.load_trace).pack(pady=(10, 0))
+
+        # Event bindings
+        self.canvas.bind("<Button-1>", self.handle_left_click)
+        self.canvas.bind("<Double-Button-1>", self.start_drag_mode)
+        self.canvas.bind("<B1-Motion>", self.handle_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.stop_drag_mode)
+        self.canvas.bind("<ButtonPress-3>", self.start_pan)
+        self.canvas.bind("<B3-Motion>", self.handle_pan)
+        self.canvas.bind("<MouseWheel>", self.handle_zoom)
+        self.canvas.bind("<Button-4>", self.handle_zoom)  # X11 wheel up
+        self.canvas.bind("<Button-5>", self.handle_zoom)  # X11 wheel down
+        self.canvas.bind("<Configure>", self.handle_resize)
+
+        self.root.bind("s", self.set_mode_start)
+        self.root.bind("e", self.set_mode_end)
+        self.root.bind("w", self.set_mode_wall)
+        self.root.bind("t", self.set_mode_terrain)
+        self.root.bind("<Escape>", self.cancel)
+
+        self.draw_grid()
+
+    def run_algorithm_with_heading(self, algorithm, algo_name):
+        # Update heading on the right
+        self.algo_heading.config(text=algo_name)
+
+        # Update description above the grid
+        desc = self.algo_descriptions.get(algo_name, "")
+        self.algo_description.config(text=desc)
+
+        # Run the algorithm
+        self.run_algorithm(algorithm)
+
+    def clear_grid(self):
+        if self.is_running:
+            return 
+        self.close_recording()
+        self.grid.clear()  # reset logical state, walls and terrain
+        self.start = None
+        self.end = None
+        self.search_cells.clear()
+        self.view.update_all([EMPTY_COLOR] * self.grid.size)
+
+    def handle_drag(self, event):
+        if not self.drag_mode:
+            return
+
+        cell = self.view.cell_at(event.x, event.y)
+        if cell:
+            row, col = cell
+            # Fill the cells between motion events so fast drags leave no gaps
+            last = self.last_drag_cell or (row, col)
+            for r, c in cells_between(last, (row, col)):
+                if (r, c) != self.start and (r, c) != self.end and not self.board.is_wall(r, c):
+                    self.editable().set_wall(r, c)
+                    self.refresh_cell(r, c)
+            self.last_drag_cell = (row, col)
+    
+    def start_drag_mode(self, event):
+        self.drag_mode = True
+        self.last_drag_cell = None
+        self.handle_drag(event)  # draw immediately on double-click hold
+        print("Drag mode ON")
+
+    def stop_drag_mode(self, event):
+        self.last_drag_cell = None
+        if self.drag_mode:
+            self.drag_mode = False
+            print("Drag mode OFF")
+   
+    def draw_grid(self):
+        # Builds the cell layer once; after that cells are only recolored
+        grid = self.grid
+        # Before the window is mapped the canvas only knows its requested size
+        width = max(self.canvas.winfo_width(), self.canvas.winfo_reqwidth())
+        height = max(self.canvas.winfo_height(), self.canvas.winfo_reqheight())
+        self.view = make_renderer(self.canvas, grid.rows, grid.cols, CELL_SIZE, width, height)
+        self.field = None
+        self.close_recording()
+        self.search_cells.clear()
+        self.view.draw(self.base_colors())
+
+    def base_colors(self):
+        """base_color() of every cell, in node order."""
+        grid = self.board
+        colors = [WALL_COLOR if wall else EMPTY_COLOR for wall in grid.cells]
+        if grid.costs is not None:
+            for node, cost in enumerate(grid.costs):
+                if cost > 1 and not grid.cells[node]:
+                    colors[node] = TERRAIN_COLOR
+        for cell in (self.start, self.end):
+            if cell:
+                colors[grid.index(*cell)] = self.base_color(*cell)
+        return colors
+
+    def replace_grid(self, grid, start=None, end=None):
+        """Show a different board, dropping state tied to the old one."""
+        if self.planner is not None:
+            self.planner.close()
+            self.planner = None
+        self.grid = grid
+        self.start = start
+        self.end = end
+        self.diagonal_var.set(grid.diagonal)
+        self.draw_grid()
+
+    def resize_grid(self, rows, cols):
+        if self.is_running:
+            return
+        self.replace_grid(Grid(rows, cols, diagonal=self.diagonal_var.get()))
+
+    def save_board(self):
+        if self.is_running:
+            return
+        path = filedialog.asksaveasfilename(parent=self.root, title="Save Board", defaultextension=".board",
+                                            filetypes=[("Board files", "*.board"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            save(path, self.grid, self.start, self.end)
+        except OSError as e:
+            messagebox.showerror("Save Board", f"Could not save the board:\n{e}")
+
+    def load_board(self):
+        if self.is_running:
+            return
+        path = filedialog.askopenfilename(parent=self.root, title="Load Board",
+                                          filetypes=[("Board files", "*.board"), ("Moving AI maps", "*.map"),
+                                                     ("Text maps", "*.txt"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            grid, start, end = load_map(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load Board", f"Could not load {os.path.basename(path)}:\n{e}")
+            return
+        load_for(grid, path)
+        self.replace_grid(grid, start, end)
+
+    def load_trace(self):
+        """Replay a search recorded with cli.py --record (see tracefile.py)."""
+        if self.is_running:
+            return
+        path = filedialog.askopenfilename(parent=self.root, title="Load Trace",
+                                          filetypes=[("Search traces", "*.pvt"), ("All files", "*")])
+        if not path:
+            return
+        try:
+            f = open(path, "rb")
+        except OSError as e:
+            messagebox.showerror("Load Trace", f"Could not open {os.path.basename(path)}:\n{e}")
+            return
+        try:
+            readers = list(read_traces(f))
+        except ValueError as e:
+            f.close()
+            messagebox.showerror("Load Trace", f"Could not load {os.path.basename(path)}:\n{e}")
+            return
+        choice = 1
+        if len(readers) > 1:
+            choice = simpledialog.askinteger("Load Trace", f"The file holds {len(readers)} searches. Show which one?",
+                                             initialvalue=1, minvalue=1, maxvalue=len(readers), parent=self.root)
+        reader = readers[choice - 1] if choice else None
+        if reader is None or (reader.rows, reader.cols) != (self.grid.rows, self.grid.cols):
+            f.close()
+            if reader is not None:
+                messagebox.showerror("Load Trace", f"The trace was recorded on a {reader.rows}x{reader.cols} "
+                                                   f"board; load that board first.")
+            return
+        self.show_recording(reader, f)
+
+    def show_recording(self, reader, f=None):
+        """Play a recorded search from the start; the seek bar jumps anywhere in it."""
+        self.close_recording()
+        self.show_field(None)
+        self.start, self.end = self.grid.coords(reader.source), self.grid.coords(reader.target)
+        self.search_cells.clear()
+        self.view.update_all(self.base_colors())
+        self.recording, self.recording_file = reader, f
+        self.recording_colors = {PUSH: FRONTIER_COLOR, POP: self.random_color(), PATH: "aquamarine"}
+        self.trace_position = 0
+        self.seek_bar.config(to=len(reader), state="normal")
+        self.seek_bar.set(0)
+        self.algo_heading.config(text=f"Trace: {reader.algorithm}")
+
+        last_frame = time.perf_counter()
+        budget = 0.0
+
+        def next_frame():
+            nonlocal last_frame, budget
+            rate = self.get_speed()
+            now = time.perf_counter()
+            if rate is None:
+                stop = len(reader)
+            else:
+                budget += (now - last_frame) * rate
+                stop = min(self.trace_position + int(budget), len(reader))
+                budget -= stop - self.trace_position
+            last_frame = now
+            self.paint_recording(self.trace_position, stop)
+            self.seek_bar.set(stop)
+            self.animation = self.root.after(FRAME_MS, next_frame) if stop < len(reader) else None
+        next_frame()
+
+    def paint_recording(self, start, stop):
+        """Paint events start..stop-1 of the loaded trace over what is shown."""
+        colors, cells = self.recording_colors, self.board.cells
+        paint, search_cells = self.view.paint, self.search_cells
+        for kind, node in self.recording.read(start, stop):
+            if kind != STALE and not cells[node]:
+                search_cells.add(node)
+                paint(node, colors[kind])
+        self.trace_position = stop
+        self.show_recording_stats()
+
+    def seek_trace(self, value):
+        """Seek bar moved: show the loaded trace as it was after that many events."""
+        position = int(float(value))
+        if self.recording is None or position == self.trace_position:
+            return
+        if self.animation is not None:
+            self.root.after_cancel(self.animation)
+            self.animation = None
+        if position > self.trace_position:
+            self.paint_recording(self.trace_position, position)
+            return
+        colors, cells = self.base_colors(), self.board.cells
+        palette = self.recording_colors
+        self.search_cells.clear()
+        for node, state in enumerate(self.recording.state_at(position)):
+            if state and not cells[node]:
+                colors[node] = palette[state - 1]
+                self.search_cells.add(node)
+        self.view.update_all(colors)
+        self.trace_position = position
+        self.show_recording_stats()
+
+    def show_recording_stats(self):
+        reader = self.recording
+        self.stats_label.config(text=(
+            f"Trace: {reader.algorithm}\n"
+            f"Event: {self.trace_position} / {len(reader)}"
+            f"{'' if reader.complete else ' (incomplete)'}"))
+
+    def close_recording(self):
+        if self.recording is None:
+            return
+        if self.animation is not None:
+            self.root.after_cancel(self.animation)
+            self.animation = None
+        if self.recording_file is not None:
+            self.recording_file.close()
+        self.recording = self.recording_file = None
+        self.seek_bar.config(to=0, state="disabled")
+
+    def ask_grid_size(self):
+        rows = simpledialog.askinteger("Grid Size", "Rows:", initialvalue=self.grid.rows,
+                                       minvalue=2, maxvalue=4096, parent=self.root)
+        if rows is None:
+            return
+        cols = simpledialog.askinteger("Grid Size", "Columns:", initialvalue=self.grid.cols,
+                                       minvalue=2, maxvalue=4096, parent=self.root)
+        if cols is None:
+            return
+        self.resize_grid(rows, cols)
+
+    def handle_zoom(self, event):
+        zoom_in = getattr(event, "num", None) == 4 or getattr(event, "delta", 0) > 0
+        self.view.zoom_by(1.25 if zoom_in else 0.8, event.x, event.y)
+
+    def start_pan(self, event):
+        self.pan_from = (event.x, event.y)
+
+    def handle_pan(self, event):
+        if self.pan_from is None:
+            return
+        x, y = self.pan_from
+        self.view.pan(event.x - x, event.y - y)
+        self.pan_from = (event.x, event.y)
+
+    def handle_resize(self, event):
+        self.view.resize(event.width, event.height)
+
+    @property
+    def is_running(self):
+        """True while a search job runs or its result is being animated."""
+        return self.job is not None or self.animation is not None
+
+    @property
+    def board(self):
+        """The grid as the user sees it, edits made during a running job included."""
+        return self.shadow if self.shadow is not None else self.grid
+
+    def editable(self):
+        """Grid that edits go to: the grid itself, or a copy while a job is searching it."""
+        self.show_field(None)  # any edit can change the flow
+        if self.job is None:
+            return self.grid
+        if self.shadow is None:
+            self.shadow = self.grid.copy()
+            self.shadow.subscribe(self.edited.add)
+        return self.shadow
+
+    def apply_edits(self):
+        """Copy the edits made during the last job onto the grid."""
+        shadow, grid = self.shadow, self.grid
+        if shadow is None:
+            return
+        for node in self.edited:
+            row, col = grid.coords(node)
+            grid.set_wall(row, col, shadow.is_wall(row, col))
+            grid.set_cost(row, col, shadow.cost(row, col))
+        grid.diagonal = shadow.diagonal
+        self.shadow = None
+        self.edited.clear()
+
+    def refresh_cell(self, row, col):
+        node = self.grid.index(row, col)
+        self.search_cells.discard(node)
+        self.view.paint(node, self.base_color(row, col))
+
+    def cell_color(self, row, col):
+        # Color of a cell with no search drawn over it
+        if self.board.is_wall(row, col):
+            return WALL_COLOR
+        if self.board.cost(row, col) > 1:
+            return TERRAIN_COLOR
+        return EMPTY_COLOR
+
+    def base_color(self, row, col):
+        if self.start == (row, col):
+            return "green"
+        if self.end == (row, col):
+            return "red"
+        return self.cell_color(row, col)
+
+    def handle_left_click(self, event):
+        cell = self.view.cell_at(event.x, event.y)
+        if cell:
+            row, col = cell
+            changed = [(row, col)]
+            grid = self.editable()
+            if self.mode == "wall":
+                if (row, col) != self.start and (row, col) != self.end:
+                    grid.toggle_wall(row, col)
+            elif self.mode == "terrain":
+                cost = 1 if grid.cost(row, col) > 1 else TERRAIN_COST
+                grid.set_cost(row, col, cost)
+            elif self.mode == "start":
+                if self.start:
+                    old_r, old_c = self.start
+                    grid.set_wall(old_r, old_c, False)
+                    changed.append(self.start)
+                self.start = (row, col)
+            elif self.mode == "end":
+                if self.end:
+                    old_r, old_c = self.end
+                    grid.set_wall(old_r, old_c, False)
+                    changed.append(self.end)
+                self.end = (row, col)
+            for r, c in changed:
+                self.refresh_cell(r, c)
+
+    def set_mode_start(self, event=None):
+        self.mode = "start"
+        print("Mode: Place Start Node (green)")
+
+    def set_mode_end(self, event=None):
+        self.mode = "end"
+        print("Mode: Place End Node (red)")
+
+    def set_mode_wall(self, event=None):
+        self.mode = "wall"
+        print("Mode: Place/Remove Walls")
+
+    def set_mode_terrain(self, event=None):
+        self.mode = "terrain"
+        print(f"Mode: Place/Remove Heavy Terrain (cost {TERRAIN_COST})")
+
+    def toggle_diagonal(self):
+        self.editable().diagonal = self.diagonal_var.get()
+
+    def random_color(self):
+        return f"#{random.randint(50,255):02x}{random.randint(50,255):02x}{random.randint(50,255):02x}"
+
+    def draw_path(self, path):
+        # Paint everything after the start node, the end node included
+        for row, col in path[1:]:
+            node = self.grid.index(row, col)
+            self.search_cells.add(node)
+            self.view.paint(node, "aquamarine")
+
+    def replay(self, result):
+        traversal_color = self.random_color()  # Random color for this run
+        trace = result.trace
+        index = 0
+        last_frame = time.perf_counter()
+        budget = 0.0  # events owed to the animation but not painted yet
+
+        def next_frame():
+            nonlocal index, last_frame, budget
+            rate = self.get_speed()
+            now = time.perf_counter()
+            if rate is None:
+                stop = len(trace)
+            else:
+                # Paint as many events as the elapsed time allows, so slow
+                # frames catch up instead of slowing the animation down
+                budget += (now - last_frame) * rate
+                stop = min(index + int(budget), len(trace))
+                budget -= stop - index
+            last_frame = now
+            paint, search_cells, cells = self.view.paint, self.search_cells, self.board.cells
+            for node in trace[index:stop]:
+                if not cells[node]:  # else walled off since the search
+                    search_cells.add(node)
+                    paint(node, traversal_color)
+            index = stop
+            if index < len(trace):
+                stats.render_time += time.perf_counter() - now
+                self.show_stats(stats, index, len(trace))
+                self.animation = self.root.after(FRAME_MS, next_frame)
+                return
+
+            if result.found:
+                print("Path found!")
+                self.draw_path(result.path)
+            else:
+                print("No path found.")
+            stats.render_time += time.perf_counter() - now
+            self.show_stats(stats, index, len(trace))
+            if self.trace_file:
+                with open(self.trace_file, "a") as f:
+                    write_trace(result, f)
+            self.animation = None
+        stats = result.stats
+        stats.render_time = 0.0  # cached results are replayed more than once
+        next_frame()
+
+    def show_stats(self, stats, shown, total):
+        cost = stats.path_cost
+        if isinstance(cost, float):
+            cost = round(cost, 2)
+        self.stats_label.config(text=(
+            f"Animated: {shown} / {total}\n"
+            f"Expanded: {stats.expanded}\n"
+            f"Generated: {stats.generated}\n"
+            f"Stale pops: {stats.stale_pops}\n"
+            f"Max open list: {stats.max_open}\n"
+            f"Path length: {stats.path_length}  cost: {'-' if cost is None else cost}\n"
+            f"Search: {stats.search_time * 1000:.1f} ms  render: {stats.render_time * 1000:.0f} ms\n"
+            f"Cache: {self.cache.hits} hits, {self.cache.misses} misses"))
+
+    def run_algorithm(self, algorithm):
+        if self.is_running:
+            return
+        if not getattr(self, "start", None) or not getattr(self, "end", None):
+            messagebox.showinfo(
+                "Set START and END before running an algorithm."
+            )
+            return
+        
+        # Only cells the previous run painted need resetting
+        if len(self.search_cells) > self.grid.size // 8:
+            self.search_cells.clear()
+            self.view.update_all(self.base_colors())
+        for node in list(self.search_cells):
+            self.refresh_cell(*self.grid.coords(node))
+        self.show_field(None)
+        self.close_recording()
+
+        self.last_algorithm = algorithm
+        self.restart_requested = False
+        # The search runs in a worker thread; poll_job() picks up its result
+        prune = self.prune_var.get() and algorithm in PRUNE_ALGORITHMS
+        self.job = SearchJob(self.search, algorithm, self.start, self.end, prune).start()
+        self.stats_label.config(text="Searching...")
+        self.root.after(POLL_MS, self.poll_job)
+
+    def search(self, algorithm, start, end, prune=False, checkpoint=None):
+        # Runs in the job's thread; edits go to the shadow grid until it ends
+        grid = self.grid
+        index = grid.landmarks
+        if index is not None and not index.valid:
+            # Edits made the landmark distances wrong; recompute before searching
+            print("Rebuilding landmark index...")
+            index.rebuild()
+        if algorithm == "flowfield":
+            # Built here even when the start cannot reach the end, for the arrows
+            self.job_field = field_for(grid, grid.index(*end), checkpoint)
+        # Between disconnected regions solve() answers at once, no planner needed
+        if algorithm == "dstar" and components_for(grid).connected(grid.index(*start), grid.index(*end)):
+            return self.replan(start, end, checkpoint)
+        return self.cache.solve(grid, start, end, algorithm, prune=prune, recorder=checkpoint)
+
+    def poll_job(self):
+        job = self.job
+        event = job.poll()
+        if event is None:
+            self.stats_label.config(text=f"Searching... {job.elapsed:.1f} s")
+            self.root.after(POLL_MS, self.poll_job)
+            return
+        self.job = None
+        # Edits made meanwhile (they live on the shadow grid) outdate the job's flow field
+        field = self.job_field if self.shadow is None else None
+        self.job_field = None
+        self.apply_edits()
+        kind, value = event
+        if kind == "done":
+            self.replay(value)
+            if field is not None:
+                self.show_field(field)
+        elif kind == "cancelled":
+            print("Search cancelled.")
+            self.stats_label.config(text="Search cancelled")
+            # Searches stop between two expansions, so the planner and indexes stay usable
+            if self.restart_requested:
+                self.run_algorithm(self.last_algorithm)
+        elif isinstance(value, ValueError):  # e.g. JPS on a weighted or diagonal grid
+            self.stats_label.config(text="")
+            messagebox.showinfo("Pathfinding Visualizer", str(value))
+        else:
+            raise value
+
+    def show_field(self, field):
+        """Draw a flow field's arrows over the board, or remove them (None)."""
+        if field is None and self.field is None:
+            return
+        self.field = field
+        self.view.draw_arrows(field)
+
+    def cancel(self, event=None):
+        """Stop the running search, or the animation of its result."""
+        if self.job is not None:
+            self.job.cancel()  # poll_job() cleans up once the thread has stopped
+        elif self.animation is not None:
+            self.root.after_cancel(self.animation)
+            self.animation = None
+
+    def restart(self):
+        """Cancel whatever is running and search again on the board as it is now."""
+        if self.last_algorithm is None:
+            return
+        if self.job is not None:
+            self.restart_requested = True
+            self.job.cancel()
+            return
+        self.cancel()
+        self.run_algorithm(self.last_algorithm)
+
+    def replan(self, start, end, checkpoint=None):
+        # The planner hears about wall/terrain edits through the grid and repairs only those
+        if self.planner is None or self.grid.coords(self.planner.end) != end:
+            if self.planner is not None:
+                self.planner.close()
+            self.planner = DStarLite(self.grid, start, end)
+        else:
+            self.planner.move_start(start)
+        started = time.perf_counter()
+        result = self.planner.plan(checkpoint)
+        result.stats.search_time = time.perf_counter() - started
+        return result
+
+    def get_speed(self):
+        """Animation rate in events per second, None for instant.
+
+        Scaled up with the board area, so a search across a big map takes
+        about as long to watch as one across the default board.
+        """
+        rate = SPEEDS.get(self.speed_var.get(), SPEEDS["Average"])
+        if rate is None:
+            return None
+        return rate * max(1, self.grid.size // (ROWS * COLS))
+
+def run_visualizer(rows=ROWS, cols=COLS, map_file=None, trace_file=None):
+    root = tk.Tk()
+    grid = start = end = None
+    if map_file:
+        grid, start, end = load_map(map_file)
+        load_for(grid, map_file)  # landmark heuristic index saved next to the map, if any
+    app = PathfindingVisualizer(root, rows, cols, grid, trace_file, start, end)
+    root.mainloop()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Visualize pathfinding algorithms on a grid.")
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--cols", type=int, default=COLS)
+    parser.add_argument("--map", dest="map_file", help="open this map file (board file, Moving AI .map or text with '#' = wall) instead of an empty grid")
+    parser.add_argument("--trace", dest="trace_file", help="append every run's search statistics to this file as JSON lines")
+    return vars(parser.parse_args(argv))
+
+if __name__ == "__main__":
+    options = parse_args()
+    settings = load_settings()
+    if settings.get("show_tutorial", True):
+        show_tutorial(options)
+    else:
+        run_visualizer(**options)
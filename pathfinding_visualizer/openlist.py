@@ -0,0 +1,187 @@
+"""Open lists for the priority-driven searches (dijkstra, astar, greedy).
+
+All three kinds take push(node, key, g) and return node ids from pop() in
+key order. With tie_break="g", nodes with equal keys come out largest g
+first, which in A* means the one closest to the goal; otherwise ties go
+by node id (heap, indexed) or last in, first out (bucket).
+
+  heap     heapq of (key, node) tuples. A node whose key improves is simply
+           pushed again, so the heap holds stale copies that the search
+           skips when they surface.
+  indexed  binary heap of node ids plus each node's position in it, kept in
+           the grid's SearchSpace. An improved key moves the node up in
+           place (decrease-key): no duplicates, no tuples, the heap is
+           exactly the frontier.
+  bucket   one bucket per integer key and a cursor at the lowest non-empty
+           one; push and pop are O(1) amortised. Needs integer keys, so it
+           refuses grids with diagonal moves.
+
+heap stays the default because it works on every grid. On 4-connected
+grids bucket is usually fastest; indexed keeps the open list smallest but
+its sift loops run in Python, so it is the slowest. suite.py --open-lists
+measures all three.
+"""
+from heapq import heappush, heappop
+
+KINDS = ("heap", "indexed", "bucket")
+TIE_BREAKS = (None, "g")
+
+
+class HeapOpenList(list):
+    def __init__(self, tie_break=None):
+        super().__init__()
+        if tie_break == "g":
+            self.push = self._push_g
+
+    def push(self, node, key, g=0):
+        heappush(self, (key, node))
+
+    def _push_g(self, node, key, g=0):
+        heappush(self, (key, -g, node))
+
+    def pop(self):
+        return heappop(self)[-1]
+
+    def stale_pops(self, pushes, expanded):
+        """Entries popped but skipped, given the pushes made and nodes expanded."""
+        return pushes - len(self) - expanded
+
+
+class IndexedOpenList(list):
+    """Binary heap of node ids; keys, tie-break values and positions live in per-node arrays."""
+
+    def __init__(self, space, tie_break=None):
+        super().__init__()
+        self.stamp = space.stamp
+        self.member = space.scratch("open_stamp", "I")  # == stamp while the node's pos is valid
+        self.pos = space.scratch("open_pos", "i", -1)   # index in the heap, -1 once popped
+        self.key = space.scratch("open_key", "d")
+        self.g = space.scratch("open_g", "d")
+        self.tie = tie_break == "g"
+
+    def _before(self, a, b):
+        key = self.key
+        if key[a] != key[b]:
+            return key[a] < key[b]
+        if self.tie:
+            return self.g[a] > self.g[b]
+        return a < b
+
+    def _up(self, i):
+        pos, node, before = self.pos, self[i], self._before
+        while i:
+            parent = (i - 1) >> 1
+            other = self[parent]
+            if not before(node, other):
+                break
+            self[i] = other
+            pos[other] = i
+            i = parent
+        self[i] = node
+        pos[node] = i
+
+    def _down(self, i):
+        pos, node, before = self.pos, self[i], self._before
+        size = len(self)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and before(self[child + 1], self[child]):
+                child += 1
+            other = self[child]
+            if not before(other, node):
+                break
+            self[i] = other
+            pos[other] = i
+            i = child
+        self[i] = node
+        pos[node] = i
+
+    def push(self, node, key, g=0):
+        """Insert node, or lower its key if it is already in the heap."""
+        if self.member[node] == self.stamp:
+            i = self.pos[node]
+            if i == -1:
+                return  # already popped
+            self.key[node] = key
+            self.g[node] = g
+            self._up(i)
+            return
+        self.member[node] = self.stamp
+        self.key[node] = key
+        self.g[node] = g
+        self.append(node)
+        self._up(len(self) - 1)
+
+    def pop(self):
+        top = self[0]
+        last = list.pop(self)
+        if self:
+            self[0] = last
+            self._down(0)
+        self.pos[top] = -1
+        return top
+
+    def stale_pops(self, pushes, expanded):
+        return 0  # every node is in the heap at most once
+
+
+class BucketOpenList:
+    """Buckets indexed by integer key; each bucket a stack, or {g: stack} with tie_break="g"."""
+
+    def __init__(self, tie_break=None):
+        self.buckets = []
+        self.cursor = 0
+        self.size = 0
+        self.tie = tie_break == "g"
+
+    def __len__(self):
+        return self.size
+
+    def push(self, node, key, g=0):
+        key = int(key)
+        buckets = self.buckets
+        while key >= len(buckets):
+            buckets.append({} if self.tie else [])
+        if self.tie:
+            buckets[key].setdefault(g, []).append(node)
+        else:
+            buckets[key].append(node)
+        if key < self.cursor:
+            self.cursor = key  # greedy search keys can go down
+        self.size += 1
+
+    def pop(self):
+        buckets, cursor = self.buckets, self.cursor
+        while not buckets[cursor]:
+            cursor += 1
+        self.cursor = cursor
+        self.size -= 1
+        if not self.tie:
+            return buckets[cursor].pop()
+        bucket = buckets[cursor]
+        g = max(bucket)
+        nodes = bucket[g]
+        node = nodes.pop()
+        if not nodes:
+            del bucket[g]
+        return node
+
+    def stale_pops(self, pushes, expanded):
+        return pushes - self.size - expanded
+
+
+def make_open_list(kind, grid, space, tie_break=None):
+    """A new, empty open list of the given kind (None for the default heap)."""
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Unknown tie-break '{tie_break}', expected 'g' or none")
+    if kind in (None, "heap"):
+        return HeapOpenList(tie_break)
+    if kind == "indexed":
+        return IndexedOpenList(space, tie_break)
+    if kind == "bucket":
+        if grid.diagonal:
+            raise ValueError("The bucket open list needs integer costs; turn diagonal moves off")
+        return BucketOpenList(tie_break)
+    raise ValueError(f"Unknown open list '{kind}', expected one of {', '.join(KINDS)}")
@@ -0,0 +1,375 @@
+"""One large query split over a pool of processes.
+
+Each worker process owns a band of grid rows. The walls, terrain costs and
+parent ids live in one shared memory block; a worker only ever writes the
+distances and parents of its own band, so nothing needs locking. A move
+out of a band always lands in the band just above or below it, and those
+relaxations are handed to the neighbouring worker at the next round, routed
+through the coordinating process along with each round's command.
+
+Two searches run this way:
+
+    bfs        level-synchronous BFS for 4-connected unit-cost grids: each
+               round every worker expands its part of the current level
+    dijkstra   delta-stepping: nodes are kept in buckets of width delta and
+               each round every worker settles its part of the lowest
+               non-empty bucket, relaxing light edges (cost <= delta) until
+               the bucket stays empty and then its heavy edges
+
+Both return the same path costs as the sequential engine.bfs and
+engine.dijkstra (the paths may differ between equally cheap ones). Every
+round is a message round trip to each worker, so the speedup needs wide
+frontiers: large open or randomly walled maps, not mazes. The trace holds
+every discovered node, grouped by worker rather than in discovery order.
+
+Keep a ParallelSearch open to answer several queries with the same
+processes; parallel_bfs() and delta_stepping() start and stop a pool for
+one query, as engine.solve(workers=N) does.
+"""
+import multiprocessing
+import os
+from array import array
+from multiprocessing import shared_memory
+
+from engine import SearchResult, SearchStats, build_path
+from grid import Grid
+
+INF = float("inf")
+
+# Default bucket width in cheapest steps: wider buckets mean fewer rounds but
+# more nodes settled before their final distance is known and redone later
+DELTA_STEPS = 4
+
+
+class _Band:
+    """A worker's rows [lo, hi) of the grid, as node ids."""
+
+    def __init__(self, shm, rows, cols, lo, hi):
+        size = rows * cols
+        self.rows, self.cols = rows, cols
+        self.lo, self.hi = lo, hi
+        self.parent = shm.buf[:4 * size].cast("i")
+        self.cells = shm.buf[4 * size:5 * size].toreadonly()
+        self.costs = shm.buf[5 * size:6 * size].toreadonly()
+
+    def begin(self, weighted, diagonal):
+        self.grid = Grid(self.rows, self.cols, self.cells, self.costs if weighted else None, diagonal)
+        self.trace = array("i")
+        self.expanded = self.stale = 0
+
+    def release(self):
+        self.parent.release()
+        self.cells.release()
+        self.costs.release()
+
+    def _route(self, up, down, nb, *request):
+        if nb < self.lo:
+            up.append(nb)
+            up.extend(request)
+        else:
+            down.append(nb)
+            down.extend(request)
+
+    # Level-synchronous BFS
+
+    def bfs_begin(self, source, target):
+        self.seen = bytearray(self.hi - self.lo)
+        self.frontier = []
+        self.target = target
+        self.found = False
+        if self.lo <= source < self.hi:
+            self.seen[source - self.lo] = 1
+            self.frontier.append(source)
+
+    def bfs_round(self, incoming):
+        """Accept the (node, parent) pairs sent here, then expand the current level."""
+        lo, hi, seen, parent, trace = self.lo, self.hi, self.seen, self.parent, self.trace
+        frontier = self.frontier
+        for i in range(0, len(incoming), 2):
+            nb = incoming[i]
+            if not seen[nb - lo]:
+                seen[nb - lo] = 1
+                parent[nb] = incoming[i + 1]
+                trace.append(nb)
+                frontier.append(nb)
+                if nb == self.target:
+                    self.found = True
+        up, down = array("i"), array("i")
+        next_level = []
+        if not self.found:
+            neighbors, target = self.grid.neighbors, self.target
+            for current in frontier:
+                for nb in neighbors(current):
+                    if lo <= nb < hi:
+                        if not seen[nb - lo]:
+                            seen[nb - lo] = 1
+                            parent[nb] = current
+                            trace.append(nb)
+                            next_level.append(nb)
+                            if nb == target:
+                                self.found = True
+                    else:
+                        self._route(up, down, nb, current)
+            self.expanded += len(frontier)
+        self.frontier = next_level
+        return up, down, len(next_level), self.found
+
+    # Delta-stepping
+
+    def delta_begin(self, source, target, delta):
+        self.dist = array("d", [INF]) * (self.hi - self.lo)
+        self.buckets = {}  # bucket index -> node ids, possibly stale
+        self.delta = delta
+        self.target = target
+        if self.lo <= source < self.hi:
+            self.dist[source - self.lo] = 0.0
+            self.buckets[0] = [source]
+
+    def _relax(self, nb, current, new_dist, up, down):
+        """Improve an owned node right away, or queue the request for its owner."""
+        lo = self.lo
+        if lo <= nb < self.hi:
+            if new_dist < self.dist[nb - lo]:
+                self.dist[nb - lo] = new_dist
+                self.parent[nb] = current
+                self.trace.append(nb)
+                self.buckets.setdefault(int(new_dist / self.delta), []).append(nb)
+        else:
+            self._route(up, down, nb, current)
+            (self.up_dist if nb < lo else self.down_dist).append(new_dist)
+
+    def delta_round(self, bucket, incoming, incoming_dist):
+        """Accept relaxations sent here, settle what this band holds of bucket, report the lowest bucket left."""
+        up, down = array("i"), array("i")
+        self.up_dist, self.down_dist = array("d"), array("d")
+        for i in range(0, len(incoming), 2):
+            self._relax(incoming[i], incoming[i + 1], incoming_dist[i // 2], up, down)
+        delta, dist, lo = self.delta, self.dist, self.lo
+        edges, relax = self.grid.edges, self._relax
+        settled = []  # nodes taken from the bucket, heavy edges not relaxed yet
+        while bucket in self.buckets:
+            nodes = set(self.buckets.pop(bucket))
+            for current in nodes:
+                d = dist[current - lo]
+                if int(d / delta) != bucket:
+                    self.stale += 1  # improved into a lower bucket since
+                    continue
+                self.expanded += 1
+                settled.append(current)
+                for nb, step in edges(current):
+                    if step <= delta:
+                        relax(nb, current, d + step, up, down)
+        # Bucket empty here: heavy edges cannot lead back into it
+        for current in set(settled):
+            d = dist[current - lo]
+            for nb, step in edges(current):
+                if step > delta:
+                    relax(nb, current, d + step, up, down)
+        lowest = min((index for index, nodes in self.buckets.items() if nodes), default=None)
+        for d in self.up_dist + self.down_dist:
+            if lowest is None or d / delta < lowest:
+                lowest = int(d / delta)
+        target_dist = dist[self.target - lo] if lo <= self.target < self.hi else None
+        return up, down, self.up_dist, self.down_dist, lowest, target_dist
+
+
+def _band_worker(conn, shm_name, rows, cols, lo, hi):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    band = _Band(shm, rows, cols, lo, hi)
+    try:
+        while True:
+            command, *args = conn.recv()
+            if command == "stop":
+                break
+            elif command == "begin":
+                kind, weighted, diagonal, source, target, delta = args
+                band.begin(weighted, diagonal)
+                if kind == "bfs":
+                    band.bfs_begin(source, target)
+                else:
+                    band.delta_begin(source, target, delta)
+            elif command == "bfs":
+                conn.send(band.bfs_round(*args))
+            elif command == "delta":
+                conn.send(band.delta_round(*args))
+            elif command == "finish":
+                conn.send((band.trace, band.expanded, band.stale))
+    finally:
+        band.release()
+        shm.close()
+
+
+class ParallelSearch:
+    """Worker processes each owning a band of a grid's rows, kept for several queries.
+
+    The grid's walls and costs are copied to the workers at the start of
+    every query, so edits made between queries are always seen.
+    """
+
+    def __init__(self, grid, workers=None):
+        self.grid = grid
+        workers = min(workers or os.cpu_count() or 1, grid.rows)
+        size = grid.size
+        # Layout: parent ids (int32), wall cells, terrain costs
+        self.shm = shared_memory.SharedMemory(create=True, size=max(6 * size, 1))
+        self.bounds = [grid.rows * k // workers * grid.cols for k in range(workers + 1)]
+        self.conns, self.processes = [], []
+        try:
+            for k in range(workers):
+                parent_conn, child_conn = multiprocessing.Pipe()
+                process = multiprocessing.Process(
+                    target=_band_worker, name=f"band-{k}", daemon=True,
+                    args=(child_conn, self.shm.name, grid.rows, grid.cols, self.bounds[k], self.bounds[k + 1]))
+                process.start()
+                child_conn.close()
+                self.conns.append(parent_conn)
+                self.processes.append(process)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def workers(self):
+        return len(self.conns)
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("stop",))
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join()
+        for conn in self.conns:
+            conn.close()
+        self.conns, self.processes = [], []
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _begin(self, kind, source, target, delta=None):
+        grid, buf, size = self.grid, self.shm.buf, self.grid.size
+        buf[4 * size:5 * size] = grid.cells
+        if grid.weighted:
+            buf[5 * size:6 * size] = grid.costs
+        for conn in self.conns:
+            conn.send(("begin", kind, grid.weighted, grid.diagonal, source, target, delta))
+
+    def _round(self, messages):
+        for conn, message in zip(self.conns, messages):
+            conn.send(message)
+        return [conn.recv() for conn in self.conns]
+
+    def _finish(self, name, source, target, found, max_open):
+        trace = array("i")
+        expanded = stale = 0
+        for conn in self.conns:
+            conn.send(("finish",))
+        for conn in self.conns:
+            band_trace, band_expanded, band_stale = conn.recv()
+            trace.extend(band_trace)
+            expanded += band_expanded
+            stale += band_stale
+        grid = self.grid
+        path = []
+        if found:
+            parent = self.shm.buf[:4 * grid.size].cast("i")
+            try:
+                path = build_path(grid, parent, source, target)
+            finally:
+                parent.release()
+        stats = SearchStats(expanded, len(trace), stale, max_open)
+        return SearchResult(name, grid.coords(source), grid.coords(target), path, trace,
+                            grid.path_cost(path) if path else None, stats)
+
+    @staticmethod
+    def _forward(reports, count):
+        """Requests each band was sent: the downward ones of the band above, the upward ones of the band below."""
+        incoming = []
+        for k in range(count):
+            requests = array("i")
+            if k > 0:
+                requests.extend(reports[k - 1][1])
+            if k + 1 < count:
+                requests.extend(reports[k + 1][0])
+            incoming.append(requests)
+        return incoming
+
+    def bfs(self, source, target):
+        """Level-synchronous BFS between node ids, for 4-connected unit-cost grids."""
+        if not self.grid.uniform:
+            raise ValueError("Parallel BFS needs a 4-connected grid without terrain costs")
+        self._begin("bfs", source, target)
+        count = self.workers
+        incoming = [array("i")] * count
+        found = source == target
+        max_open = 1
+        while not found:
+            reports = self._round([("bfs", requests) for requests in incoming])
+            found = any(report[3] for report in reports)
+            incoming = self._forward(reports, count)
+            waiting = sum(report[2] for report in reports) + sum(len(r) for r in incoming) // 2
+            max_open = max(max_open, waiting)
+            if not waiting:
+                break
+        return self._finish("bfs", source, target, found, max_open)
+
+    def dijkstra(self, source, target, delta=None):
+        """Delta-stepping between node ids; delta defaults to default_delta()."""
+        grid = self.grid
+        delta = delta or default_delta(grid)
+        self._begin("delta", source, target, delta)
+        count = self.workers
+        incoming = [(array("i"), array("d"))] * count
+        bucket = 0
+        found = source == target
+        max_open = 1
+        while not found:
+            reports = self._round([("delta", bucket, requests, dists) for requests, dists in incoming])
+            incoming = []
+            for k, requests in enumerate(self._forward(reports, count)):
+                dists = array("d")
+                if k > 0:
+                    dists.extend(reports[k - 1][3])
+                if k + 1 < count:
+                    dists.extend(reports[k + 1][2])
+                incoming.append((requests, dists))
+            max_open = max(max_open, sum(len(dists) for _, dists in incoming))
+            lowest = [report[4] for report in reports if report[4] is not None]
+            target_dist = next(report[5] for report in reports if report[5] is not None)
+            # Whatever is still waiting costs at least its bucket's lower bound to reach
+            if target_dist < INF and (not lowest or target_dist <= min(lowest) * delta):
+                found = True
+            elif not lowest:
+                break
+            else:
+                bucket = min(lowest)
+        return self._finish("dijkstra", source, target, found, max_open)
+
+
+def default_delta(grid):
+    """Bucket width for delta-stepping: DELTA_STEPS of the cheapest steps."""
+    return DELTA_STEPS * grid.min_cost()
+
+
+def parallel_bfs(grid, source, target, workers=None):
+    with ParallelSearch(grid, workers) as pool:
+        return pool.bfs(source, target)
+
+
+def delta_stepping(grid, source, target, workers=None, delta=None):
+    with ParallelSearch(grid, workers) as pool:
+        return pool.dijkstra(source, target, delta)
+
+
+ALGORITHMS = {
+    "bfs": parallel_bfs,
+    "dijkstra": delta_stepping,
+}
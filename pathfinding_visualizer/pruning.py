@@ -0,0 +1,544 @@
+"""Search-space reduction: dead ends and swamps that no shortest path needs.
+
+Two kinds of open cells are pruned. The searches run on a view of the grid
+in which pruned cells look like walls:
+
+  - dead ends (4-connected grids only) are peeled off by repeatedly
+    removing open cells with at most one open neighbour left. They form
+    trees hanging off the rest of the map, and a shortest path only enters
+    one to reach an endpoint inside it, along the chain of cells back to
+    where the tree hangs. A perfect maze peels away completely.
+  - swamps are small regions that any two cells around them can get
+    around at no extra cost (Pochter, Zohar and Rosenschein, "Search-space
+    reduction using swamps"). The candidates are pockets that one cell
+    cuts off and corridors of cells with two neighbours. Each is checked
+    with searches from its boundary, bounded by the cost of crossing it.
+    A swamp never overlaps the cells another swamp's check looked at, so
+    any of them can be opened again without invalidating the others.
+
+Each query opens the dead-end chains from its endpoints, up to where they
+meet, and the swamps that its endpoints or those chains end in. It then
+searches the view and closes them again. Path costs match the unpruned
+searches.
+
+Edits are handled locally. A wall change re-peels or restores only the
+dead-end tree around it. Swamps whose check looked at a changed cell are
+dropped, and new swamps around the edit are looked for before the next
+query. clear() and a change of movement model rebuild everything on the
+next query.
+"""
+from array import array
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from heapq import heappush, heappop
+
+from grid import Grid
+
+# Kinds of cells
+CORE, DEAD_END, SWAMP = range(3)
+
+MAX_POCKET = 1024    # cells in a pocket behind a single cell
+MAX_RUN = 32         # cells in a corridor swamp
+CHECK_BUDGET = 2048  # cells one boundary search may reach before the candidate is given up
+TILE = 16            # side of the tiles indexing the swamps by the cells their checks saw
+EPSILON = 1e-9
+
+
+class Swamp:
+    def __init__(self, cells, box):
+        self.cells = cells
+        self.box = box  # (top, left, bottom, right) around every cell its check depends on
+
+    def covers(self, row, col):
+        top, left, bottom, right = self.box
+        return top <= row <= bottom and left <= col <= right
+
+
+class Pruning:
+    def __init__(self, grid):
+        self.grid = grid
+        self.view = None  # Grid over mask; None until built
+        grid.subscribe(self._cell_changed)
+
+    def close(self):
+        self.grid.unsubscribe(self._cell_changed)
+        if self.grid.pruning is self:
+            self.grid.pruning = None
+
+    # --- building ---
+
+    def build(self):
+        """Peel every dead end and look for swamps all over the grid."""
+        grid = self.grid
+        size = grid.size
+        self.diagonal = grid.diagonal
+        self.walls = bytearray(grid.cells)  # wall state the pruning reflects
+        self.mask = bytearray(self.walls)   # walls and pruned cells: the view's cells
+        self.kind = bytearray(size)
+        self.parent = array("i", [-1]) * size  # next cell towards where a dead end hangs, -1 at a tree's root
+        self.swamp_of = array("i", [-1]) * size
+        self.swamps = {}
+        self.tiles = defaultdict(set)  # (tile row, tile col) -> ids of the swamps whose box overlaps it
+        self.next_id = 0
+        self.dirty = []  # boxes to look for new swamps in before the next query
+        self.view = Grid(grid.rows, grid.cols, self.mask, grid.costs, grid.diagonal)
+        if not grid.diagonal:
+            walls = self.walls
+            self._peel(node for node in range(size) if not walls[node])
+        for cells in sorted(self._pockets(), key=len, reverse=True):
+            self._try_swamp(cells)
+        tried = bytearray(size)
+        for node in range(size):
+            if not tried[node] and not self.mask[node]:
+                run = self._run(node)
+                if run:
+                    for cell in run:
+                        tried[cell] = 1
+                    self._try_swamp(run)
+
+    def _peel(self, candidates):
+        """Peel the dead ends that candidates lead to; returns the cells peeled.
+
+        Only for 4-connected grids, where a peeled cell's other open
+        neighbours are all cells peeled before it.
+        """
+        walls, kind, mask, parent = self.walls, self.kind, self.mask, self.parent
+        neighbors = self.grid.neighbors
+        queue = deque(candidates)
+        peeled = []
+        while queue:
+            node = queue.popleft()
+            if walls[node] or kind[node] == DEAD_END:
+                continue
+            rest = [nb for nb in neighbors(node) if kind[nb] != DEAD_END]
+            if len(rest) > 1:
+                continue
+            if kind[node] == SWAMP:
+                self._drop(self.swamp_of[node])
+            kind[node] = DEAD_END
+            mask[node] = 1
+            parent[node] = rest[0] if rest else -1
+            peeled.append(node)
+            if rest:
+                queue.append(rest[0])
+        return peeled
+
+    def _pockets(self):
+        """Regions of at most MAX_POCKET open view cells that a single cell cuts off.
+
+        One iterative depth-first search (Tarjan's articulation points):
+        when a child's subtree has no back edge above its parent, the
+        subtree is a region that only the parent leads into.
+        """
+        view, mask = self.view, self.mask
+        neighbors = view.neighbors
+        disc = array("i", [-1]) * view.size
+        low = array("i", [0]) * view.size
+        order = []  # cells in discovery order, so every subtree is a slice of it
+        pockets = []
+        root = mask.find(0)
+        while root != -1:
+            if disc[root] == -1:
+                disc[root] = low[root] = len(order)
+                order.append(root)
+                stack = [(root, iter(neighbors(root)))]
+                root_children = 0  # the root only cuts anything off with two or more
+                while stack:
+                    node, it = stack[-1]
+                    for nb in it:
+                        if disc[nb] == -1:
+                            disc[nb] = low[nb] = len(order)
+                            order.append(nb)
+                            stack.append((nb, iter(neighbors(nb))))
+                            root_children += node == root
+                            break
+                        if disc[nb] < low[node]:
+                            low[node] = disc[nb]
+                    else:
+                        stack.pop()
+                        if stack:
+                            up = stack[-1][0]
+                            if low[node] < low[up]:
+                                low[up] = low[node]
+                            if (low[node] >= disc[up] and len(order) - disc[node] <= MAX_POCKET
+                                    and (up != root or root_children > 1)):
+                                pockets.append(order[disc[node]:])
+            root = mask.find(0, root + 1)
+        return pockets
+
+    def _run(self, node):
+        """The corridor of view cells with exactly two neighbours through node, [] if node is not one."""
+        mask, kind = self.mask, self.kind
+        neighbors = self.view.neighbors
+
+        def inner(cell):
+            return not mask[cell] and kind[cell] == CORE and len(neighbors(cell)) == 2
+
+        if not inner(node):
+            return []
+        run = [node]
+        seen = {node}
+        for first in neighbors(node):
+            prev, cell = node, first
+            while len(run) < MAX_RUN and cell not in seen and inner(cell):
+                run.append(cell)
+                seen.add(cell)
+                a, b = neighbors(cell)
+                prev, cell = cell, (b if a == prev else a)
+        return run
+
+    def _boundary(self, region):
+        """Open view cells next to region (diagonally too on 8-connected grids)."""
+        grid, mask = self.grid, self.mask
+        rows, cols = grid.rows, grid.cols
+        steps = ((0, 1), (1, 0), (0, -1), (-1, 0))
+        if self.diagonal:
+            steps += ((1, 1), (1, -1), (-1, -1), (-1, 1))
+        boundary = set()
+        for node in region:
+            r, c = divmod(node, cols)
+            for dr, dc in steps:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < rows and 0 <= nc < cols:
+                    nb = nr * cols + nc
+                    if not mask[nb] and nb not in region:
+                        boundary.add(nb)
+        return boundary
+
+    def _try_swamp(self, cells):
+        """Make cells a swamp if they pass the check; True if they did."""
+        kind, mask, cols = self.kind, self.mask, self.grid.cols
+        if any(mask[node] or kind[node] != CORE for node in cells):
+            return False
+        region = set(cells)
+        boundary = self._boundary(region)
+        # Masking a cell another swamp's check saw, or (diagonally) a corner
+        # of one of its paths, could lengthen that swamp's way around
+        near = list(cells) + list(boundary) if self.diagonal else cells
+        if any(True for node in near for _ in self._covering(node)):
+            return False
+        seen = self._check(region, boundary)
+        if seen is None:
+            return False
+        seen |= region
+        rows_seen = [node // cols for node in seen]
+        cols_seen = [node % cols for node in seen]
+        box = (max(min(rows_seen) - 1, 0), max(min(cols_seen) - 1, 0),
+               min(max(rows_seen) + 1, self.grid.rows - 1), min(max(cols_seen) + 1, cols - 1))
+        sid = self.next_id
+        self.next_id += 1
+        self.swamps[sid] = Swamp(list(cells), box)
+        for node in cells:
+            kind[node] = SWAMP
+            self.swamp_of[node] = sid
+        top, left, bottom, right = box
+        for tr in range(top // TILE, bottom // TILE + 1):
+            for tc in range(left // TILE, right // TILE + 1):
+                self.tiles[tr, tc].add(sid)
+        return True
+
+    def _check(self, region, boundary):
+        """Cells looked at if region is a swamp (it is then left masked), else None.
+
+        For every boundary cell, a search through the region alone finds
+        what it costs to cross to each other boundary cell; a second
+        search with the region masked, bounded by the dearest of those,
+        must reach each of them at no more cost.
+        """
+        mask, edges = self.mask, self.view.edges
+        seen = set(boundary)
+        crossings = []
+        if len(boundary) > 1:
+            cols = self.grid.cols
+            for b1 in boundary:
+                dist = {b1: 0}
+                pq = [(0, b1)]
+                targets = {}
+                while pq:
+                    d, node = heappop(pq)
+                    if d > dist[node]:
+                        continue
+                    if node != b1 and node not in region:
+                        targets[node] = d  # crossed, no further
+                        continue
+                    for nb, step in edges(node):
+                        if node == b1 and nb not in region:
+                            # Only diagonal steps past a corner in the region lose their way
+                            r1, c1 = divmod(node, cols)
+                            r2, c2 = divmod(nb, cols)
+                            if r1 == r2 or c1 == c2 or (r1 * cols + c2 not in region and r2 * cols + c1 not in region):
+                                continue
+                        nd = d + step
+                        if nb not in dist or nd < dist[nb]:
+                            dist[nb] = nd
+                            heappush(pq, (nd, nb))
+                seen.update(dist)
+                if targets:
+                    crossings.append((b1, targets))
+        for node in region:
+            mask[node] = 1
+        for b1, targets in crossings:
+            limit = max(targets.values()) + EPSILON
+            left = len(targets)
+            dist = {b1: 0}
+            pq = [(0, b1)]
+            while pq and left:
+                d, node = heappop(pq)
+                if d > dist[node]:
+                    continue
+                if d > limit or len(dist) > CHECK_BUDGET:
+                    break
+                bound = targets.get(node)
+                if bound is not None:
+                    if d > bound + EPSILON:
+                        break
+                    left -= 1
+                for nb, step in edges(node):
+                    nd = d + step
+                    if nb not in dist or nd < dist[nb]:
+                        dist[nb] = nd
+                        heappush(pq, (nd, nb))
+            seen.update(dist)
+            if left:
+                for node in region:
+                    mask[node] = 0
+                return None
+        return seen
+
+    # --- swamp bookkeeping ---
+
+    def _covering(self, node):
+        """Ids of the swamps whose check depends on node."""
+        row, col = divmod(node, self.grid.cols)
+        swamps = self.swamps
+        for sid in self.tiles.get((row // TILE, col // TILE), ()):
+            if swamps[sid].covers(row, col):
+                yield sid
+
+    def _drop(self, sid):
+        """Open a swamp's cells again and look for swamps in its box before the next query."""
+        swamp = self.swamps.pop(sid)
+        kind, mask, walls = self.kind, self.mask, self.walls
+        for node in swamp.cells:
+            kind[node] = CORE
+            mask[node] = walls[node]
+            self.swamp_of[node] = -1
+        top, left, bottom, right = swamp.box
+        for tr in range(top // TILE, bottom // TILE + 1):
+            for tc in range(left // TILE, right // TILE + 1):
+                self.tiles[tr, tc].discard(sid)
+        self.dirty.append(swamp.box)
+
+    def _changed_near(self, node):
+        """Drop the swamps that depended on node and look for new ones around it."""
+        for sid in list(self._covering(node)):
+            self._drop(sid)
+        grid = self.grid
+        r, c = divmod(node, grid.cols)
+        self.dirty.append((max(r - 1, 0), max(c - 1, 0), min(r + 1, grid.rows - 1), min(c + 1, grid.cols - 1)))
+
+    def _reseed(self):
+        """Look for swamps among the open cells of the dirty boxes."""
+        kind, mask, cols = self.kind, self.mask, self.grid.cols
+        seeds = set()
+        for top, left, bottom, right in self.dirty:
+            for r in range(top, bottom + 1):
+                for node in range(r * cols + left, r * cols + right + 1):
+                    if not mask[node] and kind[node] == CORE:
+                        seeds.add(node)
+        self.dirty = []
+        for node in seeds:
+            for cells in self._local_pockets(node):
+                self._try_swamp(cells)
+        for node in seeds:
+            run = self._run(node)
+            if run:
+                self._try_swamp(run)
+
+    def _local_pockets(self, node):
+        """Regions of at most MAX_POCKET cells that node cuts off, found by bounded floods."""
+        if self.mask[node] or self.kind[node] != CORE:
+            return []
+        mask = self.mask
+        neighbors = self.view.neighbors
+        sides = neighbors(node)
+        if len(sides) < 2:
+            return []
+        # Sides still joined around node, through its 3x3 ring, lead to the same region
+        cols = self.grid.cols
+        r, c = divmod(node, cols)
+        ring = {nb for nb in (node + dr * cols + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1))
+                if nb != node and 0 <= nb < len(mask) and abs(nb % cols - c) <= 1 and not mask[nb]}
+        groups = []
+        for side in sides:
+            if any(side in group for group in groups):
+                continue
+            group = {side}
+            queue = [side]
+            while queue:
+                for nb in neighbors(queue.pop()):
+                    if nb in ring and nb not in group:
+                        group.add(nb)
+                        queue.append(nb)
+            groups.append(group)
+        if len(groups) < 2:
+            return []
+        pockets = []
+        for i, group in enumerate(groups):
+            others = set().union(*groups[:i], *groups[i + 1:])
+            region = {node}
+            queue = deque(group)
+            region.update(group)
+            while queue and len(region) <= MAX_POCKET + 1:
+                for nb in neighbors(queue.popleft()):
+                    if nb not in region and not mask[nb]:
+                        region.add(nb)
+                        queue.append(nb)
+            if not queue and len(region) <= MAX_POCKET + 1 and others.isdisjoint(region):
+                region.discard(node)
+                pockets.append(list(region))
+        return pockets
+
+    # --- maintenance ---
+
+    def _cell_changed(self, node):
+        if self.view is None:
+            return
+        if node is None:
+            self.view = None  # rebuilt on the next query
+            return
+        self._changed_near(node)
+        wall = self.grid.cells[node]
+        if wall == self.walls[node]:
+            return  # a terrain cost changed; only swamp checks look at those
+        self.walls[node] = wall
+        if self.diagonal:
+            self.mask[node] = wall
+            return
+        for cell in (self._closed(node) if wall else self._opened(node)):
+            self._changed_near(cell)
+
+    def _opened(self, node):
+        """Update the dead ends for a cell that was opened; returns the cells whose mask changed."""
+        kind, mask, parent = self.kind, self.mask, self.parent
+        neighbors = self.grid.neighbors(node)
+        if len(neighbors) <= 1:
+            # A new dead end itself, hanging off its only neighbour
+            kind[node] = DEAD_END
+            parent[node] = neighbors[0] if neighbors else -1
+            return []
+        mask[node] = 0
+        restored = [node]
+        for nb in neighbors:
+            if kind[nb] != DEAD_END:
+                continue
+            if parent[nb] == -1:
+                parent[nb] = node  # a tree that hung from nothing now hangs here
+                continue
+            # nb now has two ways out, so it and its chain stop being dead ends
+            # until the chain reaches the rest of the map or a tree root
+            cell = nb
+            while True:
+                up = parent[cell]
+                kind[cell] = CORE
+                mask[cell] = 0
+                parent[cell] = -1
+                restored.append(cell)
+                if up == -1 or kind[up] != DEAD_END:
+                    break
+                if parent[up] == -1:
+                    parent[up] = cell
+                    break
+                cell = up
+        peeled = set(self._peel(restored))
+        return [cell for cell in restored[1:] if cell not in peeled]
+
+    def _closed(self, node):
+        """Update the dead ends for a cell that became a wall; returns the cells whose mask changed."""
+        kind, mask, parent = self.kind, self.mask, self.parent
+        was = kind[node]
+        kind[node] = CORE
+        mask[node] = 1
+        parent[node] = -1
+        candidates = []
+        for nb in self.grid.neighbors(node):
+            if kind[nb] == DEAD_END:
+                if parent[nb] == node:
+                    parent[nb] = -1  # its tree now hangs from nothing
+            elif was != DEAD_END:
+                candidates.append(nb)  # lost a way out
+        return self._peel(candidates)
+
+    # --- queries ---
+
+    def _needed(self, source, target):
+        """Pruned cells a search from node source to node target may need."""
+        grid, kind, parent, swamp_of = self.grid, self.kind, self.parent, self.swamp_of
+        # A start inside a wall steps out onto its open neighbours
+        starts = grid.neighbors(source) if grid.cells[source] else [source]
+        chain = []
+        anchors = []  # cells outside any dead end that the chains lead to
+        for node in starts:
+            while node != -1 and kind[node] == DEAD_END:
+                chain.append(node)
+                node = parent[node]
+            if node != -1:
+                anchors.append(node)
+        on_chain = {node: i for i, node in enumerate(chain)}
+        node = target
+        tail = []
+        while node != -1 and kind[node] == DEAD_END:
+            meet = on_chain.get(node)
+            if meet is not None:
+                if len(starts) == 1:
+                    # Both ends in one tree: the path stays on it, up to where the chains meet
+                    del chain[meet + 1:]
+                    anchors = []
+                break
+            tail.append(node)
+            node = parent[node]
+        else:
+            if node != -1:
+                anchors.append(node)
+        needed = chain + tail
+        for sid in {swamp_of[node] for node in anchors} - {-1}:
+            needed.extend(self.swamps[sid].cells)
+        return needed
+
+    def ensure(self):
+        """Build, or bring up to date, before a query."""
+        if self.view is None or self.diagonal != self.grid.diagonal:
+            self.build()
+        elif self.dirty:
+            self._reseed()
+
+    @contextmanager
+    def opened(self, source, target):
+        """The view to search from node source to node target, with what that search needs opened."""
+        self.ensure()
+        grid, view, mask = self.grid, self.view, self.mask
+        needed = self._needed(source, target)
+        for node in needed:
+            mask[node] = 0
+        view.costs = grid.costs
+        view._min_cost = grid.min_cost()
+        view.landmarks = grid.landmarks  # lower bounds on the grid hold on the view too
+        view._space = grid.workspace()
+        try:
+            yield view
+        finally:
+            for node in needed:
+                mask[node] = 1
+
+    def counts(self):
+        """Number of dead-end cells, swamp cells and swamps."""
+        self.ensure()
+        return {"dead_ends": self.kind.count(DEAD_END), "swamp_cells": self.kind.count(SWAMP),
+                "swamps": len(self.swamps)}
+
+
+def pruning_for(grid):
+    """The grid's attached Pruning, created on first use."""
+    if grid.pruning is None:
+        grid.pruning = Pruning(grid)
+    return grid.pruning
@@ -0,0 +1,274 @@
+"""Canvas renderers for the visualizer grid.
+
+Both renderers show one color per cell and only push changed cells to Tk.
+
+RectRenderer draws one canvas rectangle per cell, with grid lines; fine for
+the default board but Tk slows to a crawl past a few hundred thousand items.
+ImageRenderer draws the visible part of the grid into a single PhotoImage
+and redraws dirty rows in blocks once per idle cycle, so grids of a million
+cells and more stay interactive.
+
+Both support zoom (pixels per cell) and pan (in pixels), and map canvas
+coordinates back to cells with cell_at(). draw_arrows() overlays one arrow
+per cell, e.g. a flow field's directions.
+"""
+import tkinter as tk
+from math import floor
+
+# Grids with more cells than this are drawn into an image
+IMAGE_CELLS = 20000
+
+MAX_ZOOM = 64  # pixels per cell
+
+ARROW_COLOR = "gray25"
+MIN_ARROW_ZOOM = 8  # cells smaller than this get no arrows in the image renderer
+
+
+def _arrow(canvas, x, y, size, step):
+    """Arrow across the cell centred on canvas point x, y, pointing along step = (dr, dc)."""
+    dr, dc = step
+    reach = size * (0.3 if dr and dc else 0.4)  # keep diagonals as long as straight arrows
+    canvas.create_line(x - dc * reach, y - dr * reach, x + dc * reach, y + dr * reach,
+                       arrow="last", fill=ARROW_COLOR, tags="arrows")
+
+
+class RectRenderer:
+    def __init__(self, canvas, rows, cols, cell_size):
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.zoom = cell_size
+        self.x0 = self.y0 = 0  # canvas position of the grid's top-left corner
+        self.shown = []
+        self.rects = []
+
+    def draw(self, colors):
+        """Create every cell with its initial color; later changes go through paint()."""
+        self.canvas.delete("all")
+        self.shown = list(colors)
+        self.rects = []
+        size, cols = self.zoom, self.cols
+        for node, color in enumerate(self.shown):
+            row, col = divmod(node, cols)
+            x1, y1 = self.x0 + col * size, self.y0 + row * size
+            rect = self.canvas.create_rectangle(x1, y1, x1 + size, y1 + size, fill=color, outline="gray")
+            self.rects.append(rect)
+
+    def paint(self, node, color):
+        # Skip the Tk call when the cell already shows this color
+        if self.shown[node] != color:
+            self.shown[node] = color
+            self.canvas.itemconfig(self.rects[node], fill=color)
+
+    def update_all(self, colors):
+        """Recolor every cell; only the ones that differ reach Tk."""
+        paint = self.paint
+        for node, color in enumerate(colors):
+            paint(node, color)
+
+    def draw_arrows(self, field):
+        """Arrow on every cell where field.step_at(node) gives a (dr, dc); None removes them."""
+        self.canvas.delete("arrows")
+        if field is None:
+            return
+        size, cols = self.zoom, self.cols
+        for node in range(self.rows * cols):
+            step = field.step_at(node)
+            if step:
+                row, col = divmod(node, cols)
+                _arrow(self.canvas, self.x0 + (col + 0.5) * size, self.y0 + (row + 0.5) * size, size, step)
+
+    def cell_at(self, x, y):
+        """(row, col) under canvas point x, y, or None outside the grid."""
+        row = int((y - self.y0) // self.zoom)
+        col = int((x - self.x0) // self.zoom)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def zoom_by(self, factor, x, y):
+        """Scale the view by factor, keeping canvas point x, y fixed."""
+        zoom = min(max(self.zoom * factor, 1), MAX_ZOOM)
+        factor = zoom / self.zoom
+        self.canvas.scale("all", x, y, factor, factor)
+        self.x0 = x + (self.x0 - x) * factor
+        self.y0 = y + (self.y0 - y) * factor
+        self.zoom = zoom
+
+    def pan(self, dx, dy):
+        self.canvas.move("all", dx, dy)
+        self.x0 += dx
+        self.y0 += dy
+
+    def resize(self, width, height):
+        pass  # rectangles keep their place when the canvas changes size
+
+
+class ImageRenderer:
+    def __init__(self, canvas, rows, cols, width, height):
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.width = max(width, 1)
+        self.height = max(height, 1)
+        self.shown = []
+        self.pixels = []  # '#rrggbb' per cell, the form PhotoImage.put() takes
+        self.hex_cache = {}
+        self.dirty_rows = set()
+        self.flush_pending = False
+        # Fit the whole grid on screen to start with
+        self.zoom = min(self.width / cols, self.height / rows, MAX_ZOOM)
+        self.left = self.top = 0.0  # grid coordinates of the top-left pixel
+        self.image = None
+        self.layout = (0, [], {})  # cached _layout() for the current view
+        self.arrows = None  # field shown by draw_arrows(), redrawn with the view
+
+    def to_hex(self, color):
+        value = self.hex_cache.get(color)
+        if value is None:
+            if color.startswith("#") and len(color) == 7:
+                value = color
+            else:
+                r, g, b = self.canvas.winfo_rgb(color)  # 16 bits per channel
+                value = f"#{r >> 8:02x}{g >> 8:02x}{b >> 8:02x}"
+            self.hex_cache[color] = value
+        return value
+
+    def draw(self, colors):
+        self.shown = list(colors)
+        self.pixels = [self.to_hex(color) for color in self.shown]
+        self.canvas.delete("all")
+        self.image = tk.PhotoImage(width=self.width, height=self.height)
+        self.canvas.create_image(0, 0, image=self.image, anchor="nw")
+        self.redraw()
+
+    def paint(self, node, color):
+        if self.shown[node] == color:
+            return
+        self.shown[node] = color
+        self.pixels[node] = self.to_hex(color)
+        self.dirty_rows.add(node // self.cols)
+        if not self.flush_pending:
+            # Many paints in one event handler or frame share one image update
+            self.flush_pending = True
+            self.canvas.after_idle(self.flush)
+
+    def update_all(self, colors):
+        self.shown = list(colors)
+        self.pixels = [self.to_hex(color) for color in self.shown]
+        self.redraw()
+
+    def _layout(self):
+        """Map the visible pixels to grid rows/cols.
+
+        Returns (x_first, cols per pixel column, {row: (first pixel row, last + 1)}).
+        """
+        zoom = self.zoom
+        xs = [floor(self.left + x / zoom) for x in range(self.width)]
+        x_first = 0
+        while x_first < len(xs) and xs[x_first] < 0:
+            x_first += 1
+        xs = [c for c in xs[x_first:] if c < self.cols]
+        spans = {}
+        for y in range(self.height):
+            row = floor(self.top + y / zoom)
+            if 0 <= row < self.rows:
+                first, _ = spans.get(row, (y, y))
+                spans[row] = (first, y + 1)
+        return x_first, xs, spans
+
+    def _put_rows(self, rows, x_first, xs, spans):
+        """Draw a run of consecutive visible grid rows with a single put()."""
+        pixels, cols = self.pixels, self.cols
+        lines = []
+        for row in rows:
+            base = row * cols
+            line = "{" + " ".join([pixels[base + c] for c in xs]) + "}"
+            first, stop = spans[row]
+            lines.extend([line] * (stop - first))
+        self.image.put(" ".join(lines), to=(x_first, spans[rows[0]][0]))
+
+    def redraw(self):
+        """Repaint the whole visible area, after a zoom, pan or resize."""
+        self.dirty_rows.clear()
+        if self.image is None:
+            return
+        self.image.blank()
+        x_first, xs, spans = self._layout()
+        if xs and spans:
+            self._put_rows(sorted(spans), x_first, xs, spans)
+        self.layout = (x_first, xs, spans)
+        self._draw_visible_arrows()
+
+    def draw_arrows(self, field):
+        """Arrows for field.step_at(node) on the visible cells, once they are big enough; None removes them."""
+        self.arrows = field
+        self._draw_visible_arrows()
+
+    def _draw_visible_arrows(self):
+        self.canvas.delete("arrows")
+        field, (_, xs, spans) = self.arrows, self.layout
+        if field is None or self.zoom < MIN_ARROW_ZOOM or not xs or not spans:
+            return
+        zoom, cols = self.zoom, self.cols
+        for row in range(min(spans), max(spans) + 1):
+            y = (row - self.top + 0.5) * zoom
+            for col in range(xs[0], xs[-1] + 1):
+                step = field.step_at(row * cols + col)
+                if step:
+                    _arrow(self.canvas, (col - self.left + 0.5) * zoom, y, zoom, step)
+
+    def flush(self):
+        """Push dirty rows to the image, neighbouring rows in one block."""
+        self.flush_pending = False
+        if self.image is None or not self.dirty_rows:
+            return
+        x_first, xs, spans = self.layout
+        rows = sorted(row for row in self.dirty_rows if row in spans)
+        self.dirty_rows.clear()
+        if not xs or not rows:
+            return
+        if len(rows) > len(spans) // 2:
+            self._put_rows(sorted(spans), x_first, xs, spans)
+            return
+        block = [rows[0]]
+        for row in rows[1:]:
+            if row != block[-1] + 1:
+                self._put_rows(block, x_first, xs, spans)
+                block = []
+            block.append(row)
+        self._put_rows(block, x_first, xs, spans)
+
+    def cell_at(self, x, y):
+        row = floor(self.top + y / self.zoom)
+        col = floor(self.left + x / self.zoom)
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def zoom_by(self, factor, x, y):
+        # Zooming out stops once the whole grid fits twice over
+        smallest = min(self.width / self.cols, self.height / self.rows, 1) / 2
+        zoom = min(max(self.zoom * factor, smallest), MAX_ZOOM)
+        col, row = self.left + x / self.zoom, self.top + y / self.zoom
+        self.left, self.top = col - x / zoom, row - y / zoom
+        self.zoom = zoom
+        self.redraw()
+
+    def pan(self, dx, dy):
+        self.left -= dx / self.zoom
+        self.top -= dy / self.zoom
+        self.redraw()
+
+    def resize(self, width, height):
+        if (width, height) == (self.width, self.height) or width < 2 or height < 2:
+            return
+        self.width, self.height = width, height
+        self.draw(self.shown)
+
+
+def make_renderer(canvas, rows, cols, cell_size, width, height):
+    """Rectangles for small grids, a single image for big ones."""
+    if rows * cols > IMAGE_CELLS:
+        return ImageRenderer(canvas, rows, cols, width, height)
+    return RectRenderer(canvas, rows, cols, cell_size)
@@ -0,0 +1,426 @@
+"""Long-running local pathfinding service over HTTP/JSON.
+
+Usage:
+    python service.py [--port 8765] [--workers N] [--map NAME=PATH ...]
+                      [--batch-window 2] [--max-batch 64] [--compiled]
+
+Maps are loaded once into every worker process and stay there, warm, with
+whatever the searches derive from them (connected components, a landmark
+index saved next to the map, HPA* hierarchies, flow fields) and a result
+cache. Wall and terrain edits are sent to every worker down the same
+ordered pipe as the queries, so a query always sees the edits made before
+it was dispatched, and the derived indexes repair themselves through the
+grid's listeners as usual.
+
+Queries arriving at the same time for the same map are coalesced: the
+dispatcher waits up to --batch-window milliseconds for more and hands them
+to the least busy worker as one batch of at most --max-batch queries.
+
+Endpoints (request and response bodies are JSON):
+
+    GET  /maps                  loaded maps: name, rows, cols, diagonal, version
+    POST /maps                  {"name", "path", "diagonal"?} load a map file
+    POST /maps/NAME/query       {"start": [r, c], "end": [r, c], "algorithm"?, "path"?}
+                                -> {"found", "cost", "length", "path"?, "stats"}
+    POST /maps/NAME/edit        {"walls": [[r, c, 0|1], ...], "costs": [[r, c, cost], ...]}
+                                -> {"version"}
+    GET  /stats                 counters, throughput and latency percentiles
+
+loadgen.py drives a running instance and reports its p50/p99 latency.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from boardfile import load_map
+from engine import COMPILED_ALGORITHMS
+
+LATENCY_WINDOW = 10000  # latencies kept for the percentiles
+THROUGHPUT_WINDOW = 10.0  # seconds of completed queries behind the recent rate
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """{"p50": ..., ...} of a list of numbers (nearest rank), plus the max."""
+    if not values:
+        return {f"p{p}": None for p in points} | {"max": None}
+    ordered = sorted(values)
+    result = {f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+def _answer(grid, cache, query, compiled):
+    """Solve one query in a worker: ("ok", response), ("error", message) or ("failed", message)."""
+    start, end = tuple(query["start"]), tuple(query["end"])
+    algorithm = query.get("algorithm", "astar")
+    try:
+        result = cache.solve(grid, start, end, algorithm, compiled=compiled and algorithm in COMPILED_ALGORITHMS)
+    except ValueError as e:  # bad cells or algorithm, or e.g. jps on a weighted map
+        return "error", str(e)
+    except Exception as e:  # keep the worker and its warm maps alive
+        return "failed", f"{type(e).__name__}: {e}"
+    response = {"found": result.found, "cost": result.cost, "length": len(result.path),
+                "stats": result.stats.as_dict()}
+    if query.get("path", True):
+        response["path"] = [list(cell) for cell in result.path]
+    return "ok", response
+
+
+def _worker_main(conn, compiled):
+    """Worker process: apply "load"/"edit" messages in order and answer "solve" batches."""
+    from cache import ResultCache
+    from landmarks import load_for
+    maps = {}
+    cache = ResultCache()
+    while True:
+        message = conn.recv()
+        kind = message[0]
+        if kind == "stop":
+            break
+        elif kind == "load":
+            _, name, path, diagonal = message
+            grid, _, _ = load_map(path)
+            grid.diagonal = grid.diagonal or diagonal
+            load_for(grid, path)
+            maps[name] = grid
+        elif kind == "edit":
+            _, name, walls, costs = message
+            grid = maps[name]
+            for row, col, wall in walls:
+                grid.set_wall(row, col, bool(wall))
+            for row, col, cost in costs:
+                grid.set_cost(row, col, cost)
+        elif kind == "solve":
+            _, batch, name, queries = message
+            grid = maps[name]
+            conn.send((batch, [_answer(grid, cache, query, compiled) for query in queries]))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, service, compiled):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child, compiled), daemon=True)
+        self.process.start()
+        child.close()
+        self.busy = 0  # batches sent and not answered yet
+        self.reader = threading.Thread(target=service._read_results, args=(self,), daemon=True)
+        self.reader.start()
+
+
+class MapInfo:
+    def __init__(self, name, path, rows, cols, diagonal):
+        self.name = name
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.diagonal = diagonal
+        self.version = 0  # bumped by every edit
+
+    def as_dict(self):
+        return {"name": self.name, "path": self.path, "rows": self.rows, "cols": self.cols,
+                "diagonal": self.diagonal, "version": self.version}
+
+
+class PathService:
+    """Worker processes holding warm maps, fed batches of queries by a dispatcher thread."""
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=64, compiled=False):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.maps = {}
+        self.lock = threading.Condition()  # guards the queues and counters below
+        self.send_lock = threading.Lock()  # keeps the workers' pipes in the same message order
+        self.pending = defaultdict(list)  # map name -> [(query, future, arrival time)]
+        self.inflight = {}  # batch id -> (worker, [(query, future, arrival time)])
+        self.batch_ids = itertools.count()
+        self.closed = False
+        # Counters for /stats
+        self.started = time.perf_counter()
+        self.queries = self.errors = self.edits = self.batches = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # seconds, newest last
+        self.completed = deque()  # completion times within THROUGHPUT_WINDOW
+        self.workers = [_Worker(self, compiled) for _ in range(workers or os.cpu_count() or 1)]
+        self.dispatcher = threading.Thread(target=self._dispatch, name="dispatcher", daemon=True)
+        self.dispatcher.start()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+            for entries in self.pending.values():
+                for _, future, _ in entries:
+                    future.set_result(("failed", "The service is shutting down"))
+            self.pending.clear()
+        self.dispatcher.join()
+        with self.send_lock:
+            for worker in self.workers:
+                worker.conn.send(("stop",))
+        for worker in self.workers:
+            worker.process.join()
+
+    def load(self, name, path, diagonal=False):
+        """Load a map file into every worker under name, replacing any map of that name."""
+        grid, _, _ = load_map(path)  # fail here, not in the workers
+        info = MapInfo(name, path, grid.rows, grid.cols, grid.diagonal or diagonal)
+        with self.send_lock:
+            for worker in self.workers:
+                worker.conn.send(("load", name, path, diagonal))
+            self.maps[name] = info
+        return info
+
+    def edit(self, name, walls=(), costs=()):
+        """Apply wall changes [(row, col, wall)] and terrain costs [(row, col, cost)] everywhere."""
+        info = self._map(name)
+        walls = [(int(r), int(c), w) for r, c, w in walls]
+        costs = [(int(r), int(c), int(cost)) for r, c, cost in costs]
+        for row, col, wall in walls:
+            if type(wall) not in (int, bool) or wall not in (0, 1):
+                raise ValueError(f"Wall value {wall!r} for cell ({row}, {col}) must be 0, 1, true or false")
+        walls = [(row, col, bool(wall)) for row, col, wall in walls]
+        for row, col, *_ in walls + costs:
+            if not (0 <= row < info.rows and 0 <= col < info.cols):
+                raise ValueError(f"Cell ({row}, {col}) is outside the {info.rows}x{info.cols} grid")
+        for _, _, cost in costs:
+            if not 1 <= cost <= 255:
+                raise ValueError(f"Terrain cost {cost} is outside 1-255")
+        with self.send_lock:
+            # Every query dispatched from now on reaches its worker after the edit
+            for worker in self.workers:
+                worker.conn.send(("edit", name, walls, costs))
+            with self.lock:
+                info.version += 1
+                self.edits += 1
+                return info.version
+
+    def _map(self, name):
+        info = self.maps.get(name)
+        if info is None:
+            raise KeyError(name)
+        return info
+
+    def submit(self, name, query):
+        """Queue a query on a map; returns a Future of a _answer() pair."""
+        self._map(name)
+        for key in ("start", "end"):
+            cell = query.get(key)
+            if not (isinstance(cell, list) and len(cell) == 2 and all(type(v) is int for v in cell)):
+                raise ValueError(f"'{key}' must be [row, col]")
+        future = Future()
+        with self.lock:
+            if self.closed:
+                raise ValueError("The service is shutting down")
+            self.pending[name].append((query, future, time.perf_counter()))
+            self.lock.notify()
+        return future
+
+    def query(self, name, query, timeout=None):
+        return self.submit(name, query).result(timeout)
+
+    def _dispatch(self):
+        lock = self.lock
+        while True:
+            with lock:
+                while not self.pending and not self.closed:
+                    lock.wait()
+                if self.closed:
+                    return
+                # Give concurrent queries a moment to join the batch
+                deadline = time.perf_counter() + self.batch_window
+                while not self.closed and max(map(len, self.pending.values())) < self.max_batch:
+                    left = deadline - time.perf_counter()
+                    if left <= 0:
+                        break
+                    lock.wait(left)
+                messages = []
+                for name, entries in self.pending.items():
+                    for i in range(0, len(entries), self.max_batch):
+                        messages.append(self._assign(name, entries[i:i + self.max_batch]))
+                self.pending.clear()
+            # Sent without holding lock: the result readers need it to drain the pipes
+            with self.send_lock:
+                for worker, message in messages:
+                    worker.conn.send(message)
+
+    def _assign(self, name, entries):
+        """Pick the least busy worker for a batch; returns (worker, message)."""
+        worker = min(self.workers, key=lambda w: w.busy)
+        batch = next(self.batch_ids)
+        self.inflight[batch] = (worker, entries)
+        worker.busy += 1
+        self.batches += 1
+        return worker, ("solve", batch, name, [query for query, _, _ in entries])
+
+    def _read_results(self, worker):
+        while True:
+            try:
+                batch, answers = worker.conn.recv()
+            except (EOFError, OSError):
+                self._worker_lost(worker)
+                return
+            now = time.perf_counter()
+            with self.lock:
+                worker.busy -= 1
+                _, entries = self.inflight.pop(batch)
+                for (_, _, arrived), (status, _) in zip(entries, answers):
+                    self.queries += 1
+                    self.errors += status != "ok"
+                    self.latencies.append(now - arrived)
+                    self.completed.append(now)
+                while self.completed and self.completed[0] < now - THROUGHPUT_WINDOW:
+                    self.completed.popleft()
+            for (_, future, _), answer in zip(entries, answers):
+                future.set_result(answer)
+
+    def _worker_lost(self, worker):
+        """Fail the batches of a worker that stopped; it gets no more work."""
+        with self.lock:
+            lost = [batch for batch, (owner, _) in self.inflight.items() if owner is worker]
+            entries = [entry for batch in lost for entry in self.inflight.pop(batch)[1]]
+            worker.busy = float("inf")
+        for _, future, _ in entries:
+            future.set_result(("failed", "The worker stopped"))
+
+    def stats(self):
+        with self.lock:
+            uptime = time.perf_counter() - self.started
+            latencies = [latency * 1000 for latency in self.latencies]
+            recent = [t for t in self.completed if t >= time.perf_counter() - THROUGHPUT_WINDOW]
+            return {
+                "uptime_s": uptime,
+                "workers": len(self.workers),
+                "maps": len(self.maps),
+                "queries": self.queries,
+                "errors": self.errors,
+                "edits": self.edits,
+                "batches": self.batches,
+                "mean_batch": self.queries / self.batches if self.batches else 0.0,
+                "queries_per_s": self.queries / uptime if uptime else 0.0,
+                "recent_queries_per_s": len(recent) / THROUGHPUT_WINDOW,
+                "pending": sum(map(len, self.pending.values())),
+                "latency_ms": percentiles(latencies) | {"count": len(latencies)},
+            }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, every response has a Content-Length
+    disable_nagle_algorithm = True  # headers and body go out separately
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("Expected a JSON object")
+        return body
+
+    def do_GET(self):
+        service = self.server.service
+        if self.path == "/maps":
+            self.reply(200, {"maps": [info.as_dict() for info in service.maps.values()]})
+        elif self.path == "/stats":
+            self.reply(200, service.stats())
+        else:
+            self.reply(404, {"error": f"No such endpoint: GET {self.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        parts = self.path.strip("/").split("/")
+        try:
+            body = self.read_json()
+            if parts == ["maps"]:
+                info = service.load(str(body["name"]), str(body["path"]), bool(body.get("diagonal", False)))
+                self.reply(200, info.as_dict())
+            elif len(parts) == 3 and parts[0] == "maps" and parts[2] == "query":
+                status, answer = service.query(parts[1], body)
+                if status == "ok":
+                    self.reply(200, answer)
+                else:
+                    self.reply(400 if status == "error" else 500, {"error": answer})
+            elif len(parts) == 3 and parts[0] == "maps" and parts[2] == "edit":
+                version = service.edit(parts[1], body.get("walls", ()), body.get("costs", ()))
+                self.reply(200, {"version": version})
+            else:
+                self.reply(404, {"error": f"No such endpoint: POST {self.path}"})
+        except KeyError as e:
+            self.reply(404 if len(parts) == 3 else 400, {"error": f"Unknown map or missing field {e}"})
+        except OSError as e:
+            self.reply(400, {"error": f"Could not load the map: {e}"})
+        except (ValueError, TypeError) as e:  # bad JSON, coordinates or algorithm
+            self.reply(400, {"error": str(e)})
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # room for many clients connecting at once
+
+
+def serve(service, host="127.0.0.1", port=8765, verbose=False):
+    """Serve service over HTTP until interrupted; returns the server (already closed)."""
+    server = Server((host, port), Handler)
+    server.service = service
+    server.verbose = verbose
+    print(f"Serving {len(service.workers)} workers on http://{host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve path queries on warm maps over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", "-j", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--map", action="append", default=[], metavar="NAME=PATH",
+                        help="load this map at start-up, may be repeated")
+    parser.add_argument("--diagonal", action="store_true", help="allow diagonal moves on the --map maps")
+    parser.add_argument("--batch-window", type=float, default=2.0, metavar="MS",
+                        help="how long the dispatcher waits for concurrent queries to batch (default 2)")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--compiled", action="store_true",
+                        help=f"run {', '.join(COMPILED_ALGORITHMS)} in the compiled kernel when it is built")
+    parser.add_argument("--verbose", "-v", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    maps = []
+    for spec in args.map:
+        name, sep, path = spec.partition("=")
+        if not sep:
+            parser.error(f"--map expects NAME=PATH, got '{spec}'")
+        maps.append((name, path))
+
+    service = PathService(args.workers, args.batch_window / 1000, args.max_batch, args.compiled)
+    try:
+        for name, path in maps:
+            info = service.load(name, path, args.diagonal)
+            print(f"Loaded {name}: {info.rows}x{info.cols} from {path}", file=sys.stderr)
+        serve(service, args.host, args.port, args.verbose)
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+"""Benchmark every search algorithm across map families and sizes.
+
+Usage:
+    python suite.py [--sizes 20x40,128x256,512x1024] [--families open,random10,random30,maze,rooms]
+                    [--algorithms bfs,astar,...] [--queries 5] [--seed 1] [--diagonal]
+                    [--json results.json] [--csv results.csv] [--baseline old.json]
+                    [--open-lists heap,indexed,bucket] [--tie-break g]
+
+Maps and queries are generated from the seed, so two runs with the same
+arguments search exactly the same problems. For each (family, size,
+algorithm) the suite reports wall time, the SearchStats counters (nodes
+expanded and generated, stale pops, largest open list), heap pushes, peak
+traced memory and the optimality gap of the returned paths against
+dijkstra's costs.
+
+Time is measured on a clean pass. Heap pushes and peak memory come from a
+second pass under tracemalloc with heappush wrapped in a counter, so they
+cost extra time but do not skew the timings; --no-memory skips that pass.
+With --baseline the times are compared with an earlier --json run and rows
+that got slower than --tolerance are flagged.
+
+--open-lists runs dijkstra, astar and greedy once per open list kind (see
+openlist.py), as rows named e.g. "astar/bucket"; expansion throughput is
+expanded / time_s, and max_open and peak_kib show how big the open list got.
+
+Sizes up to 4096x4096 work, but a pure Python search over 16 million cells
+takes minutes; pick the algorithms accordingly.
+"""
+import argparse
+import csv
+import heapq
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import dstar
+import engine
+import flowfield
+import hpa
+import openlist
+import wavefront
+from benchmark import maze_grid, random_grid, random_queries, rooms_grid
+from grid import Grid
+
+FAMILIES = {
+    "open": lambda rows, cols, rng: Grid(rows, cols),
+    "random10": lambda rows, cols, rng: random_grid(rows, cols, 0.10, rng),
+    "random20": lambda rows, cols, rng: random_grid(rows, cols, 0.20, rng),
+    "random30": lambda rows, cols, rng: random_grid(rows, cols, 0.30, rng),
+    "maze": maze_grid,
+    "rooms": rooms_grid,
+}
+
+FIELDS = ["family", "rows", "cols", "algorithm", "queries", "found", "time_s", "expanded",
+          "generated", "stale_pops", "max_open", "heap_pushes", "peak_kib", "gap_mean", "gap_max",
+          "suboptimal"]
+
+
+@contextmanager
+def counting_heap_pushes():
+    """Swap heappush in the search modules for a wrapper; yields a one-item count list."""
+    count = [0]
+    modules = (engine, dstar, flowfield, hpa, openlist)
+
+    def counting_push(heap, item):
+        count[0] += 1
+        heapq.heappush(heap, item)
+    for module in modules:
+        module.heappush = counting_push
+    try:
+        yield count
+    finally:
+        for module in modules:
+            module.heappush = heapq.heappush
+
+
+def parse_size(text):
+    rows, _, cols = text.lower().partition("x")
+    return int(rows), int(cols or rows)
+
+
+def run_queries(grid, algorithm, queries, options=None):
+    func = engine.ALGORITHMS[algorithm]
+    options = options or {}
+    return [func(grid, grid.index(*start), grid.index(*end), **options) for start, end in queries]
+
+
+def bench_algorithm(grid, algorithm, queries, optimal, memory, options=None, label=None):
+    """One result row (without family/size) for algorithm on grid, named label if given."""
+    grid.workspace()  # allocated once per grid, not part of any search
+    started = time.perf_counter()
+    results = run_queries(grid, algorithm, queries, options)
+    elapsed = time.perf_counter() - started
+
+    pushes = peak = None
+    if memory:
+        del results
+        with counting_heap_pushes() as count:
+            tracemalloc.start()
+            results = run_queries(grid, algorithm, queries, options)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        pushes = count[0]
+
+    gaps = []
+    for result, best in zip(results, optimal):
+        if result.found and best:
+            gaps.append(result.cost / best - 1)
+    return {
+        "algorithm": label or algorithm,
+        "queries": len(queries),
+        "found": sum(result.found for result in results),
+        "time_s": round(elapsed, 6),
+        "expanded": sum(result.stats.expanded for result in results),
+        "generated": sum(result.stats.generated for result in results),
+        "stale_pops": sum(result.stats.stale_pops for result in results),
+        "max_open": max(result.stats.max_open for result in results),
+        "heap_pushes": pushes,
+        "peak_kib": round(peak / 1024, 1) if peak is not None else None,
+        "gap_mean": round(sum(gaps) / len(gaps), 6) if gaps else 0.0,
+        "gap_max": round(max(gaps), 6) if gaps else 0.0,
+        "suboptimal": sum(gap > 1e-9 for gap in gaps),
+    }
+
+
+def variants(algorithm, open_lists, tie_break, diagonal):
+    """(label, options) pairs to run algorithm with."""
+    if algorithm not in engine.OPEN_LIST_ALGORITHMS or not (open_lists or tie_break):
+        return [(algorithm, None)]
+    runs = []
+    for kind in open_lists or [None]:
+        if kind == "bucket" and diagonal:
+            continue  # needs integer keys
+        label = "/".join([algorithm] + [part for part in (kind, tie_break and "tie-" + tie_break) if part])
+        runs.append((label, {"open_list": kind, "tie_break": tie_break}))
+    return runs
+
+
+def run_suite(sizes, families, algorithms, queries_per_map, seed, diagonal=False, memory=True, log=None,
+              open_lists=None, tie_break=None):
+    """Yield one result dict per (family, size, algorithm variant) that applies."""
+    for rows, cols in sizes:
+        for family in families:
+            # Every map gets its own seed, so adding sizes or families leaves the others unchanged
+            rng = random.Random(f"{seed}:{family}:{rows}x{cols}")
+            grid = FAMILIES[family](rows, cols, rng)
+            grid.diagonal = diagonal
+            queries = random_queries(grid, queries_per_map, rng)
+            optimal = [result.cost for result in run_queries(grid, "dijkstra", queries)]
+            for algorithm in algorithms:
+                if algorithm in ("jps", "wavefront") and not grid.uniform:
+                    continue
+                if algorithm == "wavefront" and wavefront.np is None:
+                    continue
+                for label, options in variants(algorithm, open_lists, tie_break, diagonal):
+                    row = {"family": family, "rows": rows, "cols": cols}
+                    row.update(bench_algorithm(grid, algorithm, queries, optimal, memory, options, label))
+                    if log:
+                        log(row)
+                    yield row
+
+
+def format_row(row):
+    pushes = "-" if row["heap_pushes"] is None else row["heap_pushes"]
+    peak = "-" if row["peak_kib"] is None else f"{row['peak_kib']:.1f}"
+    size = f"{row['rows']}x{row['cols']}"
+    return (f"{row['family']:<9} {size:>10} {row['algorithm']:<16} {row['found']:>3}/{row['queries']:<3} "
+            f"{row['time_s']:>9.4f} {row['expanded']:>10} {pushes:>10} {peak:>10} {row['gap_max']:>7.3f}")
+
+
+HEADER = (f"{'family':<9} {'size':>10} {'algorithm':<16} {'found':>7} "
+          f"{'time s':>9} {'expanded':>10} {'pushes':>10} {'peak KiB':>10} {'max gap':>7}")
+
+
+def compare(rows, baseline, tolerance):
+    """Print rows whose time grew by more than tolerance against a baseline run."""
+    key = lambda row: (row["family"], row["rows"], row["cols"], row["algorithm"])
+    old = {key(row): row for row in baseline["results"]}
+    slower = 0
+    for row in rows:
+        before = old.get(key(row))
+        if not before or not before["time_s"]:
+            continue
+        ratio = row["time_s"] / before["time_s"]
+        if ratio > 1 + tolerance:
+            slower += 1
+            print(f"SLOWER {ratio:5.2f}x  {row['family']} {row['rows']}x{row['cols']} {row['algorithm']}")
+        if row["expanded"] != before["expanded"]:
+            print(f"CHANGED expanded {before['expanded']} -> {row['expanded']}  "
+                  f"{row['family']} {row['rows']}x{row['cols']} {row['algorithm']}")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark all algorithms on generated map families.")
+    parser.add_argument("--sizes", default="20x40,128x256,512x1024",
+                        help="comma separated ROWSxCOLS list, up to 4096x4096")
+    parser.add_argument("--families", default=",".join(FAMILIES))
+    parser.add_argument("--algorithms", default=",".join(engine.ALGORITHMS))
+    parser.add_argument("--queries", type=int, default=5, help="random start/end pairs per map")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--diagonal", action="store_true", help="allow diagonal moves")
+    parser.add_argument("--no-memory", action="store_true", help="skip the heap push / peak memory pass")
+    parser.add_argument("--json", help="write results and run metadata here")
+    parser.add_argument("--csv", help="write one line per result here")
+    parser.add_argument("--baseline", help="earlier --json output to compare times against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown reported by --baseline (default 0.2)")
+    parser.add_argument("--open-lists", default="",
+                        help="comma separated open list kinds (heap,indexed,bucket) to run "
+                             f"{', '.join(engine.OPEN_LIST_ALGORITHMS)} with")
+    parser.add_argument("--tie-break", choices=["g"], help="prefer larger g among equal priorities")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    families = args.families.split(",")
+    algorithms = args.algorithms.split(",")
+    for name in families:
+        if name not in FAMILIES:
+            parser.error(f"unknown family '{name}', expected one of {', '.join(FAMILIES)}")
+    for name in algorithms:
+        if name not in engine.ALGORITHMS:
+            parser.error(f"unknown algorithm '{name}', expected one of {', '.join(engine.ALGORITHMS)}")
+    open_lists = [kind for kind in args.open_lists.split(",") if kind]
+    for kind in open_lists:
+        if kind not in openlist.KINDS:
+            parser.error(f"unknown open list '{kind}', expected one of {', '.join(openlist.KINDS)}")
+
+    print(HEADER)
+    rows = list(run_suite(sizes, families, algorithms, args.queries, args.seed, args.diagonal,
+                          not args.no_memory, log=lambda row: print(format_row(row), flush=True),
+                          open_lists=open_lists, tie_break=args.tie_break))
+
+    if args.json:
+        meta = {"seed": args.seed, "queries": args.queries, "diagonal": args.diagonal,
+                "open_lists": open_lists, "tie_break": args.tie_break,
+                "python": platform.python_version(), "machine": platform.machine(),
+                "date": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.json, "w") as f:
+            json.dump({"meta": meta, "results": rows}, f, indent=1)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(rows, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
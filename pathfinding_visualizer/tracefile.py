@@ -0,0 +1,274 @@
+"""Compact binary search traces: every push, pop, stale pop and path cell.
+
+A trace file holds one or more recorded searches back to back. Each one is
+
+    header   HEADER below, followed by the algorithm name (name_length bytes)
+    blocks   BLOCK header (event count, payload bytes) and its payload
+    end      a BLOCK header with zero events
+
+An event is one varint: the zigzag-encoded difference between its node id
+and the previous event's, shifted left by two, with the event kind in the
+low two bits. Consecutive events are usually neighbouring cells, so most
+take one or two bytes; a multi-million-node search fits in a few megabytes.
+The difference restarts from node 0 at every block, so any block can be
+decoded on its own: TraceReader hops from block header to block header to
+index a trace and seeks by decoding a single block.
+
+Blocks are written as they fill, so a TraceWriter streams the trace to its
+file while the search runs. Record a search by passing the writer to
+engine.solve(recorder=...), or from the command line with
+
+    python cli.py MAP_FILE QUERY_FILE --record searches.pvt
+
+The searches in engine.EVENT_ALGORITHMS report every event as it happens;
+the others (and the compiled kernel) only report their pushes and path.
+The visualizer's "Load Trace" button replays a recording with a seek bar;
+``python tracefile.py searches.pvt`` lists what a file holds.
+"""
+import argparse
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+MAGIC = b"PVT1"
+HEADER = struct.Struct("<4sBBHIIii")  # magic, version, reserved, name length, rows, cols, source, target
+BLOCK = struct.Struct("<II")  # events, payload bytes
+VERSION = 1
+
+# Event kinds
+PUSH, POP, STALE, PATH = range(4)
+KIND_NAMES = ("push", "pop", "stale", "path")
+
+BLOCK_EVENTS = 4096  # events per block, the granularity of seeking
+
+
+class TraceWriter:
+    """Writes the searches handed to engine.solve(recorder=...) to a binary stream.
+
+    The searches call pop() and stale() as they go, passing their trace of
+    pushes so far, and the writer interleaves those with the pushes a few
+    thousand events at a time. solve() calls begin() and finish() around
+    each search.
+    """
+
+    def __init__(self, stream, block_events=BLOCK_EVENTS):
+        self.stream = stream
+        self.block_events = block_events
+        self.payload = bytearray()
+        self.count = 0  # events in the current block
+        self.last = 0  # node of the previous event in the block
+        self.pushed = 0  # pushes of the current search written so far
+        # Pops and stale pops not written yet, as pairs of (pushes before it, node << 2 | kind)
+        self.marks = array("q")
+        self.events = 0  # events of the current search written so far
+        self.searches = 0
+
+    def begin(self, grid, algorithm, source, target):
+        name = algorithm.encode()
+        self.stream.write(HEADER.pack(MAGIC, VERSION, 0, len(name), grid.rows, grid.cols, source, target))
+        self.stream.write(name)
+        self.pushed = self.events = 0
+
+    def pop(self, node, trace):
+        """node was taken off the open list to be expanded."""
+        marks = self.marks
+        marks.append(len(trace))
+        marks.append(node << 2 | POP)
+        if len(marks) >= 2 * self.block_events:
+            self._drain(trace)
+
+    def stale(self, node, trace):
+        """node was taken off the open list and dropped (or passed over)."""
+        marks = self.marks
+        marks.append(len(trace))
+        marks.append(node << 2 | STALE)
+        if len(marks) >= 2 * self.block_events:
+            self._drain(trace)
+
+    def finish(self, result, cols):
+        """Write the events not written yet and the path, and end the search's trace."""
+        self._drain(result.trace)
+        path = array("i", [row * cols + col for row, col in result.path])
+        self._write(bytes([PATH]) * len(path), path)
+        self._flush()
+        self.stream.write(BLOCK.pack(0, 0))
+        self.searches += 1
+
+    def _drain(self, trace):
+        """Write the marked pops in order with the pushes between them, then the pushes since."""
+        kinds, nodes = bytearray(), array("i")
+        marks, pushed = self.marks, self.pushed
+        for i in range(0, len(marks), 2):
+            before = marks[i]
+            if before > pushed:
+                nodes.extend(trace[pushed:before])
+                kinds.extend(bytes(before - pushed))  # PUSH is 0
+                pushed = before
+            nodes.append(marks[i + 1] >> 2)
+            kinds.append(marks[i + 1] & 3)
+        if len(trace) > pushed:
+            nodes.extend(trace[pushed:])
+            kinds.extend(bytes(len(trace) - pushed))
+            pushed = len(trace)
+        self.pushed = pushed
+        del marks[:]
+        self._write(kinds, nodes)
+
+    def _write(self, kinds, nodes):
+        append = self.payload.append
+        last, count, limit = self.last, self.count, self.block_events
+        for kind, node in zip(kinds, nodes):
+            # Zigzag-encoded difference, shifted past the two kind bits
+            delta = node - last
+            value = (delta << 3 if delta >= 0 else (-delta << 3) - 4) | kind
+            while value > 0x7F:
+                append(value & 0x7F | 0x80)
+                value >>= 7
+            append(value)
+            last = node
+            count += 1
+            if count == limit:
+                self.count = count
+                self._flush()
+                last = count = 0
+        self.last, self.count = last, count
+        self.events += len(nodes)
+
+    def _flush(self):
+        if self.count:
+            self.stream.write(BLOCK.pack(self.count, len(self.payload)))
+            self.stream.write(self.payload)
+            self.payload.clear()
+            self.count = self.last = 0
+
+
+class TraceReader:
+    """Random access to one recorded search in a binary stream.
+
+    Reads the search starting at the stream's current position (or at
+    offset); end is where the next one starts. A trace still being written
+    reads up to its last complete block, with complete False.
+    """
+
+    def __init__(self, stream, offset=None):
+        self.stream = stream
+        if offset is not None:
+            stream.seek(offset)
+        raw = stream.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            raise ValueError("Not a search trace: file too short")
+        magic, version, _, name_length, self.rows, self.cols, self.source, self.target = HEADER.unpack(raw)
+        if magic != MAGIC:
+            raise ValueError("Not a search trace")
+        if version != VERSION:
+            raise ValueError(f"Unsupported trace version {version}")
+        self.algorithm = stream.read(name_length).decode()
+        # Block index: (first event, payload offset, event count, payload bytes)
+        self.blocks = []
+        self.firsts = []  # first event of every block, for bisecting
+        self.events = 0
+        self.complete = False
+        while True:
+            raw = stream.read(BLOCK.size)
+            if len(raw) < BLOCK.size:
+                break
+            count, size = BLOCK.unpack(raw)
+            if not count:
+                self.complete = True
+                break
+            offset = stream.tell()
+            if len(stream.read(size)) < size:
+                break
+            self.blocks.append((self.events, offset, count, size))
+            self.firsts.append(self.events)
+            self.events += count
+        self.end = stream.tell()
+
+    def __len__(self):
+        return self.events
+
+    def _decode(self, block):
+        """Kinds (bytearray) and node ids (array) of one block's events."""
+        _, offset, count, size = self.blocks[block]
+        self.stream.seek(offset)
+        payload = self.stream.read(size)
+        kinds = bytearray(count)
+        nodes = array("i", bytes(4 * count))
+        node = value = shift = i = 0
+        for byte in payload:
+            value |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            kinds[i] = value & 3
+            value >>= 2
+            node += -((value + 1) >> 1) if value & 1 else value >> 1
+            nodes[i] = node
+            i += 1
+            value = shift = 0
+        return kinds, nodes
+
+    def read(self, start=0, stop=None):
+        """Yield the (kind, node) events start..stop-1, decoding only the blocks they lie in."""
+        stop = self.events if stop is None else min(stop, self.events)
+        if start >= stop:
+            return
+        block = bisect_right(self.firsts, start) - 1
+        while start < stop:
+            first = self.blocks[block][0]
+            kinds, nodes = self._decode(block)
+            for i in range(start - first, min(stop - first, len(kinds))):
+                yield kinds[i], nodes[i]
+            start = first + len(kinds)
+            block += 1
+
+    def state_at(self, index):
+        """Per-node state after the first index events: 0 untouched, else 1 + kind of its last event.
+
+        A stale pop leaves a node as it was.
+        """
+        state = bytearray(self.rows * self.cols)
+        for kind, node in self.read(0, index):
+            if kind != STALE:
+                state[node] = kind + 1
+        return state
+
+    def counts(self):
+        """Number of events of each kind, by KIND_NAMES."""
+        totals = [0] * len(KIND_NAMES)
+        for block in range(len(self.blocks)):
+            kinds, _ = self._decode(block)
+            for kind in range(len(KIND_NAMES)):
+                totals[kind] += kinds.count(kind)
+        return dict(zip(KIND_NAMES, totals))
+
+
+def read_traces(stream):
+    """Yield a TraceReader for every search recorded in stream, in order."""
+    stream.seek(0, 2)
+    size = stream.tell()
+    offset = 0
+    while offset < size:
+        reader = TraceReader(stream, offset)
+        yield reader
+        if not reader.complete:
+            return
+        offset = reader.end
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the searches recorded in a trace file.")
+    parser.add_argument("trace_file")
+    args = parser.parse_args(argv)
+    with open(args.trace_file, "rb") as f:
+        for number, reader in enumerate(read_traces(f), 1):
+            counts = ", ".join(f"{count} {name}" for name, count in reader.counts().items())
+            print(f"{number}: {reader.algorithm} {divmod(reader.source, reader.cols)} -> "
+                  f"{divmod(reader.target, reader.cols)} on {reader.rows}x{reader.cols}: "
+                  f"{reader.events} events ({counts}){'' if reader.complete else ', incomplete'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""NumPy wavefront BFS: whole-grid distance fields on unit-cost grids.
+
+Instead of popping one node at a time, each step expands the entire
+frontier with array operations. The resulting field gives the shortest
+distance from its source to every cell, so every query sharing that source
+(or, since moves are symmetric, that target) is answered by walking the
+field downhill without searching again.
+
+Requires NumPy.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from engine import SearchResult, SearchStats
+
+UNREACHABLE = -1
+
+
+def _require_numpy(grid):
+    if np is None:
+        raise ImportError("The wavefront mode needs NumPy: pip install numpy")
+    if not grid.uniform:
+        raise ValueError("The wavefront mode needs a 4-connected grid without terrain costs")
+
+
+class DistanceField:
+    def __init__(self, grid, source, dist, complete):
+        self.grid = grid
+        self.source = source        # node id the field was grown from
+        self.dist = dist            # flat int32 array, UNREACHABLE where not reached
+        self.complete = complete    # False if growth stopped early at a target
+
+    def as_array(self):
+        return self.dist.reshape(self.grid.rows, self.grid.cols)
+
+    def distance(self, cell):
+        d = int(self.dist[self.grid.index(*cell)])
+        return None if d == UNREACHABLE else d
+
+    def _descend(self, node):
+        """Node ids from node down to the source, or [] if unreachable."""
+        dist = self.dist
+        d = int(dist[node])
+        if d == UNREACHABLE:
+            return []
+        neighbors = self.grid.neighbors
+        path = [node]
+        while d > 0:
+            for nb in neighbors(node):
+                if dist[nb] == d - 1:
+                    node = nb
+                    break
+            else:
+                # only the source may be a wall, so check it explicitly
+                node = self.source
+            d -= 1
+            path.append(node)
+        return path
+
+    def path_to(self, cell):
+        """Shortest path from the field's source to cell, as (row, col) cells."""
+        path = self._descend(self.grid.index(*cell))
+        path.reverse()
+        return [self.grid.coords(node) for node in path]
+
+    def path_from(self, cell):
+        """Shortest path from cell to the field's source, as (row, col) cells."""
+        return [self.grid.coords(node) for node in self._descend(self.grid.index(*cell))]
+
+
+def distance_field(grid, source, stop_at=None):
+    """Grow a BFS distance field from node id `source` one whole frontier per step.
+
+    With `stop_at` set, growth stops after the level that reaches that node.
+    Returns (DistanceField, discovered node ids in discovery order).
+    """
+    _require_numpy(grid)
+    rows, cols = grid.rows, grid.cols
+    # Work on a copy padded with a ring of walls so neighbours need no bounds checks
+    width = cols + 2
+    seen = np.ones((rows + 2, width), dtype=bool)  # walls count as seen
+    seen[1:-1, 1:-1] = np.frombuffer(bytes(grid.cells), dtype=np.uint8).reshape(rows, cols) != 0
+    seen = seen.ravel()
+    dist = np.full(seen.size, UNREACHABLE, dtype=np.int32)
+    owner = np.zeros(seen.size, dtype=np.int64)
+    offsets = np.array([1, width, -1, -width], dtype=np.int64)
+
+    def padded(node):
+        r, c = divmod(node, cols)
+        return (r + 1) * width + c + 1
+
+    start = padded(source)
+    goal = padded(stop_at) if stop_at is not None else None
+    dist[start] = 0
+    seen[start] = True
+
+    frontier = np.array([start], dtype=np.int64)
+    discovered = []
+    level = 0
+    complete = True
+    if stop_at == source:
+        frontier = frontier[:0]
+        complete = False
+    while frontier.size:
+        level += 1
+        cand = (frontier[:, None] + offsets).ravel()
+        cand = cand[~seen[cand]]
+        # Drop duplicates without sorting: only one writer per cell wins
+        idx = np.arange(cand.size)
+        owner[cand] = idx
+        cand = cand[owner[cand] == idx]
+        seen[cand] = True
+        dist[cand] = level
+        discovered.append(cand)
+        frontier = cand
+        if goal is not None and dist[goal] != UNREACHABLE:
+            complete = False
+            break
+
+    flat_dist = np.ascontiguousarray(dist.reshape(rows + 2, width)[1:-1, 1:-1]).ravel()
+    if discovered:
+        order = np.concatenate(discovered)
+        order = (order // width - 1) * cols + (order % width - 1)
+    else:
+        order = np.empty(0, dtype=np.int64)
+    return DistanceField(grid, source, flat_dist, complete), order
+
+
+def field_from(grid, cell):
+    """Complete distance field rooted at a (row, col) cell."""
+    field, _ = distance_field(grid, grid.index(*cell))
+    return field
+
+
+def wavefront_search(grid, source, target):
+    """Engine-style search: grow the field until it reaches target."""
+    field, order = distance_field(grid, source, stop_at=target)
+    path = field.path_to(grid.coords(target))
+    # Every reached cell is expanded as part of its frontier
+    stats = SearchStats(expanded=len(order), generated=len(order))
+    return SearchResult("wavefront", grid.coords(source), grid.coords(target), path, order, stats=stats)
+
+
+def solve_many(grid, queries):
+    """Answer (start, end) cell queries, growing one field per shared endpoint.
+
+    Fields are rooted at whichever side (starts or ends) has fewer distinct
+    cells. Results come back in query order with empty traces.
+    """
+    _require_numpy(grid)
+    starts = {start for start, _ in queries}
+    ends = {end for _, end in queries}
+    from_end = len(ends) < len(starts)
+
+    # Group by root so only one field is alive at a time
+    groups = {}
+    for i, (start, end) in enumerate(queries):
+        groups.setdefault(end if from_end else start, []).append(i)
+
+    results = [None] * len(queries)
+    no_trace = np.empty(0, dtype=np.int64)
+    for root, indices in groups.items():
+        field = field_from(grid, root)
+        for i in indices:
+            start, end = queries[i]
+            path = field.path_from(start) if from_end else field.path_to(end)
+            results[i] = SearchResult("wavefront", start, end, path, no_trace)
+    return results
@@ -0,0 +1,99 @@
+"""Run one search at a time off the Tk main thread.
+
+A SearchJob calls its function in a daemon thread and posts exactly one
+event to a thread-safe queue when it stops: ("done", result),
+("error", exception) or ("cancelled", None). The GUI drains the queue from
+a periodic ``after`` callback, so the window keeps redrawing and taking
+input however long the search takes.
+
+Cancelling is cooperative. The job hands its function a Checkpoint, which
+the function passes on as the recorder of the searches it runs (see
+engine.solve(recorder=...)). Once cancel() is called the search raises
+SearchCancelled at its next pop, between two expansions, so nothing it
+updates (a D* Lite planner, a flow field cache, a pruned view) is left half
+done and warm state can be kept across a cancel. Work with no checkpoints,
+such as rebuilding an HPA* hierarchy or a landmark index, runs to the end
+first; its result is then reported as cancelled.
+
+Nothing here imports Tkinter.
+"""
+import queue
+import threading
+import time
+
+
+class SearchCancelled(Exception):
+    """Raised inside a worker thread at a checkpoint after SearchJob.cancel()."""
+
+
+class Checkpoint:
+    """A search recorder that records nothing and raises SearchCancelled once set."""
+
+    def __init__(self):
+        self.event = threading.Event()
+
+    def set(self):
+        self.event.set()
+
+    def check(self):
+        if self.event.is_set():
+            raise SearchCancelled
+
+    def begin(self, grid, algorithm, source, target):
+        self.check()
+
+    def pop(self, node, trace):
+        if self.event.is_set():
+            raise SearchCancelled
+
+    stale = pop
+
+    def finish(self, result, cols):
+        pass
+
+
+class SearchJob:
+    def __init__(self, func, *args):
+        """Run func(*args, checkpoint=...) once start() is called."""
+        self.func = func
+        self.args = args
+        self.events = queue.Queue()
+        self.started = None
+        self.cancelled = False
+        self.checkpoint = Checkpoint()
+        self._thread = threading.Thread(target=self._run, name="search", daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started if self.started is not None else 0.0
+
+    def _run(self):
+        try:
+            event = ("done", self.func(*self.args, checkpoint=self.checkpoint))
+        except SearchCancelled:
+            event = ("cancelled", None)
+        except Exception as e:  # handed to the GUI thread, which decides how to report it
+            event = ("error", e)
+        if self.cancelled:
+            event = ("cancelled", None)
+        self.events.put(event)
+
+    def cancel(self):
+        """Stop the search at its next checkpoint; a ("cancelled", None) event follows."""
+        self.cancelled = True
+        self.checkpoint.set()
+
+    def poll(self):
+        """The job's final (kind, value) event once it has stopped, else None. Never blocks."""
+        try:
+            event = self.events.get_nowait()
+        except queue.Empty:
+            return None
+        if self.cancelled:
+            return ("cancelled", None)
+        return event
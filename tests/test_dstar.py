@@ -0,0 +1,55 @@
+import random
+
+import engine
+from benchmark import random_grid
+from dstar import DStarLite
+from worker import SearchCancelled
+
+
+class CancelAt:
+    """Recorder that cancels the search at its pops-th pop."""
+
+    def __init__(self, pops):
+        self.pops = pops
+
+    def pop(self, node, trace):
+        self.pops -= 1
+        if self.pops <= 0:
+            raise SearchCancelled
+
+
+def check_plan(planner, grid, start, end):
+    best = engine.solve(grid, start, end, "dijkstra")
+    result = planner.plan()
+    assert result.found == best.found, (start, end)
+    if best.found:
+        assert abs(result.cost - best.cost) < 1e-9, (start, end)
+
+
+def test_plan_after_cancel_matches_dijkstra():
+    for seed in range(60):
+        rng = random.Random(seed)
+        grid = random_grid(24, 24, 0.3, rng)
+        grid.diagonal = seed % 2 == 1
+        open_cells = [grid.coords(i) for i in range(grid.size) if not grid.cells[i]]
+        start, end = rng.choice(open_cells), rng.choice(open_cells)
+        planner = DStarLite(grid, start, end)
+        try:
+            for _ in range(3):
+                try:
+                    planner.plan(CancelAt(rng.randint(1, 200)))
+                except SearchCancelled:
+                    pass
+                check_plan(planner, grid, start, end)
+                # Replan after edits, cancelled again first
+                for _ in range(5):
+                    cell = grid.coords(rng.randrange(grid.size))
+                    if cell not in (start, end):
+                        grid.toggle_wall(*cell)
+                try:
+                    planner.plan(CancelAt(rng.randint(1, 50)))
+                except SearchCancelled:
+                    pass
+                check_plan(planner, grid, start, end)
+        finally:
+            planner.close()
@@ -0,0 +1,27 @@
+import random
+
+import pytest
+
+from benchmark import random_grid
+from flowfield import FlowField
+
+
+@pytest.mark.parametrize("cols", [1, 2, 3, 7])
+@pytest.mark.parametrize("diagonal", [False, True])
+def test_steps_point_at_the_next_cell(cols, diagonal):
+    for seed in range(10):
+        grid = random_grid(9, cols, 0.2, random.Random(seed))
+        grid.diagonal = diagonal
+        goal = grid.cells.find(0)
+        if goal == -1:
+            continue
+        field = FlowField(grid, goal)
+        for node in range(grid.size):
+            step = field.step_at(node)
+            if step is None:
+                continue
+            row, col = grid.coords(node)
+            nb = field.next_node(node)
+            assert grid.coords(nb) == (row + step[0], col + step[1])
+            assert any(n == nb for n, _ in grid.edges(node))
+            assert field.dist[nb] < field.dist[node]
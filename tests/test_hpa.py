@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+import engine
+from benchmark import random_grid
+from hpa import CLUSTER_SIZE
+
+
+@pytest.mark.parametrize("rows, cols", [(37, 6), (50, CLUSTER_SIZE), (6, 37)])
+def test_narrow_grid_matches_dijkstra(rows, cols):
+    # One column (or row) of clusters: every border runs the same way
+    for seed in range(20):
+        rng = random.Random(seed)
+        grid = random_grid(rows, cols, 0.25, rng)
+        open_cells = [grid.coords(i) for i in range(grid.size) if not grid.cells[i]]
+        for _ in range(10):
+            start, end = rng.choice(open_cells), rng.choice(open_cells)
+            best = engine.solve(grid, start, end, "dijkstra")
+            result = engine.solve(grid, start, end, "hpa")
+            assert result.found == best.found, (seed, start, end)
+            if best.found:
+                assert result.cost == grid.path_cost(result.path)
+                assert result.cost >= best.cost - 1e-9
+
+
+def test_narrow_grid_seed_29():
+    grid = random_grid(37, 6, 0.25, random.Random(29))
+    start, end = (23, 3), (36, 5)
+    grid.set_wall(*start, False)
+    grid.set_wall(*end, False)
+    best = engine.solve(grid, start, end, "dijkstra")
+    result = engine.solve(grid, start, end, "hpa")
+    assert result.found == best.found